@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Continuous-Batching Engine for Apertus8B
+Decodes the chunks of all concurrent callers in one shared batch, admitting
+new sequences and retiring finished ones at every token boundary
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+
+import torch
+
+try:
+    from transformers.cache_utils import Cache
+except ImportError:
+    Cache = object
+
+from apertus_translator import ends_first_line
+
+
+def _to_layers(past_key_values):
+    """Per-layer (key, value) tensors of a cache object or legacy tuple."""
+    if hasattr(past_key_values, "to_legacy_cache"):
+        return past_key_values.to_legacy_cache()
+    return past_key_values
+
+
+class _SlotCache(Cache):
+    """
+    Key/value cache handed to the model for one decode step.
+
+    ``update`` writes the step's keys/values in place into ``column`` of
+    the batcher's preallocated buffers and returns the rows being decoded
+    up to that column - views of the buffers, not copies.
+    """
+
+    is_compileable = False
+
+    def __init__(self, keys, values, rows, column):
+        # The layer storage is the batcher's buffers, so the base class is not initialized
+        self.keys = keys
+        self.values = values
+        self.rows = rows
+        self.column = column
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def is_sliding(self):
+        return [False] * len(self.keys)
+
+    def get_seq_length(self, layer_idx=0):
+        return self.column
+
+    def get_usable_length(self, new_seq_length, layer_idx=0):
+        return self.column
+
+    def get_max_cache_shape(self, layer_idx=0):
+        return self.keys[layer_idx].shape[2]
+
+    def get_mask_sizes(self, cache_position, layer_idx=0):
+        return self.column + cache_position.shape[0], 0
+
+    def update(self, key_states, value_states, layer_idx, cache_kwargs=None):
+        end = self.column + key_states.shape[2]
+        keys, values = self.keys[layer_idx], self.values[layer_idx]
+        keys[self.rows, :, self.column:end] = key_states
+        values[self.rows, :, self.column:end] = value_states
+        return keys[self.rows, :, :end], values[self.rows, :, :end]
+
+
+class _Sequence:
+    """One chunk being decoded, living in one row of the batch cache."""
+
+    def __init__(self, chunk, src_name, tgt_name, max_tokens, hint=None, on_text=None):
+        self.chunk = chunk
+        self.src_name = src_name
+        self.tgt_name = tgt_name
+        self.max_tokens = max_tokens
+        self.hint = hint
+        self.on_text = on_text
+        self.future = Future()
+
+        self.max_new_tokens = None
+        self.length = 0            # tokens in the cache = position of next_token
+        self.next_token = None     # sampled, not yet in the cache
+        self.generated = []
+        self.stopped = False
+
+
+class ApertusContinuousBatcher:
+    """
+    Runs a single decode loop in front of an ApertusTranslator.
+
+    Callers submit chunks and get Futures. Between two decode steps the
+    worker prefills newly arrived chunks (at most ``max_prefill_tokens``
+    prompt tokens per step, so a long prompt delays the running sequences
+    by one bounded prefill) and adds them to the running batch (up to
+    ``max_batch_size``). A sequence that finishes its line, hits EOS or its
+    token budget leaves the batch at once and its Future resolves, so
+    short requests never wait for long ones.
+
+    The key/value cache is one preallocated buffer per layer, shaped
+    [max_batch_size, heads, capacity, head_dim]. Active sequence ``i``
+    lives in row ``i``; a prefilled prompt is copied in right-aligned to
+    the shared width, and every decode step writes one new column for all
+    rows in place. Columns a row does not use (before its prompt, or after
+    a longer newcomer widened the batch) are masked. The buffer is
+    compacted or grown only when the width reaches its capacity.
+    """
+
+    def __init__(self, translator, max_batch_size=16, max_prefill_tokens=2048, initial_capacity=1024):
+        """
+        Initialize the engine.
+
+        Args:
+            translator: ApertusTranslator owning the (loaded) model
+            max_batch_size: Sequences decoded together at most
+            max_prefill_tokens: Prompt tokens prefilled between two decode
+                                steps at most (at least one prompt is admitted)
+            initial_capacity: Cache columns allocated at first (grown on demand)
+        """
+        self.translator = translator
+        self.max_batch_size = max_batch_size
+        self.max_prefill_tokens = max_prefill_tokens
+        self.initial_capacity = initial_capacity
+
+        self._queue = queue.Queue()
+        self._active = []          # sequence in row i of the cache
+        self._keys = None          # per layer [max_batch_size, heads, capacity, head_dim]
+        self._values = None
+        self._valid = None         # [max_batch_size, capacity] columns each row attends to
+        self._width = 0            # columns in use by the batch (next decode column)
+
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="apertus-batcher", daemon=True)
+        self._worker.start()
+
+        # Counters for monitoring (mean batch size = tokens / steps)
+        self.stats = {"requests": 0, "steps": 0, "tokens": 0, "max_batch": 0,
+                      "prefill_tokens": 0, "compactions": 0, "capacity": 0}
+
+    def submit(self, chunk, src_name, tgt_name, max_tokens=512, hint=None, on_text=None):
+        """
+        Queue a chunk for translation.
+
+        Args:
+            chunk: Source text of the chunk
+            src_name: Source language name (as used in the prompt)
+            tgt_name: Target language name
+            max_tokens: Upper bound for the chunk's token budget
+            hint: Optional fuzzy translation-memory match for the prompt
+            on_text: Optional callback receiving the decoded output so far
+                     after every token (called from the worker thread)
+
+        Returns:
+            concurrent.futures.Future resolving to (translation, info), where
+            info holds max_new_tokens, stopped and generated_tokens
+        """
+        sequence = _Sequence(chunk, src_name, tgt_name, max_tokens, hint, on_text)
+        if self._stopped.is_set():
+            sequence.future.set_exception(RuntimeError("Batcher is stopped"))
+        else:
+            self._queue.put(sequence)
+        return sequence.future
+
+    def stop(self):
+        """Stop the worker thread after the current step."""
+        self._stopped.set()
+        self._queue.put(None)
+        self._worker.join()
+
+    def _pick(self, logits):
+        """Next token per row, following the translator's generation_config."""
+        config = self.translator.generation_config
+        if not config.get("do_sample"):
+            return logits.argmax(dim=-1)
+
+        probs = torch.softmax(logits.float() / max(config.get("temperature", 1.0), 1e-5), dim=-1)
+        top_p = config.get("top_p", 1.0)
+        if top_p < 1.0:
+            sorted_probs, indices = probs.sort(dim=-1, descending=True)
+            # Keep the smallest set of tokens whose probability reaches top_p
+            sorted_probs[sorted_probs.cumsum(dim=-1) - sorted_probs > top_p] = 0
+            probs = torch.zeros_like(probs).scatter(-1, indices, sorted_probs)
+        return torch.multinomial(probs, 1).squeeze(-1)
+
+    def _accept(self, sequence, token):
+        """Append a sampled token; return True when the sequence is finished."""
+        tokenizer = self.translator.tokenizer
+        if token == tokenizer.eos_token_id:
+            return True
+        sequence.generated.append(token)
+        sequence.next_token = token
+        text = tokenizer.decode(sequence.generated, skip_special_tokens=True)
+        if sequence.on_text:
+            sequence.on_text(text)
+        if ends_first_line(text, self.translator.stop_markers):
+            sequence.stopped = True
+            return True
+        return len(sequence.generated) >= sequence.max_new_tokens
+
+    def _finish(self, sequence):
+        """Resolve a finished sequence's Future."""
+        output = self.translator.tokenizer.decode(sequence.generated, skip_special_tokens=True)
+        sequence.future.set_result((self.translator._clean_output(output), {
+            "max_new_tokens": sequence.max_new_tokens,
+            "stopped": sequence.stopped,
+            "generated_tokens": len(sequence.generated)
+        }))
+
+    # ------------------------------------------------------------------ #
+    # Batch cache
+    # ------------------------------------------------------------------ #
+
+    def _allocate(self, layers, capacity):
+        """(Re)allocate the cache buffers with ``capacity`` columns, keeping the columns in use."""
+        old_keys, old_values = self._keys, self._values
+        self._keys, self._values = [], []
+        for key, value in layers:
+            shape = (self.max_batch_size, key.shape[1], capacity, key.shape[3])
+            self._keys.append(torch.zeros(shape, dtype=key.dtype, device=key.device))
+            shape = (self.max_batch_size, value.shape[1], capacity, value.shape[3])
+            self._values.append(torch.zeros(shape, dtype=value.dtype, device=value.device))
+
+        valid = torch.zeros(self.max_batch_size, capacity, dtype=torch.bool, device=layers[0][0].device)
+        if old_keys is not None:
+            width = self._width
+            for new, old in zip(self._keys + self._values, old_keys + old_values):
+                new[:, :, :width] = old[:, :, :width]
+            valid[:, :width] = self._valid[:, :width]
+        self._valid = valid
+        self.stats["capacity"] = capacity
+
+    def _compact(self):
+        """Right-align every row's cached tokens to the longest row, dropping masked gaps."""
+        rows = len(self._active)
+        width = max((s.length for s in self._active), default=0)
+        for row, sequence in enumerate(self._active):
+            columns = self._valid[row].nonzero().squeeze(1)
+            start = width - sequence.length
+            for buffers in (self._keys, self._values):
+                for buffer in buffers:
+                    # Advanced indexing copies first, so overlapping ranges are safe
+                    buffer[row, :, start:width] = buffer[row][:, columns]
+            self._valid[row] = False
+            self._valid[row, start:width] = True
+        self._valid[rows:] = False
+        self._width = width
+        self.stats["compactions"] += 1
+
+    def _reserve(self, length, layers=None):
+        """Make room for a row of ``length`` cached tokens plus the next decode column."""
+        if self._keys is None:
+            self._allocate(layers, max(self.initial_capacity, length + 1))
+            return
+        capacity = self._keys[0].shape[2]
+        if max(self._width, length) + 1 <= capacity:
+            return
+        self._compact()
+        needed = max(self._width, length) + 1
+        if needed > capacity:
+            self._allocate(layers or list(zip(self._keys, self._values)), max(needed, capacity * 2))
+
+    def _place(self, sequence, layers):
+        """Copy a prefilled sequence's cache (per-layer [1, heads, length, dim]) into the next row."""
+        length = layers[0][0].shape[2]
+        self._reserve(length, layers)
+
+        row = len(self._active)
+        width = max(self._width, length)
+        start = width - length
+        for buffer, (key, _) in zip(self._keys, layers):
+            buffer[row, :, start:width] = key[0]
+        for buffer, (_, value) in zip(self._values, layers):
+            buffer[row, :, start:width] = value[0]
+        self._valid[row] = False
+        self._valid[row, start:width] = True
+
+        self._width = width
+        sequence.length = length
+        self._active.append(sequence)
+
+    def _retire(self, sequence):
+        """Free a sequence's row, moving the last row into it."""
+        row = self._active.index(sequence)
+        last = len(self._active) - 1
+        if row != last:
+            width = self._width
+            for buffer in self._keys + self._values:
+                buffer[row, :, :width] = buffer[last, :, :width]
+            self._valid[row] = self._valid[last]
+            self._active[row] = self._active[last]
+        self._valid[last] = False
+        self._active.pop()
+        if not self._active:
+            self._width = 0
+
+    # ------------------------------------------------------------------ #
+    # Prefill and decode
+    # ------------------------------------------------------------------ #
+
+    def _prefill(self, sequence):
+        """
+        Encode a new sequence's prompt (reusing the cached prefix) and sample its first token.
+
+        Returns:
+            (finished, layers, prefilled tokens)
+        """
+        translator = self.translator
+        model_inputs = translator._model_inputs(sequence.chunk, sequence.src_name, sequence.tgt_name,
+                                                sequence.hint)
+        sequence.max_new_tokens = translator._new_token_budget(sequence.chunk, sequence.max_tokens)
+
+        input_ids = model_inputs["input_ids"]
+        past_key_values = model_inputs.get("past_key_values")
+        past_length = _to_layers(past_key_values)[0][0].shape[2] if past_key_values is not None else 0
+
+        with torch.no_grad():
+            output = translator.model(
+                input_ids=input_ids[:, past_length:],
+                attention_mask=model_inputs["attention_mask"],
+                past_key_values=past_key_values,
+                use_cache=True
+            )
+
+        token = int(self._pick(output.logits[:, -1, :])[0])
+        layers = _to_layers(output.past_key_values)
+        return self._accept(sequence, token), layers, input_ids.shape[1] - past_length
+
+    def _step(self, rows):
+        """Decode one token for the sequences in ``rows`` (a slice of the active rows); return their tokens."""
+        model = self.translator.model
+        device = self._valid.device
+        sequences = self._active[rows]
+        column = self._width
+
+        self._valid[rows, column] = True
+        try:
+            with torch.no_grad():
+                output = model(
+                    input_ids=torch.tensor([[s.next_token] for s in sequences], device=device),
+                    attention_mask=self._valid[rows, :column + 1].long(),
+                    position_ids=torch.tensor([[s.length] for s in sequences], device=device),
+                    cache_position=torch.tensor([column], device=device),
+                    past_key_values=_SlotCache(self._keys, self._values, rows, column),
+                    use_cache=True
+                )
+        except Exception:
+            self._valid[rows, column] = False
+            raise
+
+        for sequence in sequences:
+            sequence.length += 1
+        return self._pick(output.logits[:, -1, :]).tolist()
+
+    def _admit(self, block):
+        """Prefill queued sequences into free rows, up to max_prefill_tokens per step."""
+        prefilled = 0
+        while len(self._active) < self.max_batch_size and prefilled < self.max_prefill_tokens:
+            try:
+                sequence = self._queue.get(block=block)
+            except queue.Empty:
+                return
+            block = False
+            if sequence is None:
+                self._stopped.set()
+                return
+
+            self.stats["requests"] += 1
+            try:
+                finished, layers, tokens = self._prefill(sequence)
+                prefilled += tokens
+                self.stats["prefill_tokens"] += tokens
+                if finished:
+                    self._finish(sequence)
+                else:
+                    self._place(sequence, layers)
+            except Exception as e:
+                sequence.future.set_exception(e)
+
+    def _decode(self):
+        """Advance all active sequences by one token and retire finished ones."""
+        self._reserve(0)
+        active = list(self._active)
+        try:
+            tokens = self._step(slice(0, len(active)))
+        except Exception:
+            # Isolate the failing sequence(s): step each row on its own
+            tokens = []
+            for row, sequence in enumerate(active):
+                try:
+                    tokens.append(self._step(slice(row, row + 1))[0])
+                except Exception as e:
+                    tokens.append(None)
+                    sequence.future.set_exception(e)
+        self._width += 1
+
+        self.stats["steps"] += 1
+        self.stats["tokens"] += len(active)
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(active))
+
+        for sequence, token in zip(active, tokens):
+            if token is None:
+                self._retire(sequence)
+            elif self._accept(sequence, token):
+                self._retire(sequence)
+                self._finish(sequence)
+
+    def _run(self):
+        """Worker loop: admit at each token boundary, then decode one step."""
+        while not self._stopped.is_set():
+            # Sleep on the queue only when there is nothing to decode
+            self._admit(block=not self._active)
+            if self._active:
+                self._decode()
+
+        # Fail anything still running or queued so callers don't block forever
+        for sequence in self._active:
+            sequence.future.set_exception(RuntimeError("Batcher is stopped"))
+        self._active = []
+        self._keys = self._values = None
+        while True:
+            try:
+                sequence = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if sequence is not None:
+                sequence.future.set_exception(RuntimeError("Batcher is stopped"))
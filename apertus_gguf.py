@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+GGUF / llama.cpp Backend for Apertus8B
+Runs a 4-bit or 8-bit GGUF export of Apertus through llama-cpp-python on CPU,
+with the same prompt, chunking and result dict as ApertusTranslator
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import subprocess
+from pathlib import Path
+
+from apertus_translator import ApertusTranslator, AutoTokenizer, current_rss_mb, ends_first_line
+
+try:
+    from llama_cpp import Llama
+except ImportError:
+    Llama = None
+
+# GGUF exports live next to the original checkpoint, in <name>-gguf/<name>-<quantization>.gguf
+GGUF_SUFFIX = "-gguf"
+DEFAULT_QUANTIZATION = "Q4_K_M"
+
+# Quantizations convert_hf_to_gguf.py writes directly (others go through llama-quantize)
+DIRECT_QUANTIZATIONS = ["f16", "bf16", "q8_0"]
+
+# Tokenizer files copied next to the GGUF file (chat template and token counting)
+TOKENIZER_FILES = [
+    "tokenizer.json",
+    "tokenizer_config.json",
+    "special_tokens_map.json",
+    "chat_template.jinja",
+]
+
+
+def is_available():
+    """Whether the llama-cpp-python package is installed."""
+    return Llama is not None
+
+
+def converted_path(model_path):
+    """Directory holding the GGUF exports of a checkpoint."""
+    model_path = Path(model_path)
+    return model_path.parent / f"{model_path.name}{GGUF_SUFFIX}"
+
+
+def find_gguf(path, quantization=None):
+    """
+    GGUF file to load from a file or directory path.
+
+    In a directory, a file whose name contains ``quantization`` is preferred,
+    then any other export; None if there is none.
+    """
+    path = Path(path)
+    if path.suffix == ".gguf":
+        return path if path.exists() else None
+    if not path.is_dir():
+        return None
+
+    files = sorted(path.glob("*.gguf"))
+    if quantization:
+        for file in files:
+            if quantization.lower() in file.name.lower():
+                return file
+    return files[0] if files else None
+
+
+def _quantize_binary(llama_cpp_dir):
+    """Path of the llama-quantize tool (llama.cpp build or PATH)."""
+    for candidate in [llama_cpp_dir / "build/bin/llama-quantize", llama_cpp_dir / "llama-quantize"]:
+        if candidate.exists():
+            return str(candidate)
+    found = shutil.which("llama-quantize")
+    if found is None:
+        raise FileNotFoundError(f"llama-quantize not found in {llama_cpp_dir}/build/bin or PATH")
+    return found
+
+
+def convert_model(model_path, output_dir=None, quantization=DEFAULT_QUANTIZATION, llama_cpp_dir=None,
+                  force=False, keep_f16=False):
+    """
+    Export a Transformers Apertus checkpoint to GGUF.
+
+    Uses convert_hf_to_gguf.py from a llama.cpp checkout (recent enough to
+    know the Apertus architecture), then llama-quantize for k-quants. The
+    tokenizer files are copied next to the GGUF file.
+
+    Args:
+        model_path: Path to the Transformers checkpoint
+        output_dir: Target directory (defaults to converted_path(model_path))
+        quantization: Q4_K_M, Q5_K_M, Q8_0, f16, ... (llama.cpp type names)
+        llama_cpp_dir: llama.cpp checkout (default: LLAMA_CPP_DIR or ./llama.cpp)
+        force: Re-convert even if the export already exists
+        keep_f16: Keep the intermediate f16 export used for k-quants
+
+    Returns:
+        Path to the GGUF file
+    """
+    model_path = Path(model_path)
+    output_dir = Path(output_dir) if output_dir else converted_path(model_path)
+    output_file = output_dir / f"{model_path.name}-{quantization}.gguf"
+
+    if output_file.exists() and not force:
+        return output_file
+
+    llama_cpp_dir = Path(llama_cpp_dir or os.environ.get("LLAMA_CPP_DIR", "./llama.cpp")).expanduser()
+    converter = llama_cpp_dir / "convert_hf_to_gguf.py"
+    if not converter.exists():
+        raise FileNotFoundError(f"convert_hf_to_gguf.py not found in {llama_cpp_dir} (set LLAMA_CPP_DIR)")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    direct = quantization.lower() in DIRECT_QUANTIZATIONS
+    intermediate = output_file if direct else output_dir / f"{model_path.name}-f16.gguf"
+
+    print(f"🔧 Converting {model_path.name} to GGUF ({quantization})...")
+    if force or not intermediate.exists():
+        subprocess.run([
+            sys.executable, str(converter), str(model_path),
+            "--outfile", str(intermediate),
+            "--outtype", quantization.lower() if direct else "f16"
+        ], check=True)
+
+    if not direct:
+        subprocess.run([_quantize_binary(llama_cpp_dir), str(intermediate), str(output_file), quantization],
+                       check=True)
+        if not keep_f16:
+            intermediate.unlink()
+
+    for name in TOKENIZER_FILES:
+        if (model_path / name).exists():
+            shutil.copy2(model_path / name, output_dir / name)
+
+    print(f"✅ GGUF model saved to {output_file}")
+    return output_file
+
+
+class ApertusGGUFTranslator(ApertusTranslator):
+    """
+    Apertus8B through llama.cpp for CPU-only nodes.
+
+    Chunking, prompts, stopping rules, translation memory and the result
+    dict are those of ApertusTranslator; only generation is replaced.
+    llama.cpp keeps the previous prompt's key/values and only evaluates
+    tokens after the longest common prefix, so the instruction prefix is
+    reused without the transformers prefix cache.
+    """
+
+    def __init__(self, model_path=None, gguf_path=None, quantization=DEFAULT_QUANTIZATION,
+                 n_threads=None, n_ctx=4096, translation_memory=None, **kwargs):
+        """
+        Args:
+            model_path: Transformers checkpoint (tokenizer fallback, default GGUF location)
+            gguf_path: GGUF file or directory (default: APERTUS_GGUF_PATH or <model_path>-gguf)
+            quantization: Preferred export when gguf_path is a directory
+            n_threads: CPU threads for llama.cpp (default: all cores)
+            n_ctx: Context window in tokens
+            translation_memory: Optional translation_memory.TranslationMemory
+            **kwargs: Other ApertusTranslator options (stop markers, token ratio)
+        """
+        kwargs["prefix_cache_size"] = 0
+        super().__init__(model_path=model_path, translation_memory=translation_memory, **kwargs)
+
+        self.gguf_path = Path(gguf_path or os.environ.get("APERTUS_GGUF_PATH") or converted_path(self.model_path))
+        self.gguf_file = None
+        self.quantization = quantization
+        self.n_threads = n_threads or os.cpu_count()
+        self.n_ctx = n_ctx
+        self.device = "cpu"
+        self.backend = "llama.cpp"
+
+        print(f"🦙 GGUF: {self.gguf_path} ({self.n_threads} threads)")
+
+    def _load_model(self):
+        """Load the GGUF model and the Hugging Face tokenizer (for the chat template; called under _load_lock)."""
+        if Llama is None:
+            print("❌ llama-cpp-python is not installed (pip install llama-cpp-python)")
+            return False
+
+        gguf_file = find_gguf(self.gguf_path, self.quantization)
+        if gguf_file is None:
+            print(f"❌ No GGUF model found at {self.gguf_path}")
+            print(f"   Convert one with: python apertus_gguf.py --model-path {self.model_path}")
+            return False
+
+        try:
+            print(f"⏳ Loading Apertus8B GGUF ({gguf_file.name})...")
+            start_time = time.time()
+            rss_before = current_rss_mb()
+
+            tokenizer_dir = gguf_file.parent if (gguf_file.parent / "tokenizer_config.json").exists() \
+                else self.model_path
+            self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_dir)
+
+            self.model = Llama(
+                model_path=str(gguf_file),
+                n_ctx=self.n_ctx,
+                n_threads=self.n_threads,
+                verbose=False
+            )
+            self.gguf_file = gguf_file
+
+            # llama.cpp maps the file too; pages are counted as they are first touched
+            self._record_load(start_time, rss_before, "gguf")
+            print(f"📦 File size: {gguf_file.stat().st_size / 1e9:.1f} GB")
+            return True
+
+        except Exception as e:
+            print(f"❌ Failed to load model: {str(e)}")
+            self.model = None
+            return False
+
+    def _tm_params(self, max_tokens, hint=None, prompt=None):
+        """Translation-memory key; outputs of a quantized export are kept apart."""
+        return {**super()._tm_params(max_tokens, hint, prompt), "gguf": self.gguf_file.name if self.gguf_file else None}
+
+    def _prompt_tokens(self, chunk, src_name, tgt_name, hint=None):
+        """llama.cpp token ids of the chat-formatted prompt."""
+        prompt = self._build_prompt(chunk, src_name, tgt_name, hint)
+        # The chat template usually writes the BOS token itself
+        bos = self.tokenizer.bos_token
+        add_bos = not (bos and prompt.startswith(bos))
+        return self.model.tokenize(prompt.encode("utf-8"), add_bos=add_bos, special=True)
+
+    def _sampling_kwargs(self):
+        """llama.cpp equivalents of generation_config."""
+        if not self.generation_config.get("do_sample"):
+            return {"temperature": 0.0}
+        return {
+            "temperature": self.generation_config.get("temperature", 1.0),
+            "top_p": self.generation_config.get("top_p", 1.0)
+        }
+
+    def _stream_chunk(self, chunk, src_name, tgt_name, max_tokens, hint=None, progress=None):
+        """Yield the raw output of one chunk as it grows, stopping after the first line."""
+        max_new_tokens = self._new_token_budget(chunk, max_tokens)
+        stopped = False
+        generated = 0
+        text = ""
+
+        for piece in self.model.create_completion(
+            self._prompt_tokens(chunk, src_name, tgt_name, hint),
+            max_tokens=max_new_tokens,
+            stream=True,
+            **self._sampling_kwargs()
+        ):
+            generated += 1
+            text += piece["choices"][0]["text"]
+            yield text
+            if ends_first_line(text, self.stop_markers):
+                stopped = True
+                break
+
+        if progress is not None:
+            progress.update(max_new_tokens=max_new_tokens, stopped=stopped, generated_tokens=generated)
+
+    def _translate_chunk(self, chunk, src_name, tgt_name, max_tokens, hint=None, stats=None):
+        """Generate the translation of a single chunk."""
+        progress = {}
+        output = ""
+        for output in self._stream_chunk(chunk, src_name, tgt_name, max_tokens, hint, progress):
+            pass
+        self._record_generation(stats, progress["max_new_tokens"], progress["stopped"],
+                                progress["generated_tokens"])
+        return self._clean_output(output)
+
+    def _translate_chunks(self, chunks, src_name, tgt_name, max_tokens, hint=None, stats=None):
+        """
+        Translate chunks in order.
+
+        llama.cpp decodes one sequence at a time across all its threads, so
+        there is no batching; a failing chunk only loses its own translation.
+        """
+        results = []
+        for i, chunk in enumerate(chunks, 1):
+            if len(chunks) > 5 and i % 5 == 0:
+                print(f"   Progress: {i}/{len(chunks)} chunks translated...")
+            try:
+                results.append(self._translate_chunk(chunk, src_name, tgt_name, max_tokens, hint, stats))
+            except Exception as e:
+                print(f"⚠️  Error translating chunk {i}: {str(e)}")
+                results.append(f"[Translation error: {str(e)}]")
+        return results
+
+    def translate(self, text, src_lang='de', tgt_lang='rm-sursilv', max_tokens=512, hint=None):
+        """Translate text (see ApertusTranslator.translate); the result names the GGUF file."""
+        result = super().translate(text, src_lang, tgt_lang, max_tokens, hint)
+        if "error" not in result:
+            result["model_type"] = f"Causal LLM (1811 languages, GGUF {self.gguf_file.name})"
+        return result
+
+
+def main():
+    """Convert an Apertus checkpoint to GGUF."""
+    parser = argparse.ArgumentParser(description="Export Apertus8B to GGUF for llama.cpp")
+    parser.add_argument("--model-path", default=os.environ.get("APERTUS_PATH", "./models/apertus-8b"),
+                        help="Transformers checkpoint (default: APERTUS_PATH or ./models/apertus-8b)")
+    parser.add_argument("--output-dir", help=f"Output directory (default: <model-path>{GGUF_SUFFIX})")
+    parser.add_argument("--quantization", nargs="+", default=[DEFAULT_QUANTIZATION],
+                        help=f"One or more llama.cpp types, e.g. Q4_K_M Q8_0 (default: {DEFAULT_QUANTIZATION})")
+    parser.add_argument("--llama-cpp-dir", help="llama.cpp checkout (default: LLAMA_CPP_DIR or ./llama.cpp)")
+    parser.add_argument("--force", action="store_true", help="Re-convert existing exports")
+    args = parser.parse_args()
+
+    model_path = Path(args.model_path)
+    if not (model_path / "config.json").exists():
+        print(f"❌ Model not found: {model_path}")
+        sys.exit(1)
+
+    original_mb = sum(f.stat().st_size for f in model_path.glob("*.safetensors")) / 1e6
+    for quantization in args.quantization:
+        try:
+            output_file = convert_model(model_path, args.output_dir, quantization,
+                                        args.llama_cpp_dir, force=args.force,
+                                        keep_f16=len(args.quantization) > 1)
+        except (FileNotFoundError, subprocess.CalledProcessError) as e:
+            print(f"❌ {quantization}: {e}")
+            continue
+        print(f"📦 {quantization}: {original_mb:,.0f} MB → {output_file.stat().st_size / 1e6:,.0f} MB")
+
+    # The shared f16 export was only kept between quantizations
+    intermediate = (Path(args.output_dir) if args.output_dir else converted_path(model_path)) / f"{model_path.name}-f16.gguf"
+    if len(args.quantization) > 1 and "f16" not in [q.lower() for q in args.quantization] and intermediate.exists():
+        intermediate.unlink()
+
+
+if __name__ == "__main__":
+    main()
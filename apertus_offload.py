@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Disk Offloading Support for Apertus8B
+Background prefetching of disk-offloaded decoder layers and per-layer timing,
+for hosts that cannot keep the whole model in RAM
+"""
+
+import os
+import time
+import queue
+import threading
+from functools import partial
+
+
+def total_ram_gb():
+    """Physical memory of the host in GB (0 where unavailable)."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024 ** 3
+    except (ValueError, OSError, AttributeError):
+        return 0.0
+
+
+def _decoder_layers(model):
+    """The decoder layer list of a causal LM (model.model.layers)."""
+    base = getattr(model, "model", model)
+    return list(getattr(base, "layers", []))
+
+
+def _weights_map(layer):
+    """Disk-offloaded weights of a layer as placed by accelerate, or None if resident."""
+    hook = getattr(layer, "_hf_hook", None)
+    for h in getattr(hook, "hooks", [hook]):
+        if getattr(h, "offload", False) and getattr(h, "weights_map", None) is not None:
+            return h.weights_map
+    return None
+
+
+class LayerPrefetcher:
+    """
+    Reads offloaded decoder layers from disk ahead of use.
+
+    accelerate loads an offloaded layer's weights when its forward starts
+    and drops them afterwards, so only a window of layers is resident at a
+    time. When layer ``i`` starts, a background thread reads the weights of
+    the next ``window`` offloaded layers (wrapping around to the first
+    layers for the next token), so they come from the page cache instead
+    of the disk when their turn comes.
+
+    Forward time is also recorded per layer kind, to estimate how much
+    slower decoding is than with every layer in RAM.
+    """
+
+    def __init__(self, model, window=2):
+        """
+        Attach the prefetcher to a model dispatched with disk offload.
+
+        Args:
+            model: Causal LM loaded with device_map / offload_folder
+            window: Offloaded layers to read ahead of the running one
+        """
+        self.layers = _decoder_layers(model)
+        self.offloaded = {i for i, layer in enumerate(self.layers) if _weights_map(layer) is not None}
+        self.window = window
+
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._started = {}
+        self._hooks = []
+        for i, layer in enumerate(self.layers):
+            self._hooks.append(layer.register_forward_pre_hook(partial(self._before, i)))
+            self._hooks.append(layer.register_forward_hook(partial(self._after, i)))
+
+        self._worker = threading.Thread(target=self._run, name="apertus-prefetch", daemon=True)
+        self._worker.start()
+
+        self.stats = {"prefetched_layers": 0, "resident_time": 0.0, "resident_calls": 0,
+                      "offloaded_time": 0.0, "offloaded_calls": 0}
+
+    def _before(self, index, module, args):
+        """Forward pre-hook: queue the next offloaded layers and start the timer."""
+        if self.offloaded:
+            for ahead in range(1, self.window + 1):
+                j = (index + ahead) % len(self.layers)
+                if j in self.offloaded:
+                    with self._lock:
+                        if j in self._pending:
+                            continue
+                        self._pending.add(j)
+                    self._queue.put(j)
+        self._started[index] = time.perf_counter()
+
+    def _after(self, index, module, args, output):
+        """Forward hook: add the layer's time to its kind."""
+        elapsed = time.perf_counter() - self._started.pop(index, time.perf_counter())
+        kind = "offloaded" if index in self.offloaded else "resident"
+        self.stats[f"{kind}_time"] += elapsed
+        self.stats[f"{kind}_calls"] += 1
+
+    def _run(self):
+        """Worker loop: read queued layers' weights so the OS caches them."""
+        while True:
+            index = self._queue.get()
+            if index is None:
+                break
+            layer = self.layers[index]
+            weights_map = _weights_map(layer)
+            try:
+                for name, _ in list(layer.named_parameters()) + list(layer.named_buffers()):
+                    if name in weights_map:
+                        # clone() forces the memory-mapped pages to be read
+                        weights_map[name].clone()
+                self.stats["prefetched_layers"] += 1
+            except Exception as e:
+                print(f"⚠️  Prefetch of layer {index} failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._pending.discard(index)
+
+    def throughput_penalty(self):
+        """
+        Estimated slowdown versus all layers in RAM.
+
+        Total layer time divided by the time the same calls would take at
+        the mean speed of resident layers; None until both kinds have run.
+        """
+        if not self.stats["resident_calls"] or not self.stats["offloaded_calls"]:
+            return None
+        resident_mean = self.stats["resident_time"] / self.stats["resident_calls"]
+        calls = self.stats["resident_calls"] + self.stats["offloaded_calls"]
+        total = self.stats["resident_time"] + self.stats["offloaded_time"]
+        return round(total / (resident_mean * calls), 2)
+
+    def report(self):
+        """Offloading summary for result metadata."""
+        return {
+            "layers": len(self.layers),
+            "offloaded_layers": len(self.offloaded),
+            "prefetch_window": self.window,
+            "prefetched_layers": self.stats["prefetched_layers"],
+            "throughput_penalty": self.throughput_penalty()
+        }
+
+    def stop(self):
+        """Remove the hooks and stop the worker thread."""
+        for hook in self._hooks:
+            hook.remove()
+        self._queue.put(None)
+        self._worker.join()
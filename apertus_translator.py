@@ -6,14 +6,23 @@ Specialized wrapper for Swiss languages including Romansh (Sursilvan)
 
 import os
 import sys
+import copy
+import math
 import time
+import queue
+import resource
+import threading
 import warnings
 from pathlib import Path
+from collections import OrderedDict
 warnings.filterwarnings("ignore")
 
+import language_registry
+from cpu_features import cpu_supports_bf16
+
 try:
     import torch
-    from transformers import AutoModelForCausalLM, AutoTokenizer
+    from transformers import AutoModelForCausalLM, AutoTokenizer, StoppingCriteria, StoppingCriteriaList
     print("✅ Required packages loaded successfully")
 except ImportError as e:
     print("❌ Error: Required packages not installed")
@@ -21,10 +30,77 @@ except ImportError as e:
     sys.exit(1)
 
 try:
-    from text_chunker import SmartTextChunker
+    from text_chunker import SmartTextChunker, deduplicate
 except ImportError:
     # Chunker not available, will process text as single unit
     SmartTextChunker = None
+    deduplicate = None
+
+# Stands in for the chunk when rendering the prompt, to find where the
+# language-pair instruction prefix ends
+PROMPT_SENTINEL = "<<<TRADUCTAL_CHUNK>>>"
+
+# CPU weight loading: float32 (upcast copy), bf16-mmap (bf16 weights read
+# from the memory-mapped safetensors shards, about half the resident memory)
+# or offload (layers beyond a RAM budget stay on disk, see apertus_offload).
+# Both bf16 modes fall back to float32 on CPUs without native bf16
+LOAD_MODES = ["float32", "bf16-mmap", "offload"]
+
+
+def current_rss_mb():
+    """Resident set size of this process (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def cache_length(past_key_values):
+    """Number of positions already in a key/value cache (0 for None or an empty cache)."""
+    if past_key_values is None:
+        return 0
+    if hasattr(past_key_values, "get_seq_length"):
+        return past_key_values.get_seq_length()
+    return past_key_values[0][0].shape[2] if len(past_key_values) else 0
+
+
+def ends_first_line(text, markers=()):
+    """Whether generated text has finished its first line (or hit an end marker)."""
+    return "\n" in text.lstrip() or any(marker in text for marker in markers)
+
+
+class StopOnNewline(StoppingCriteria):
+    """
+    Ends generation for a row once it has written some text followed by a
+    newline, or one of the end-of-translation markers. Only the first line
+    of the output is kept anyway, so anything after it is wasted compute.
+    """
+
+    def __init__(self, tokenizer, prompt_length, markers=()):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.markers = markers
+        self.stopped = None
+
+    def __call__(self, input_ids, scores, **kwargs):
+        if self.stopped is None:
+            self.stopped = [False] * input_ids.shape[0]
+        for row in range(input_ids.shape[0]):
+            if self.stopped[row]:
+                continue
+            text = self.tokenizer.decode(input_ids[row, self.prompt_length:], skip_special_tokens=True)
+            if ends_first_line(text, self.markers):
+                self.stopped[row] = True
+        return torch.tensor(self.stopped, dtype=torch.bool, device=input_ids.device)
 
 
 class ApertusTranslator:
@@ -36,7 +112,11 @@ class ApertusTranslator:
     - German, French, Italian, English
     """
 
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, translation_memory=None, prefix_cache_size=8,
+                 max_new_tokens_ratio=2.0, stop_markers=("###", "</translation>"),
+                 batch_size=8, batch_token_budget=4096, load_mode="float32",
+                 draft_model_path=None, draft_tokens=5, deterministic=False,
+                 ram_budget_gb=None, offload_folder=None, prefetch_layers=2, fuzzy_memory=None):
         # Try multiple paths in order of preference
         if model_path is None:
             # 1. Environment variable
@@ -61,36 +141,73 @@ class ApertusTranslator:
         self.model = None
         self.tokenizer = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.backend = "transformers"
 
-        # Language mappings for Romansh variants
-        self.romansh_variants = {
-            'rm-sursilv': 'Romansh Sursilvan',
-            'rm-vallader': 'Romansh Vallader',
-            'rm-puter': 'Romansh Puter',
-            'rm-surmiran': 'Romansh Surmiran',
-            'rm-sutsilv': 'Romansh Sutsilvan',
-            'rm-rumgr': 'Rumantsch Grischun',
-            'rm': 'Romansh'  # Generic
-        }
+        # CPU load mode (see LOAD_MODES); GPUs always load bf16. The mode
+        # actually used, load time and memory are kept in load_stats
+        self.load_mode = load_mode
+        self.load_stats = None
+
+        # Offload mode: weights beyond ram_budget_gb (default: half the host
+        # RAM) stay on disk; prefetch_layers offloaded layers are read ahead
+        self.ram_budget_gb = ram_budget_gb or float(os.environ.get('APERTUS_RAM_BUDGET_GB', '0')) or None
+        self.offload_folder = Path(offload_folder or os.environ.get(
+            'APERTUS_OFFLOAD_DIR', './cache/apertus_offload'))
+        self.prefetch_layers = prefetch_layers
+        self.prefetcher = None
+
+        # Optional speculative decoding: a small draft model proposes
+        # draft_tokens tokens at a time and Apertus verifies them in one pass
+        draft_model_path = draft_model_path or os.environ.get('APERTUS_DRAFT_PATH')
+        self.draft_model_path = Path(draft_model_path) if draft_model_path else None
+        self.draft_tokens = draft_tokens
+        self.draft_model = None
+        self.draft_tokenizer = None
+
+        # Optional persistent segment cache (translation_memory.TranslationMemory)
+        self.translation_memory = translation_memory
+
+        # Optional near-match lookup per chunk after an exact miss
+        # (translation_memory.FuzzyTranslationMemory)
+        self.fuzzy_memory = fuzzy_memory
 
-        self.supported_languages = {
-            # Core European languages
-            'de': 'German',
-            'fr': 'French',
-            'it': 'Italian',
-            'en': 'English',
-            'es': 'Spanish',
-            'pt': 'Portuguese',
-            # World languages (added Dec 2025)
-            'ru': 'Russian',
-            'zh': 'Chinese',
-            'hi': 'Hindi',
-            'ar': 'Arabic',
-            'ja': 'Japanese',
-            'ko': 'Korean',
-            # Romansh variants
-            **self.romansh_variants
+        # Past key/values of the chat template + instruction for recently used
+        # (src, tgt) pairs, so each chunk only prefills its own tokens
+        self.prefix_cache = OrderedDict()
+        self.prefix_cache_size = prefix_cache_size
+        self.prefix_cache_stats = {"reused": 0, "computed": 0}
+        # Gradio runs several requests at once; the LRU and its counters are shared
+        self._prefix_lock = threading.Lock()
+
+        # Sampling settings (also part of the translation-memory key)
+        self.generation_config = {
+            "temperature": 0.7,
+            "top_p": 0.9,
+            "do_sample": True
         }
+        if deterministic:
+            # Greedy decoding: same output on every run, with or without a draft model
+            self.generation_config = {"do_sample": False}
+
+        # Output budget per chunk: source tokens × ratio (+ a small margin),
+        # never above the caller's max_tokens; generation also stops at the
+        # first newline or end marker
+        self.max_new_tokens_ratio = max_new_tokens_ratio
+        self.stop_markers = tuple(stop_markers)
+
+        # Chunks of similar prompt length are generated together: at most
+        # batch_size rows and batch_token_budget padded prompt tokens per call
+        self.batch_size = batch_size
+        self.batch_token_budget = batch_token_budget
+
+        # Optional shared decode loop for concurrent callers (see enable_continuous_batching)
+        self.batcher = None
+        # Concurrent first requests must not load the model twice
+        self._load_lock = threading.Lock()
+
+        # Languages named in the prompt, from the capability registry
+        self.romansh_variants = language_registry.languages("romansh")
+        self.supported_languages = language_registry.languages("apertus")
 
         print("🇨🇭 Apertus8B Translator for Swiss Languages")
         print(f"📁 Model path: {self.model_path}")
@@ -98,31 +215,68 @@ class ApertusTranslator:
 
     def load_model(self):
         """Load Apertus8B model and tokenizer."""
-        if self.model is not None:
-            print("✅ Model already loaded")
-            return True
+        with self._load_lock:
+            if self.model is not None:
+                print("✅ Model already loaded")
+                return True
+            return self._load_model()
 
+    def _load_model(self):
+        """Load the model and tokenizer (called under _load_lock)."""
         try:
             print("⏳ Loading Apertus8B (8B parameters, ~16GB)...")
             print("   This may take 30-60 seconds on first load...")
             start_time = time.time()
+            rss_before = current_rss_mb()
 
-            # Load tokenizer
+            # Load tokenizer (left padding, so batched prompts all end where generation starts)
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+            self.tokenizer.padding_side = "left"
+            if self.tokenizer.pad_token is None:
+                self.tokenizer.pad_token = self.tokenizer.eos_token
 
-            # Load model with optimizations
-            self.model = AutoModelForCausalLM.from_pretrained(
-                self.model_path,
-                torch_dtype=torch.bfloat16 if self.device == "cuda" else torch.float32,
-                device_map="auto" if self.device == "cuda" else None,
-                low_cpu_mem_usage=True
-            )
+            load_mode = self.load_mode
+            cpu_bf16 = self.device != "cpu" or cpu_supports_bf16()
+            if load_mode == "bf16-mmap" and not cpu_bf16:
+                # Emulated bf16 matmuls are slower than float32 - keep full precision
+                print("⚠️  CPU has no native bf16 support - loading float32 weights instead")
+                load_mode = "float32"
 
-            if self.device == "cpu":
+            # Load model with optimizations
+            if self.device == "cuda":
+                load_mode = "bf16"
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.model_path,
+                    torch_dtype=torch.bfloat16,
+                    device_map="auto",
+                    low_cpu_mem_usage=True
+                )
+            elif load_mode == "offload":
+                if not cpu_bf16:
+                    # Same fallback; offloaded layers are then written to disk as float32
+                    print("⚠️  CPU has no native bf16 support - offloading float32 weights instead")
+                    load_mode = "offload-float32"
+                self._load_offloaded(torch.bfloat16 if cpu_bf16 else torch.float32)
+            elif load_mode == "bf16-mmap":
+                # The checkpoint is stored in bf16: parameters are filled straight
+                # from the mapped shards instead of through a float32 copy
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.model_path,
+                    torch_dtype=torch.bfloat16,
+                    device_map="cpu",
+                    low_cpu_mem_usage=True
+                )
+            else:
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.model_path,
+                    torch_dtype=torch.float32,
+                    low_cpu_mem_usage=True
+                )
                 self.model = self.model.to(self.device)
 
-            load_time = time.time() - start_time
-            print(f"✅ Model loaded in {load_time:.1f}s")
+            self._record_load(start_time, rss_before, load_mode)
+            if self.draft_model_path:
+                self._load_draft_model()
             print(f"📊 Parameters: 8B")
             print(f"🌍 Languages: 1811 (including all Romansh variants)")
 
@@ -132,29 +286,72 @@ class ApertusTranslator:
             print(f"❌ Failed to load model: {str(e)}")
             return False
 
-    def translate(self, text, src_lang='de', tgt_lang='rm-sursilv', max_tokens=512):
-        """
-        Translate text using Apertus8B with smart chunking for long texts.
+    def _record_load(self, start_time, rss_before, load_mode):
+        """Keep and print load time and memory use of the model just loaded."""
+        self.load_stats = {
+            "mode": load_mode,
+            "load_time": round(time.time() - start_time, 2),
+            "rss_mb": round(current_rss_mb()),
+            "model_rss_mb": round(current_rss_mb() - rss_before),
+            "peak_rss_mb": round(peak_rss_mb())
+        }
+        print(f"✅ Model loaded in {self.load_stats['load_time']:.1f}s ({load_mode})")
+        print(f"💾 Memory: {self.load_stats['model_rss_mb']:,} MB resident for the model, "
+              f"peak RSS {self.load_stats['peak_rss_mb']:,} MB")
 
-        Args:
-            text: Source text to translate
-            src_lang: Source language code (de, fr, en, it)
-            tgt_lang: Target language code (rm-sursilv, rm-vallader, etc.)
-            max_tokens: Maximum output tokens
+    def _load_offloaded(self, dtype):
+        """
+        Load with accelerate placing layers in RAM up to the budget and the rest on disk.
 
-        Returns:
-            dict with translation results and metadata
+        With bf16 (as stored) offloaded layers can be read from the original
+        safetensors shards; float32 layers (CPUs without bf16) are written to
+        the offload folder first. A LayerPrefetcher reads them ahead.
         """
-        if not self.model:
-            if not self.load_model():
-                return {"error": "Failed to load model"}
+        from apertus_offload import LayerPrefetcher, total_ram_gb
 
-        # Validate languages
-        src_name = self.supported_languages.get(src_lang, src_lang)
-        tgt_name = self.supported_languages.get(tgt_lang, tgt_lang)
+        budget = self.ram_budget_gb or max(total_ram_gb() / 2, 1)
+        self.offload_folder.mkdir(parents=True, exist_ok=True)
+        print(f"💽 Offload mode: {budget:.1f} GB RAM budget, rest in {self.offload_folder}")
 
-        start_time = time.time()
+        self.model = AutoModelForCausalLM.from_pretrained(
+            self.model_path,
+            torch_dtype=dtype,
+            device_map="auto",
+            max_memory={"cpu": f"{budget:.1f}GiB"},
+            offload_folder=str(self.offload_folder),
+            offload_state_dict=True,
+            low_cpu_mem_usage=True
+        )
+        self.prefetcher = LayerPrefetcher(self.model, window=self.prefetch_layers)
+        report = self.prefetcher.report()
+        print(f"   {report['offloaded_layers']} of {report['layers']} decoder layers on disk, "
+              f"prefetching {self.prefetch_layers} ahead")
 
+    def _load_draft_model(self):
+        """Load the speculative-decoding draft model; on failure, decode without it."""
+        try:
+            print(f"⏳ Loading draft model: {self.draft_model_path}")
+            self.draft_tokenizer = AutoTokenizer.from_pretrained(self.draft_model_path)
+            self.draft_model = AutoModelForCausalLM.from_pretrained(
+                self.draft_model_path,
+                torch_dtype=self.model.dtype,
+                low_cpu_mem_usage=True
+            ).to(self.model.device)
+            self.draft_model.generation_config.num_assistant_tokens = self.draft_tokens
+
+            if self.draft_tokenizer.get_vocab() != self.tokenizer.get_vocab():
+                print("⚠️  Draft tokenizer differs from Apertus - candidates are re-tokenized (slower)")
+            else:
+                # Same vocabulary: token ids are exchanged directly
+                self.draft_tokenizer = None
+            print(f"✅ Speculative decoding on ({self.draft_tokens} draft tokens per step)")
+        except Exception as e:
+            print(f"⚠️  Could not load draft model ({str(e)}) - decoding without it")
+            self.draft_model = None
+            self.draft_tokenizer = None
+
+    def _chunk_text(self, text):
+        """Split text into (chunk, chunk_type) pairs that fit the model input."""
         # Use smart chunking if available
         if SmartTextChunker:
             chunker = SmartTextChunker(max_tokens=400, tokenizer=self.tokenizer)
@@ -166,91 +363,693 @@ class ApertusTranslator:
         else:
             # Process as single chunk
             chunks = [(text, 'full')]
+        return chunks
 
-        translations = []
+    def _join_chunks(self, translations, chunks):
+        """Join chunk translations, preserving paragraph breaks for paragraph-level chunks."""
+        if SmartTextChunker and any(ct == 'paragraph' for _, ct in chunks):
+            # Preserve paragraph structure
+            result = []
+            for translation, (_, chunk_type) in zip(translations, chunks):
+                result.append(translation)
+                if chunk_type == 'paragraph':
+                    result.append('\n\n')
+            return ''.join(result).strip()
+        # Standard joining
+        return ' '.join(translations)
 
-        for i, (chunk, chunk_type) in enumerate(chunks, 1):
-            if not chunk.strip():
-                continue
+    def _build_prompt(self, chunk, src_name, tgt_name, hint=None):
+        """Chat-formatted translation prompt for one chunk."""
+        # Create translation prompt
+        prompt = f"""Translate the following text from {src_name} to {tgt_name}.
+Provide only the translation, without explanations.
+
+{src_name}: {chunk}
+{tgt_name}:"""
+
+        if hint:
+            # Show a similar, already translated segment as a reference
+            prompt = f"""Reference translation of a similar text:
+{src_name}: {hint['source']}
+{tgt_name}: {hint['translation']}
 
-            # Show progress for long texts
-            if len(chunks) > 5 and i % 5 == 0:
-                print(f"   Progress: {i}/{len(chunks)} chunks translated...")
+""" + prompt
+
+        # Prepare messages for chat template
+        messages = [
+            {"role": "user", "content": prompt}
+        ]
+
+        # Apply chat template
+        return self.tokenizer.apply_chat_template(
+            messages,
+            tokenize=False,
+            add_generation_prompt=True
+        )
+
+    def _build_variant_prompt(self, chunk, src_name, tgt_name):
+        """
+        Chat-formatted prompt that names the target language after the chunk.
 
-            # Create translation prompt
-            prompt = f"""Translate the following text from {src_name} to {tgt_name}.
+        Used by translate_variants: the prompts of one chunk for several
+        targets then share everything up to the target name, source included.
+        """
+        prompt = f"""Translate the following {src_name} text.
 Provide only the translation, without explanations.
 
 {src_name}: {chunk}
+
+Target language: {tgt_name}
 {tgt_name}:"""
 
+        return self.tokenizer.apply_chat_template(
+            [{"role": "user", "content": prompt}],
+            tokenize=False,
+            add_generation_prompt=True
+        )
+
+    def _clean_output(self, translation):
+        """Keep only the first substantial line of the model output."""
+        # Clean up translation (remove any trailing explanations)
+        translation = translation.strip()
+        # If translation contains multiple lines, take first substantial one
+        lines = [l.strip() for l in translation.split('\n') if l.strip()]
+        if lines:
+            translation = lines[0]
+        for marker in self.stop_markers:
+            translation = translation.split(marker)[0].strip()
+        return translation
+
+    def _tm_params(self, max_tokens, hint=None, prompt=None):
+        """
+        Settings that affect the output, used as the translation-memory key.
+
+        ``prompt`` names a prompt other than _build_prompt's (e.g. "variants"),
+        so its outputs never answer a plain translate() lookup.
+        """
+        params = {
+            **self.generation_config,
+            # Weight precision changes the output: the mode actually loaded, after fallbacks
+            "load_mode": self.load_stats["mode"] if self.load_stats else self.load_mode,
+            "max_new_tokens": max_tokens,
+            "max_new_tokens_ratio": self.max_new_tokens_ratio,
+            "stop_markers": list(self.stop_markers)
+        }
+        if hint:
+            params["hint"] = hint["source"]
+        if prompt:
+            params["prompt"] = prompt
+        return params
+
+    def _fuzzy_lookup(self, chunk, src_lang, tgt_lang, max_tokens, stats):
+        """
+        Near match of a chunk under its own translation-memory key, or None.
+
+        Matches are reported in ``stats['fuzzy_matches']``; 'return' and
+        'flag' matches are counted as fuzzy hits (used instead of the model).
+        """
+        if self.fuzzy_memory is None:
+            return None
+        match = self.fuzzy_memory.lookup(chunk, src_lang, tgt_lang, "apertus", self.model_path.name,
+                                         self._tm_params(max_tokens))
+        if match is not None:
+            stats.setdefault("fuzzy_matches", []).append(match)
+            if match["mode"] != "hint":
+                stats["fuzzy_hits"] = stats.get("fuzzy_hits", 0) + 1
+                stats["needs_review"] = stats.get("needs_review", False) or match["needs_review"]
+        return match
+
+    def _new_token_budget(self, chunk, max_tokens):
+        """max_new_tokens for a chunk, proportional to its length in tokens."""
+        if not self.max_new_tokens_ratio:
+            return max_tokens
+        source_tokens = len(self.tokenizer(chunk, add_special_tokens=False)["input_ids"])
+        return min(max_tokens, max(16, math.ceil(source_tokens * self.max_new_tokens_ratio) + 8))
+
+    def _generation_kwargs(self, max_new_tokens, prompt_length):
+        """generate() settings for prompts of a given (padded) length, and the stopping criterion."""
+        stopper = StopOnNewline(self.tokenizer, prompt_length, self.stop_markers)
+        kwargs = {
+            "max_new_tokens": max_new_tokens,
+            **self.generation_config,
+            "stopping_criteria": StoppingCriteriaList([stopper]),
+            "pad_token_id": self.tokenizer.pad_token_id,
+            "eos_token_id": self.tokenizer.eos_token_id
+        }
+        if self.draft_model is not None:
+            kwargs["assistant_model"] = self.draft_model
+            if self.draft_tokenizer is not None:
+                kwargs["tokenizer"] = self.tokenizer
+                kwargs["assistant_tokenizer"] = self.draft_tokenizer
+        return kwargs, stopper
+
+    def _record_generation(self, stats, max_new_tokens, stopped, generated_tokens):
+        """Accumulate per-chunk generation figures into a result's stats."""
+        if stats is None:
+            return
+        stats["max_new_tokens"] = max(stats.get("max_new_tokens", 0), max_new_tokens)
+        stats["generated_tokens"] = stats.get("generated_tokens", 0) + generated_tokens
+        stats["stopped_early"] = stats.get("stopped_early", 0) + int(bool(stopped))
+
+    def _prefix_cache_entry(self, src_name, tgt_name):
+        """
+        Token ids and past key/values of a language pair's prompt prefix.
+
+        The prefix is everything the chat template puts before the chunk.
+        With ``tgt_name=None`` it is the prefix of the translate_variants
+        prompt, which does not depend on the target. Entries are kept in an
+        LRU of ``prefix_cache_size`` language pairs.
+        """
+        key = (src_name, tgt_name)
+        # A miss is prefilled under the lock so concurrent requests compute it only once
+        with self._prefix_lock:
+            entry = self.prefix_cache.get(key)
+            if entry is not None:
+                self.prefix_cache.move_to_end(key)
+                return entry
+
+            if tgt_name is None:
+                template = self._build_variant_prompt(PROMPT_SENTINEL, src_name, "")
+            else:
+                template = self._build_prompt(PROMPT_SENTINEL, src_name, tgt_name)
+            prefix_text = template.split(PROMPT_SENTINEL)[0]
+            return self._cache_prefix(key, self.tokenizer(prefix_text).input_ids)
+
+    def _count_prefix_reuse(self, rows=1):
+        """Count ``rows`` prompts that started from a cached prefix."""
+        with self._prefix_lock:
+            self.prefix_cache_stats["reused"] += rows
+
+    def _cache_prefix(self, key, prefix_ids):
+        """Prefill ``prefix_ids`` and keep (ids, past key/values) in the LRU under ``key`` (called under _prefix_lock)."""
+        input_ids = torch.tensor([prefix_ids], device=self.model.device)
+        with torch.no_grad():
+            past_key_values = self.model(input_ids=input_ids, use_cache=True).past_key_values
+
+        entry = (list(prefix_ids), past_key_values)
+        self.prefix_cache_stats["computed"] += 1
+        if self.prefix_cache_size:
+            self.prefix_cache[key] = entry
+            if len(self.prefix_cache) > self.prefix_cache_size:
+                self.prefix_cache.popitem(last=False)
+        return entry
+
+    def _model_inputs(self, chunk, src_name, tgt_name, hint=None):
+        """
+        Tokenized prompt for one chunk, as generate() keyword arguments.
+
+        When the prompt starts with the cached prefix of its language pair,
+        a copy of the prefix key/values is passed along so only the chunk
+        tokens are prefilled. Prompts with a hint are not cached.
+        """
+        text_input = self._build_prompt(chunk, src_name, tgt_name, hint)
+
+        # Tokenize
+        model_inputs = dict(self.tokenizer(
+            [text_input],
+            return_tensors="pt",
+            padding=True,
+            truncation=True
+        ).to(self.model.device))
+
+        # Assisted generation starts the draft model from the full prompt - keep both caches aligned
+        if hint or not self.prefix_cache_size or self.draft_model is not None:
+            return model_inputs
+
+        prefix_ids, past_key_values = self._prefix_cache_entry(src_name, tgt_name)
+        input_ids = model_inputs["input_ids"][0].tolist()
+
+        # Token boundaries can shift where prefix and chunk meet - reuse only exact matches
+        if len(input_ids) > len(prefix_ids) and input_ids[:len(prefix_ids)] == prefix_ids:
+            # generate() extends the cache in place, so each call gets its own copy
+            model_inputs["past_key_values"] = copy.deepcopy(past_key_values)
+            self._count_prefix_reuse()
+
+        return model_inputs
+
+    def _translate_chunk(self, chunk, src_name, tgt_name, max_tokens, hint=None, stats=None):
+        """Generate the translation of a single chunk."""
+        model_inputs = self._model_inputs(chunk, src_name, tgt_name, hint)
+        max_new_tokens = self._new_token_budget(chunk, max_tokens)
+        kwargs, stopper = self._generation_kwargs(max_new_tokens, model_inputs["input_ids"].shape[1])
+
+        # Count forward passes: every Apertus pass adds one token of its own, and each
+        # pass on a non-empty cache is a decode step verifying one round of draft tokens
+        calls = {"prefill": 0, "target": 0, "draft": 0}
+        hooks = []
+        if self.draft_model is not None:
+            def count_target(module, args, kwargs):
+                name = "target" if cache_length(kwargs.get("past_key_values")) else "prefill"
+                calls[name] += 1
+
+            hooks.append(self.model.register_forward_pre_hook(count_target, with_kwargs=True))
+            # The draft model proposes one token per forward pass
+            hooks.append(self.draft_model.register_forward_hook(
+                lambda *_: calls.__setitem__("draft", calls["draft"] + 1)))
+
+        # Generate translation
+        try:
+            with torch.no_grad():
+                generated_ids = self.model.generate(**model_inputs, **kwargs)
+        finally:
+            for hook in hooks:
+                hook.remove()
+
+        # Decode output (skip input prompt)
+        output_ids = generated_ids[0][len(model_inputs["input_ids"][0]):]
+        translation = self.tokenizer.decode(output_ids, skip_special_tokens=True)
+        self._record_generation(stats, max_new_tokens, stopper.stopped and stopper.stopped[0], len(output_ids))
+        if hooks and stats is not None:
+            # Every round yields its accepted draft tokens plus one token from Apertus
+            speculative = stats.setdefault("speculative", {"rounds": 0, "decoded_tokens": 0,
+                                                           "drafted_tokens": 0, "accepted_tokens": 0})
+            decoded = max(len(output_ids) - calls["prefill"], 0)
+            speculative["rounds"] += calls["target"]
+            speculative["decoded_tokens"] += decoded
+            speculative["drafted_tokens"] += calls["draft"]
+            speculative["accepted_tokens"] += max(decoded - calls["target"], 0)
+
+        return self._clean_output(translation)
+
+    def _plan_batches(self, lengths):
+        """
+        Group row indices into batches of similar prompt length.
+
+        Rows are sorted longest first; a batch is closed when it reaches
+        ``batch_size`` rows or its padded width × rows would exceed
+        ``batch_token_budget``.
+
+        Returns:
+            List of index lists, each one a batch for a single generate() call
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+        # Assisted generation handles one sequence at a time
+        batch_size = 1 if self.draft_model is not None else self.batch_size
+
+        batches = []
+        current = []
+        for idx in order:
+            # The first row of a batch is its longest, so it sets the padded width
+            width = lengths[current[0]] if current else lengths[idx]
+            if current and (len(current) >= batch_size
+                            or width * (len(current) + 1) > self.batch_token_budget):
+                batches.append(current)
+                current = []
+            current.append(idx)
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+    def _generate_batch(self, prompts, chunks, src_name, tgt_name, max_tokens, hint=None, stats=None):
+        """
+        Generate translations for several prompts in one generate() call.
+
+        The batch runs to the largest per-chunk token budget; each row's
+        output is cut back to its own budget so results match the
+        one-chunk-at-a-time path. When every prompt starts with the cached
+        prefix of the language pair, the prefix key/values are repeated
+        across the batch (see _generate_after_prefix); otherwise the prompts
+        are left-padded and prefilled in full.
+        """
+        budgets = [self._new_token_budget(chunk, max_tokens) for chunk in chunks]
+
+        # Same conditions as _model_inputs: hinted prompts and assisted generation start from scratch
+        if not hint and self.prefix_cache_size and self.draft_model is None:
+            prefix_ids, past_key_values = self._prefix_cache_entry(src_name, tgt_name)
+            ids = self.tokenizer(prompts, truncation=True)["input_ids"]
+            # Token boundaries can shift where prefix and chunk meet - reuse only exact matches
+            if all(len(row_ids) > len(prefix_ids) and row_ids[:len(prefix_ids)] == prefix_ids for row_ids in ids):
+                self._count_prefix_reuse(len(prompts))
+                return self._generate_after_prefix(
+                    prefix_ids, past_key_values, [row_ids[len(prefix_ids):] for row_ids in ids], budgets, stats)
+
+        model_inputs = self.tokenizer(
+            prompts,
+            return_tensors="pt",
+            padding=True,
+            truncation=True
+        ).to(self.model.device)
+        prompt_length = model_inputs["input_ids"].shape[1]
+
+        kwargs, stopper = self._generation_kwargs(max(budgets), prompt_length)
+
+        with torch.no_grad():
+            generated_ids = self.model.generate(**model_inputs, **kwargs)
+
+        return self._decode_rows(generated_ids, prompt_length, budgets, stopper, stats)
+
+    def _generate_after_prefix(self, prefix_ids, past_key_values, suffixes, budgets, stats=None):
+        """
+        Generate translations for prompts that share ``prefix_ids``, in one generate() call.
+
+        ``past_key_values`` holds the prefix for a single row (None to
+        prefill it with the batch) and is repeated across the batch. The
+        remaining prompt tokens are padded in the middle, right after the
+        prefix, with the attention mask hiding the padding.
+        """
+        width = max(len(suffix) for suffix in suffixes)
+        pad = self.tokenizer.pad_token_id
+        input_ids = torch.tensor(
+            [prefix_ids + [pad] * (width - len(suffix)) + suffix for suffix in suffixes],
+            device=self.model.device)
+        attention_mask = torch.tensor(
+            [[1] * len(prefix_ids) + [0] * (width - len(suffix)) + [1] * len(suffix) for suffix in suffixes],
+            device=self.model.device)
+
+        kwargs, stopper = self._generation_kwargs(max(budgets), input_ids.shape[1])
+        if past_key_values is not None:
+            # generate() extends the cache in place - each batch gets its own copy
+            kwargs["past_key_values"] = self._expand_cache(past_key_values, len(suffixes))
+
+        with torch.no_grad():
+            generated_ids = self.model.generate(input_ids=input_ids, attention_mask=attention_mask, **kwargs)
+
+        return self._decode_rows(generated_ids, input_ids.shape[1], budgets, stopper, stats)
+
+    def _decode_rows(self, generated_ids, prompt_length, budgets, stopper, stats=None):
+        """Cleaned translation of each row of a batched generate() output."""
+        translations = []
+        for row, budget in enumerate(budgets):
+            output_ids = generated_ids[row, prompt_length:prompt_length + budget]
+            # Rows that finished early are padded up to the longest one
+            generated = int((output_ids != self.tokenizer.pad_token_id).sum())
+            translations.append(self._clean_output(self.tokenizer.decode(output_ids, skip_special_tokens=True)))
+            self._record_generation(stats, budget, stopper.stopped and stopper.stopped[row], generated)
+        return translations
+
+    def _translate_chunks(self, chunks, src_name, tgt_name, max_tokens, hint=None, stats=None):
+        """
+        Translate chunks with batched generation.
+
+        Batches and single chunks (_translate_chunk) both start from the
+        cached prompt prefix of the language pair. When a batch fails, its chunks are retried one
+        by one so a single bad chunk only loses its own translation.
+
+        Returns:
+            One translation per chunk ("[Translation error: ...]" for failed rows)
+        """
+        if self.batcher is not None:
+            return self._translate_chunks_continuous([(chunk, tgt_name) for chunk in chunks], src_name,
+                                                     max_tokens, hint, stats)
+
+        prompts = [self._build_prompt(chunk, src_name, tgt_name, hint) for chunk in chunks]
+        lengths = [len(ids) for ids in self.tokenizer(prompts)["input_ids"]]
+        batches = self._plan_batches(lengths)
+
+        results = [None] * len(chunks)
+        for n, batch in enumerate(batches, 1):
+            if len(batches) > 1:
+                print(f"   Batch {n}/{len(batches)}: {len(batch)} chunks")
+
+            if len(batch) > 1:
+                try:
+                    translations = self._generate_batch(
+                        [prompts[i] for i in batch], [chunks[i] for i in batch], src_name, tgt_name,
+                        max_tokens, hint, stats)
+                    for i, translation in zip(batch, translations):
+                        results[i] = translation
+                    if stats is not None:
+                        stats["batched_chunks"] = stats.get("batched_chunks", 0) + len(batch)
+                    continue
+                except Exception as e:
+                    print(f"⚠️  Batch {n} failed ({str(e)}) - retrying its chunks one by one")
+
+            for i in batch:
+                try:
+                    results[i] = self._translate_chunk(chunks[i], src_name, tgt_name, max_tokens, hint, stats)
+                except Exception as e:
+                    print(f"⚠️  Error translating chunk {i + 1}: {str(e)}")
+                    results[i] = f"[Translation error: {str(e)}]"
+
+        return results
+
+    def _generate_shared_prefix(self, rows, src_name, max_tokens, stats=None):
+        """
+        Translate (chunk, tgt_name) rows, prefilling each chunk's prompt once for all its targets.
+
+        The variant prompts (_build_variant_prompt) of one chunk are
+        identical up to the target name: chat template, instruction and
+        source text. That prefix is prefilled once per chunk, continuing
+        from the cached instruction prefix of the source language, and its
+        key/values are repeated across the chunk's batch; the remaining
+        prompt tokens are padded in the middle, right after the prefix, with
+        the attention mask hiding the padding. Only the instruction prefix
+        goes into the prefix LRU.
+
+        Returns:
+            One translation per row ("[Translation error: ...]" for failed rows)
+        """
+        groups = {}
+        for i, (chunk, _) in enumerate(rows):
+            groups.setdefault(chunk, []).append(i)
+
+        results = [None] * len(rows)
+        shared_tokens = 0
+        for chunk, group in groups.items():
+            ids = self.tokenizer([self._build_variant_prompt(chunk, src_name, rows[i][1]) for i in group])["input_ids"]
+
+            # Longest common token prefix, leaving every row at least one token of its own
+            prefix_length = min(len(row_ids) for row_ids in ids) - 1
+            for row_ids in ids[1:]:
+                n = 0
+                while n < prefix_length and row_ids[n] == ids[0][n]:
+                    n += 1
+                prefix_length = n
+            prefix_ids = ids[0][:prefix_length]
+            shared_tokens += prefix_length
+
             try:
-                # Prepare messages for chat template
-                messages = [
-                    {"role": "user", "content": prompt}
-                ]
-
-                # Apply chat template
-                text_input = self.tokenizer.apply_chat_template(
-                    messages,
-                    tokenize=False,
-                    add_generation_prompt=True
-                )
+                past_key_values = self._prefill_prefix(prefix_ids, src_name)
+            except Exception as e:
+                print(f"⚠️  Prefill failed ({str(e)}) - translating the chunk's prompts one by one")
+                past_key_values, prefix_ids, prefix_length = None, [], 0
+
+            batches = self._plan_batches([len(row_ids) - prefix_length for row_ids in ids])
+            for n, batch in enumerate(batches, 1):
+                if len(batches) > 1:
+                    print(f"   Batch {n}/{len(batches)}: {len(batch)} prompts")
+                try:
+                    budgets = [self._new_token_budget(chunk, max_tokens)] * len(batch)
+                    translations = self._generate_after_prefix(
+                        prefix_ids, past_key_values, [ids[j][prefix_length:] for j in batch], budgets, stats)
+                    for j, translation in zip(batch, translations):
+                        results[group[j]] = translation
+                except Exception as e:
+                    print(f"⚠️  Batch {n} failed ({str(e)}) - retrying its prompts one by one")
+                    for j in batch:
+                        tgt_name = rows[group[j]][1]
+                        try:
+                            results[group[j]] = self._translate_chunk(chunk, src_name, tgt_name, max_tokens, stats=stats)
+                        except Exception as e:
+                            print(f"⚠️  Error translating chunk for {tgt_name}: {str(e)}")
+                            results[group[j]] = f"[Translation error: {str(e)}]"
 
-                # Tokenize
-                model_inputs = self.tokenizer(
-                    [text_input],
-                    return_tensors="pt",
-                    padding=True,
-                    truncation=True
-                ).to(self.model.device)
-
-                # Generate translation
-                with torch.no_grad():
-                    generated_ids = self.model.generate(
-                        **model_inputs,
-                        max_new_tokens=max_tokens,
-                        temperature=0.7,
-                        top_p=0.9,
-                        do_sample=True,
-                        pad_token_id=self.tokenizer.pad_token_id,
-                        eos_token_id=self.tokenizer.eos_token_id
-                    )
-
-                # Decode output (skip input prompt)
-                output_ids = generated_ids[0][len(model_inputs.input_ids[0]):]
-                translation = self.tokenizer.decode(output_ids, skip_special_tokens=True)
-
-                # Clean up translation (remove any trailing explanations)
-                translation = translation.strip()
-                # If translation contains multiple lines, take first substantial one
-                lines = [l.strip() for l in translation.split('\n') if l.strip()]
-                if lines:
-                    translation = lines[0]
-
-                translations.append(translation)
+        if stats is not None:
+            stats["shared_prefix_tokens"] = shared_tokens
+        return results
+
+    def _prefill_prefix(self, prefix_ids, src_name):
+        """
+        Key/values of a chunk's shared variant-prompt prefix (None if empty).
+
+        Starts from a copy of the cached instruction prefix when the tokens
+        match it; the chunk's own part is not cached.
+        """
+        if not prefix_ids:
+            return None
 
+        past_key_values, start = None, 0
+        if self.prefix_cache_size:
+            instruction_ids, instruction_cache = self._prefix_cache_entry(src_name, None)
+            # Token boundaries can shift where instruction and chunk meet - reuse only exact matches
+            if len(prefix_ids) >= len(instruction_ids) and prefix_ids[:len(instruction_ids)] == instruction_ids:
+                past_key_values, start = copy.deepcopy(instruction_cache), len(instruction_ids)
+                self._count_prefix_reuse()
+
+        if start < len(prefix_ids):
+            with torch.no_grad():
+                past_key_values = self.model(
+                    input_ids=torch.tensor([prefix_ids[start:]], device=self.model.device),
+                    past_key_values=past_key_values,
+                    use_cache=True
+                ).past_key_values
+        return past_key_values
+
+    @staticmethod
+    def _expand_cache(past_key_values, batch_size):
+        """Copy of a single-row key/value cache repeated for ``batch_size`` rows."""
+        past_key_values = copy.deepcopy(past_key_values)
+        if hasattr(past_key_values, "batch_repeat_interleave"):
+            past_key_values.batch_repeat_interleave(batch_size)
+            return past_key_values
+        return tuple((key.repeat(batch_size, 1, 1, 1), value.repeat(batch_size, 1, 1, 1))
+                     for key, value in past_key_values)
+
+    def _translate_chunks_continuous(self, rows, src_name, max_tokens, hint=None, stats=None):
+        """Submit (chunk, tgt_name) rows to the continuous-batching engine, then wait for all of them."""
+        futures = [self.batcher.submit(chunk, src_name, tgt_name, max_tokens, hint) for chunk, tgt_name in rows]
+
+        results = []
+        for i, future in enumerate(futures, 1):
+            try:
+                translation, info = future.result()
+                self._record_generation(stats, info["max_new_tokens"], info["stopped"], info["generated_tokens"])
             except Exception as e:
                 print(f"⚠️  Error translating chunk {i}: {str(e)}")
-                translations.append(f"[Translation error: {str(e)}]")
+                translation = f"[Translation error: {str(e)}]"
+            results.append(translation)
+        return results
+
+    def enable_continuous_batching(self, max_batch_size=16):
+        """
+        Decode the chunks of all concurrent translate() calls in one shared batch.
+
+        Sequences join the running batch at token boundaries and leave as
+        soon as they finish; streamed chunks go through the same batch.
+        Speculative decoding is not used while the engine is on.
+
+        Returns:
+            The ApertusContinuousBatcher, or None if unavailable
+        """
+        if self.batcher is None:
+            if self.backend != "transformers":
+                print(f"⚠️  Continuous batching needs the transformers backend (not {self.backend})")
+                return None
+            if not self.model and not self.load_model():
+                return None
+            if self.draft_model is not None:
+                print("⚠️  Continuous batching replaces speculative decoding for translate()")
+            from apertus_continuous_batching import ApertusContinuousBatcher
+            self.batcher = ApertusContinuousBatcher(self, max_batch_size=max_batch_size)
+            print(f"🔄 Continuous batching enabled: up to {max_batch_size} sequences per step")
+        return self.batcher
+
+    def _stream_chunk(self, chunk, src_name, tgt_name, max_tokens, hint=None):
+        """Yield the raw output of one chunk as it grows."""
+        if self.batcher is not None:
+            # Decoded in the shared batch; partial outputs arrive through a queue
+            updates = queue.Queue()
+            future = self.batcher.submit(chunk, src_name, tgt_name, max_tokens, hint, on_text=updates.put)
+            future.add_done_callback(lambda _: updates.put(None))
+            for text in iter(updates.get, None):
+                yield text
+            future.result()
+            return
+
+        from streaming import stream_generate
+
+        model_inputs = self._model_inputs(chunk, src_name, tgt_name, hint)
+        kwargs, _ = self._generation_kwargs(self._new_token_budget(chunk, max_tokens),
+                                            model_inputs["input_ids"].shape[1])
+        yield from stream_generate(self.model, self.tokenizer, **model_inputs, **kwargs)
+
+    def translate(self, text, src_lang='de', tgt_lang='rm-sursilv', max_tokens=512, hint=None):
+        """
+        Translate text using Apertus8B with smart chunking for long texts.
+
+        Args:
+            text: Source text to translate
+            src_lang: Source language code (de, fr, en, it)
+            tgt_lang: Target language code (rm-sursilv, rm-vallader, etc.)
+            max_tokens: Maximum output tokens per chunk (the budget scales with the chunk length up to this)
+            hint: Optional fuzzy translation-memory match ({'source', 'translation'})
+                  shown to the model as a reference example for every chunk;
+                  without one, each chunk that misses the translation memory
+                  is looked up in the fuzzy memory (if any)
+
+        Returns:
+            dict with translation results and metadata
+        """
+        if not self.model:
+            if not self.load_model():
+                return {"error": "Failed to load model"}
+
+        # Validate languages
+        src_name = self.supported_languages.get(src_lang, src_lang)
+        tgt_name = self.supported_languages.get(tgt_lang, tgt_lang)
+
+        start_time = time.time()
+        prefix_reused = self.prefix_cache_stats["reused"]
+
+        chunks = self._chunk_text(text)
+
+        # Translate each distinct chunk once, then fan results back out
+        if deduplicate:
+            unique_chunks, positions = deduplicate([chunk for chunk, _ in chunks])
+        else:
+            unique_chunks, positions = [chunk for chunk, _ in chunks], list(range(len(chunks)))
+        model_calls_saved = len(chunks) - len(unique_chunks)
+        if model_calls_saved:
+            print(f"♻️  {model_calls_saved} repeated chunks translated once")
+
+        unique_translations = [None] * len(unique_chunks)
+        cache_hits = 0
+        cache_misses = 0
+        generation_stats = {}
+        fuzzy_stats = {}
+        tm = self.translation_memory
+        tm_params = self._tm_params(max_tokens, hint)
+
+        pending = []
+        chunk_hints = {}
+        for i, chunk in enumerate(unique_chunks):
+            if not chunk.strip():
+                unique_translations[i] = ""
+                continue
+
+            # Reuse a stored translation of this chunk if there is one
+            if tm:
+                cached = tm.get("apertus", self.model_path.name, src_lang, tgt_lang, chunk, tm_params)
+                if cached is not None:
+                    cache_hits += 1
+                    unique_translations[i] = cached
+                    continue
+                cache_misses += 1
+
+            # Then a near match: used as is, or shown to the model for this chunk
+            match = self._fuzzy_lookup(chunk, src_lang, tgt_lang, max_tokens, fuzzy_stats) if hint is None else None
+            if match and match["mode"] != "hint":
+                unique_translations[i] = match["translation"]
+                continue
+            if match:
+                chunk_hints[i] = match
+            pending.append(i)
+
+        # Chunks with their own hint get their own prompt; the others are batched together
+        groups = [([i for i in pending if i not in chunk_hints], hint)]
+        groups += [([i], chunk_hints[i]) for i in pending if i in chunk_hints]
+        for indices, chunk_hint in groups:
+            if not indices:
+                continue
+            generated = self._translate_chunks([unique_chunks[i] for i in indices], src_name, tgt_name,
+                                               max_tokens, chunk_hint, stats=generation_stats)
+            params = self._tm_params(max_tokens, chunk_hint)
+            for i, translation in zip(indices, generated):
+                unique_translations[i] = translation
+                if tm and not translation.startswith("[Translation error:"):
+                    tm.put("apertus", self.model_path.name, src_lang, tgt_lang, unique_chunks[i],
+                           translation, params)
+
+        translations = [unique_translations[p] for p in positions]
 
         if len(chunks) > 1:
             print(f"✅ Translation complete: {len(chunks)} chunks processed")
 
         translation_time = time.time() - start_time
 
-        # Join translations, preserving paragraph breaks for paragraph-level chunks
-        if SmartTextChunker and any(ct == 'paragraph' for _, ct in chunks):
-            # Preserve paragraph structure
-            result = []
-            for translation, (_, chunk_type) in zip(translations, chunks):
-                result.append(translation)
-                if chunk_type == 'paragraph':
-                    result.append('\n\n')
-            final_translation = ''.join(result).strip()
-        else:
-            # Standard joining
-            final_translation = ' '.join(translations)
+        final_translation = self._join_chunks(translations, chunks)
+
+        speculative = generation_stats.pop("speculative", None)
+        if speculative:
+            speculative["draft_model"] = self.draft_model_path.name
+            # Output tokens per Apertus decode step (1.0: drafting saved nothing)
+            speculative["tokens_per_step"] = round(
+                speculative["decoded_tokens"] / max(speculative["rounds"], 1), 2)
+            # Approximate: the draft's forward passes stand in for its proposed tokens
+            speculative["acceptance_rate"] = round(
+                speculative["accepted_tokens"] / max(speculative["drafted_tokens"], 1), 3)
 
         return {
             "translation": final_translation,
@@ -259,7 +1058,189 @@ Provide only the translation, without explanations.
             "time": f"{translation_time:.2f}s",
             "src_lang": f"{src_lang} ({src_name})",
             "tgt_lang": f"{tgt_lang} ({tgt_name})",
-            "device": self.device
+            "device": self.device,
+            "backend": self.backend,
+            "load": self.load_stats,
+            **({"offload": self.prefetcher.report()} if self.prefetcher else {}),
+            "model_calls_saved": model_calls_saved,
+            "prefix_cache_hits": self.prefix_cache_stats["reused"] - prefix_reused,
+            "generation": {
+                "max_new_tokens_ratio": self.max_new_tokens_ratio,
+                "stop_criteria": ["newline", *self.stop_markers],
+                "batch_size": self.batch_size,
+                "batch_token_budget": self.batch_token_budget,
+                **generation_stats
+            },
+            **({"speculative": speculative} if speculative else {}),
+            **({"cache_hits": cache_hits, "cache_misses": cache_misses} if tm else {}),
+            **fuzzy_stats
+        }
+
+    def translate_stream(self, text, src_lang='de', tgt_lang='rm-sursilv', max_tokens=512, hint=None,
+                         stats=None):
+        """
+        Translate text and yield the output as it is produced.
+
+        Chunks are translated in order; within a chunk the text grows token
+        by token. Like translate(), only the first line of each chunk's
+        output is kept, and chunks missing the translation memory are
+        looked up in the fuzzy memory.
+
+        Args:
+            stats: Optional dict that receives cache_hits / cache_misses and
+                   fuzzy match counts once the stream is exhausted
+
+        Yields:
+            The translation so far (all finished chunks plus the current one)
+        """
+        if not self.model:
+            if not self.load_model():
+                yield "[Translation error: Failed to load model]"
+                return
+
+        src_name = self.supported_languages.get(src_lang, src_lang)
+        tgt_name = self.supported_languages.get(tgt_lang, tgt_lang)
+
+        tm = self.translation_memory
+        tm_params = self._tm_params(max_tokens, hint)
+
+        chunks = self._chunk_text(text)
+        done = []
+        seen = {}
+        for i, (chunk, _) in enumerate(chunks, 1):
+            key = ' '.join(chunk.split())
+            translation = seen.get(key)
+            if translation is None and not chunk.strip():
+                translation = ""
+            if translation is None and tm:
+                translation = tm.get("apertus", self.model_path.name, src_lang, tgt_lang, chunk, tm_params)
+                if stats is not None:
+                    counter = "cache_misses" if translation is None else "cache_hits"
+                    stats[counter] = stats.get(counter, 0) + 1
+
+            chunk_hint = hint
+            if translation is None and hint is None:
+                match = self._fuzzy_lookup(chunk, src_lang, tgt_lang, max_tokens,
+                                           stats if stats is not None else {})
+                if match and match["mode"] != "hint":
+                    translation = match["translation"]
+                elif match:
+                    chunk_hint = match
+
+            if translation is None:
+                try:
+                    output = ""
+                    for output in self._stream_chunk(chunk, src_name, tgt_name, max_tokens, chunk_hint):
+                        partial = self._clean_output(output)
+                        yield self._join_chunks(done + [partial], chunks[:len(done) + 1])
+                    translation = self._clean_output(output)
+                    if tm:
+                        tm.put("apertus", self.model_path.name, src_lang, tgt_lang, chunk, translation,
+                               self._tm_params(max_tokens, chunk_hint))
+
+                except Exception as e:
+                    print(f"⚠️  Error translating chunk {i}: {str(e)}")
+                    translation = f"[Translation error: {str(e)}]"
+
+            seen[key] = translation
+            done.append(translation)
+            yield self._join_chunks(done, chunks[:len(done)])
+
+    def translate_variants(self, text, src_lang='de', variants=None, max_tokens=512):
+        """
+        Translate one text into several targets (by default all Romansh variants) together.
+
+        With the transformers backend, each chunk's prompt (instruction and
+        source text, the target is named last) is prefilled once and its
+        variants generated in one batch. With continuous batching all
+        (chunk, variant) rows are submitted at once and decoded together,
+        each prefilling its own prompt. llama.cpp and speculative decoding
+        translate the rows one after another.
+
+        Args:
+            text: Source text to translate
+            src_lang: Source language code
+            variants: Target language codes (default: every Romansh idiom
+                      and Rumantsch Grischun)
+            max_tokens: Maximum output tokens per chunk
+
+        Returns:
+            dict mapping each variant to its result dict (as from translate())
+        """
+        variants = list(dict.fromkeys(variants or [code for code in self.romansh_variants if code != 'rm']))
+        if not self.model:
+            if not self.load_model():
+                return {variant: {"error": "Failed to load model"} for variant in variants}
+
+        src_name = self.supported_languages.get(src_lang, src_lang)
+        start_time = time.time()
+
+        chunks = self._chunk_text(text)
+        if deduplicate:
+            unique_chunks, positions = deduplicate([chunk for chunk, _ in chunks])
+        else:
+            unique_chunks, positions = [chunk for chunk, _ in chunks], list(range(len(chunks)))
+
+        tm = self.translation_memory
+        # Variant outputs come from _build_variant_prompt and are kept apart from translate()'s
+        tm_params = self._tm_params(max_tokens, prompt="variants")
+        outputs = {variant: [None] * len(unique_chunks) for variant in variants}
+        cache_hits = 0
+        pending = []
+        for variant in variants:
+            for i, chunk in enumerate(unique_chunks):
+                if not chunk.strip():
+                    outputs[variant][i] = ""
+                    continue
+                if tm:
+                    cached = tm.get("apertus", self.model_path.name, src_lang, variant, chunk, tm_params)
+                    if cached is not None:
+                        cache_hits += 1
+                        outputs[variant][i] = cached
+                        continue
+                pending.append((i, variant))
+
+        generation_stats = {}
+        if pending:
+            rows = [(unique_chunks[i], self.supported_languages.get(variant, variant)) for i, variant in pending]
+            if self.batcher is not None:
+                generated = self._translate_chunks_continuous(rows, src_name, max_tokens, stats=generation_stats)
+            elif self.backend != "transformers" or self.draft_model is not None:
+                generated = []
+                for chunk, tgt_name in rows:
+                    generated += self._translate_chunks([chunk], src_name, tgt_name, max_tokens, stats=generation_stats)
+            else:
+                generated = self._generate_shared_prefix(rows, src_name, max_tokens, stats=generation_stats)
+
+            for (i, variant), translation in zip(pending, generated):
+                outputs[variant][i] = translation
+                if tm and not translation.startswith("[Translation error:"):
+                    tm.put("apertus", self.model_path.name, src_lang, variant, unique_chunks[i], translation, tm_params)
+
+        translation_time = time.time() - start_time
+        print(f"✅ {len(variants)} variants translated in {translation_time:.2f}s")
+
+        shared_prefix_tokens = generation_stats.pop("shared_prefix_tokens", 0)
+        return {
+            variant: {
+                "translation": self._join_chunks([outputs[variant][p] for p in positions], chunks),
+                "model": "Apertus-8B",
+                "model_type": "Causal LLM (1811 languages)",
+                "time": f"{translation_time:.2f}s",
+                "src_lang": f"{src_lang} ({src_name})",
+                "tgt_lang": f"{variant} ({self.supported_languages.get(variant, variant)})",
+                "device": self.device,
+                "backend": self.backend,
+                "variants": len(variants),
+                "shared_prefix_tokens": shared_prefix_tokens,
+                "generation": {
+                    "max_new_tokens_ratio": self.max_new_tokens_ratio,
+                    "stop_criteria": ["newline", *self.stop_markers],
+                    **generation_stats
+                },
+                **({"cache_hits": cache_hits} if tm else {})
+            }
+            for variant in variants
         }
 
     def list_languages(self):
@@ -287,16 +1268,37 @@ def main():
     parser.add_argument("--src", default="de", help="Source language code")
     parser.add_argument("--tgt", default="rm-sursilv", help="Target language (Romansh variant)")
     parser.add_argument("--text", help="Text to translate")
+    parser.add_argument("--variants", help="Comma-separated targets translated together, e.g. rm-sursilv,rm-vallader")
     parser.add_argument("--list-languages", action="store_true", help="List supported languages")
+    parser.add_argument("--batch-size", type=int, default=8, help="Chunks generated together (default: 8)")
+    parser.add_argument("--draft-model", help="Small draft model for speculative decoding (default: APERTUS_DRAFT_PATH)")
+    parser.add_argument("--deterministic", action="store_true", help="Greedy decoding (identical output on every run)")
+    parser.add_argument("--load-mode", choices=LOAD_MODES,
+                        default=os.environ.get("TRADUCTAL_APERTUS_LOAD_MODE", "float32"),
+                        help="CPU weight loading (bf16-mmap = about half the memory, offload = low-RAM hosts)")
+    parser.add_argument("--ram-budget", type=float, help="RAM for weights in offload mode, GB (default: half the host RAM)")
 
     args = parser.parse_args()
 
-    translator = ApertusTranslator()
+    translator = ApertusTranslator(batch_size=args.batch_size, load_mode=args.load_mode,
+                                   draft_model_path=args.draft_model, deterministic=args.deterministic,
+                                   ram_budget_gb=args.ram_budget)
 
     if args.list_languages:
         translator.list_languages()
         return
 
+    if args.variants:
+        variants = [code.strip() for code in args.variants.split(",") if code.strip()]
+        results = translator.translate_variants(args.text or "Guten Tag! Wie geht es Ihnen?", args.src, variants)
+        for variant, result in results.items():
+            print(f"🌍 {variant}: {result.get('translation', result.get('error'))}")
+        first = next(iter(results.values()), {})
+        if "time" in first:
+            print(f"⏱️  Time: {first['time']} for {len(results)} variants "
+                  f"({first['shared_prefix_tokens']} shared prompt tokens)")
+        return
+
     # Test translation
     if not args.text:
         # Default test
@@ -315,6 +1317,15 @@ def main():
         print(f"🤖 Model: {result['model']} ({result['model_type']})")
         print(f"⏱️  Time: {result['time']}")
         print(f"💾 Device: {result['device']}")
+        if "speculative" in result:
+            spec = result["speculative"]
+            print(f"🎯 Speculative decoding: {spec['tokens_per_step']:.2f} tokens per Apertus step "
+                  f"({spec['decoded_tokens']} tokens, {spec['rounds']} steps; "
+                  f"~{spec['acceptance_rate']:.0%} of draft tokens accepted)")
+        if "offload" in result:
+            offload = result["offload"]
+            penalty = f"~{offload['throughput_penalty']}x slower than in RAM" if offload["throughput_penalty"] else "n/a"
+            print(f"💽 Offload: {offload['offloaded_layers']}/{offload['layers']} layers on disk, {penalty}")
 
 
 if __name__ == "__main__":
@@ -68,7 +68,13 @@ class HybridTranslationValidator:
                        os.environ.get('APERTUS_PATH') or \
                        os.environ.get('APERTUS8B_PATH') or \
                        './models/apertus-8b'
-        self.apertus = ApertusTranslator(model_path=apertus_path)
+        if self.config.get('apertus_backend') == 'llama.cpp':
+            from apertus_gguf import ApertusGGUFTranslator
+            self.apertus = ApertusGGUFTranslator(model_path=apertus_path,
+                                                 gguf_path=self.config.get('apertus_gguf_path'))
+        else:
+            self.apertus = ApertusTranslator(model_path=apertus_path,
+                                             load_mode=self.config.get('apertus_load_mode', 'float32'))
 
         # Symbolic component
         self.trealla_parser = TreallaGlossaryParser()
@@ -86,10 +92,14 @@ class HybridTranslationValidator:
 
         print("✅ Hybrid system initialized")
 
-    def _default_config(self) -> Dict:
+    @staticmethod
+    def _default_config() -> Dict:
         """Default configuration."""
         return {
             'apertus_path': os.environ.get('APERTUS_PATH', './models/apertus-8b'),
+            'apertus_backend': os.environ.get('TRADUCTAL_APERTUS_BACKEND', 'transformers'),
+            'apertus_gguf_path': os.environ.get('APERTUS_GGUF_PATH'),
+            'apertus_load_mode': os.environ.get('TRADUCTAL_APERTUS_LOAD_MODE', 'float32'),
             'coptic_parser_path': str(Path.home() / 'copticNLP/coptic-dependency-parser/coptic_parser_master.pl'),
             'enable_validation': True,
             'max_length_ratio': 3.0,
@@ -162,7 +172,8 @@ class HybridTranslationValidator:
                     'model': 'Apertus+Trealla',
                     'metadata': {
                         'neural_time': neural_result.get('time'),
-                        'device': neural_result.get('device')
+                        'device': neural_result.get('device'),
+                        'backend': neural_result.get('backend')
                     }
                 }
 
@@ -174,7 +185,8 @@ class HybridTranslationValidator:
             'model': 'Apertus+Trealla',
             'metadata': {
                 'neural_time': neural_result.get('time'),
-                'device': neural_result.get('device')
+                'device': neural_result.get('device'),
+                'backend': neural_result.get('backend')
             }
         }
 
@@ -434,11 +446,17 @@ def main():
     parser.add_argument("--tgt", default="rm-sursilv", help="Target language")
     parser.add_argument("--no-validate", action="store_true",
                        help="Disable Prolog validation")
+    parser.add_argument("--apertus-backend", choices=["transformers", "llama.cpp"],
+                       help="Apertus inference backend (llama.cpp = quantized GGUF on CPU)")
 
     args = parser.parse_args()
 
     # Initialize hybrid validator
-    validator = HybridTranslationValidator()
+    config = None
+    if args.apertus_backend:
+        config = HybridTranslationValidator._default_config()
+        config['apertus_backend'] = args.apertus_backend
+    validator = HybridTranslationValidator(config)
 
     # Translate with validation
     result = validator.translate(
@@ -477,7 +495,7 @@ def main():
     if metadata:
         print(f"\n⏱️  PERFORMANCE:")
         print(f"   Translation time: {metadata.get('neural_time', 'N/A')}")
-        print(f"   Device: {metadata.get('device', 'N/A')}")
+        print(f"   Device: {metadata.get('device', 'N/A')} ({metadata.get('backend', 'transformers')})")
 
     print("="*60)
 
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+CPU Feature Detection
+Shared by the NLLB and Apertus loaders to decide whether bf16 weights pay off on CPU
+"""
+
+
+def cpu_supports_bf16():
+    """Whether the CPU has native bfloat16 instructions (AVX512-BF16 or AMX)."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+CTranslate2 Backend for NLLB-200
+Converts deployed NLLB checkpoints to int8 CTranslate2 models and runs them on CPU
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+try:
+    import ctranslate2
+except ImportError:
+    ctranslate2 = None
+
+# Converted models live next to the original checkpoint, as <name>_ct2_<quantization>
+CT2_SUFFIX = "_ct2_"
+
+# Tokenizer files copied alongside the converted weights
+TOKENIZER_FILES = [
+    "tokenizer.json",
+    "tokenizer_config.json",
+    "special_tokens_map.json",
+    "sentencepiece.bpe.model",
+]
+
+
+def is_available():
+    """Whether the ctranslate2 package is installed."""
+    return ctranslate2 is not None
+
+
+def converted_path(model_path, quantization="int8"):
+    """Directory holding the CTranslate2 version of a checkpoint."""
+    model_path = Path(model_path)
+    return model_path.parent / f"{model_path.name}{CT2_SUFFIX}{quantization}"
+
+
+def is_converted(ct2_path):
+    """Whether a directory contains a converted CTranslate2 model."""
+    return (Path(ct2_path) / "model.bin").exists()
+
+
+def convert_model(model_path, output_dir=None, quantization="int8", force=False):
+    """
+    Convert a Transformers NLLB checkpoint to CTranslate2.
+
+    The converted model is cached next to the original (``<name>_ct2_int8``),
+    together with the tokenizer files, so later loads skip the conversion.
+
+    Args:
+        model_path: Path to the Transformers checkpoint
+        output_dir: Target directory (defaults to converted_path(model_path))
+        quantization: CTranslate2 weight type (int8, int8_float32, int16, float32)
+        force: Re-convert even if a converted model already exists
+
+    Returns:
+        Path to the converted model directory
+    """
+    if ctranslate2 is None:
+        raise ImportError("ctranslate2 is not installed (pip install ctranslate2)")
+
+    model_path = Path(model_path)
+    output_dir = Path(output_dir) if output_dir else converted_path(model_path, quantization)
+
+    if is_converted(output_dir) and not force:
+        return output_dir
+
+    print(f"🔧 Converting {model_path.name} to CTranslate2 ({quantization})...")
+    copy_files = [name for name in TOKENIZER_FILES if (model_path / name).exists()]
+    converter = ctranslate2.converters.TransformersConverter(str(model_path), copy_files=copy_files)
+    converter.convert(str(output_dir), quantization=quantization, force=force)
+
+    print(f"✅ Converted model saved to {output_dir}")
+    return output_dir
+
+
+class CTranslate2Seq2Seq:
+    """
+    Thin wrapper around ``ctranslate2.Translator`` used in place of the
+    PyTorch model by EnhancedOfflineTranslator.
+
+    It takes the same tokenized rows and per-row target-language tokens as
+    the PyTorch batching path and returns decoded strings.
+    """
+
+    backend = "ctranslate2"
+
+    def __init__(self, model_path, device="cpu", compute_type="int8", inter_threads=1, intra_threads=0):
+        """
+        Load a converted model.
+
+        Args:
+            model_path: Directory of the converted CTranslate2 model
+            device: "cpu" or "cuda"
+            compute_type: Computation type (int8 keeps the weights quantized)
+            inter_threads: Batches translated in parallel
+            intra_threads: Threads per batch (0 = all cores)
+        """
+        if ctranslate2 is None:
+            raise ImportError("ctranslate2 is not installed (pip install ctranslate2)")
+
+        self.model_path = Path(model_path)
+        self.device = device
+        self.compute_type = compute_type
+        self.translator = ctranslate2.Translator(
+            str(model_path),
+            device=device,
+            compute_type=compute_type,
+            inter_threads=inter_threads,
+            intra_threads=intra_threads
+        )
+
+    def num_parameters(self):
+        """Parameter count is not exposed by CTranslate2."""
+        return None
+
+    def translate_rows(self, input_ids, tgt_token_ids, tokenizer, generation_config, batch_token_budget):
+        """
+        Translate tokenized rows.
+
+        Args:
+            input_ids: Per-row source token ids (None for empty rows)
+            tgt_token_ids: Per-row target-language token id
+            tokenizer: Tokenizer used to map ids to tokens and decode
+            generation_config: generate()-style settings (num_beams, max_length, ...)
+            batch_token_budget: Source tokens per CTranslate2 batch
+
+        Returns:
+            Translations in row order (empty rows map to "")
+        """
+        translations = [""] * len(input_ids)
+        rows = [i for i, ids in enumerate(input_ids) if ids]
+        if not rows:
+            return translations
+
+        source = [tokenizer.convert_ids_to_tokens(input_ids[i]) for i in rows]
+        target_prefix = [tokenizer.convert_ids_to_tokens([tgt_token_ids[i]]) for i in rows]
+
+        results = self.translator.translate_batch(
+            source,
+            target_prefix=target_prefix,
+            beam_size=generation_config.get("num_beams", 1),
+            max_decoding_length=generation_config.get("max_length", 512),
+            no_repeat_ngram_size=generation_config.get("no_repeat_ngram_size", 0),
+            length_penalty=generation_config.get("length_penalty", 1.0),
+            max_batch_size=batch_token_budget,
+            batch_type="tokens"
+        )
+
+        for i, result in zip(rows, results):
+            # Drop the target-language prefix token before decoding
+            tokens = result.hypotheses[0][1:]
+            translations[i] = tokenizer.decode(tokenizer.convert_tokens_to_ids(tokens), skip_special_tokens=True)
+
+        return translations
+
+
+def main():
+    """Convert deployed NLLB models to CTranslate2."""
+    parser = argparse.ArgumentParser(description="Convert NLLB-200 checkpoints to CTranslate2")
+    parser.add_argument("models", nargs="*", help="Model names in the models directory (default: all NLLB models)")
+    parser.add_argument("--models-dir", default="./models/deployed_models", help="Models directory")
+    parser.add_argument("--quantization", default="int8", help="Weight type (default: int8)")
+    parser.add_argument("--force", action="store_true", help="Re-convert existing models")
+    args = parser.parse_args()
+
+    if not is_available():
+        print("❌ ctranslate2 is not installed (pip install ctranslate2)")
+        sys.exit(1)
+
+    models_dir = Path(args.models_dir)
+    names = args.models or sorted(
+        p.name for p in models_dir.glob("nllb_*") if p.is_dir() and CT2_SUFFIX not in p.name
+    )
+    if not names:
+        print(f"❌ No NLLB models found in {models_dir}")
+        sys.exit(1)
+
+    for name in names:
+        model_path = models_dir / name
+        if not model_path.exists():
+            print(f"❌ Model not found: {model_path}")
+            continue
+        output_dir = convert_model(model_path, quantization=args.quantization, force=args.force)
+        size_mb = sum(f.stat().st_size for f in output_dir.rglob("*") if f.is_file()) / 1e6
+        original_mb = sum(f.stat().st_size for f in model_path.rglob("*") if f.is_file()) / 1e6
+        print(f"📦 {name}: {original_mb:,.0f} MB → {size_mb:,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
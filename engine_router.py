@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Cost-Based Engine Router for TraductAL
+Sends each request to the engine with the lowest expected completion time,
+from rolling per-engine, per-pair latency and current queue depth, among the
+engines that meet the configured quality floor of the language pair
+"""
+
+import json
+import threading
+
+import language_registry
+
+ENGINES = ["nllb", "apertus"]
+
+# Prior speed (seconds per source character) until a pair has been measured
+DEFAULT_SECONDS_PER_CHAR = {"nllb": 0.004, "apertus": 0.03}
+
+# Default quality scores (0-1): Apertus is the specialist for Romansh and the
+# other low-resource languages, both engines are on par elsewhere
+DEFAULT_QUALITY = {"nllb": 0.8, "apertus": 0.8}
+SPECIALIST_QUALITY = 0.9
+
+
+def pair_key(src_lang, tgt_lang):
+    """Key of a language pair in the routing config ("src:tgt", "*" = any)."""
+    return f"{src_lang}:{tgt_lang}"
+
+
+class EngineRouter:
+    """
+    Picks the translation engine per request.
+
+    Expected completion time of an engine is its rolling service time for
+    the pair (exponentially weighted seconds per character, falling back to
+    the engine's mean over all pairs, then to a prior) times the text
+    length, stretched by the requests already in flight on it:
+
+        expected = service × (1 + in_flight / concurrency)
+
+    Engines that cannot translate the pair, or whose quality score for it is
+    below the pair's quality floor, are not eligible. If no engine meets the
+    floor, the highest-quality one is used.
+
+    The routing config (JSON) may set, per pair key ("de:en", "de:*", "*"):
+
+        {"floors": {"en:rm-sursilv": 0.85, "*": 0.0},
+         "quality": {"nllb": {"de:fr": 0.85}, "apertus": {"*:rm-*": 0.9}},
+         "concurrency": {"nllb": 8, "apertus": 4}}
+    """
+
+    def __init__(self, floors=None, quality=None, concurrency=None, alpha=0.2):
+        """
+        Initialize the router.
+
+        Args:
+            floors: {pair key: minimum quality score}
+            quality: {engine: {pair key: quality score}} overriding the defaults
+            concurrency: {engine: requests it serves in parallel} (default 1)
+            alpha: Weight of the newest measurement in the rolling estimates
+        """
+        self.floors = dict(floors or {})
+        self.quality_scores = {engine: dict((quality or {}).get(engine, {})) for engine in ENGINES}
+        self.concurrency = {engine: 1 for engine in ENGINES}
+        self.concurrency.update(concurrency or {})
+        self.alpha = alpha
+
+        self._lock = threading.Lock()
+        self._in_flight = {engine: 0 for engine in ENGINES}
+        # (engine, src, tgt) -> (seconds per char, samples); (engine, None, None) = all pairs
+        self._rates = {}
+
+        # Counters for monitoring
+        self.stats = {"decisions": 0, **{engine: 0 for engine in ENGINES}, "floor_fallbacks": 0}
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Router with floors, quality scores and concurrency from a JSON file."""
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        # Configured concurrency overrides the caller's defaults
+        concurrency = {**(kwargs.pop("concurrency", None) or {}), **config.get("concurrency", {})}
+        return cls(floors=config.get("floors"), quality=config.get("quality"),
+                   concurrency=concurrency, **kwargs)
+
+    @staticmethod
+    def _lookup(table, src_lang, tgt_lang):
+        """Most specific entry for a pair: exact, src:*, *:tgt, Romansh wildcards, then *."""
+        keys = [pair_key(src_lang, tgt_lang), pair_key(src_lang, "*"), pair_key("*", tgt_lang)]
+        src_romansh = language_registry.is_romansh(src_lang)
+        tgt_romansh = language_registry.is_romansh(tgt_lang)
+        if src_romansh or tgt_romansh:
+            keys.append(pair_key("rm-*" if src_romansh else src_lang, "rm-*" if tgt_romansh else tgt_lang))
+        if tgt_romansh:
+            keys.append(pair_key("*", "rm-*"))
+        if src_romansh:
+            keys.append(pair_key("rm-*", "*"))
+        keys.append("*")
+        for key in keys:
+            if key in table:
+                return table[key]
+        return None
+
+    def candidates(self, src_lang, tgt_lang):
+        """
+        Engines the language registry lists for both languages of a pair.
+
+        Unlisted codes count as Apertus languages (as in
+        language_registry.engines_for); a pair no engine covers, such as an
+        NLLB-only language with a Romansh idiom, is still tried on Apertus.
+        """
+        src_engines = language_registry.engines_for(src_lang)
+        tgt_engines = language_registry.engines_for(tgt_lang)
+        return [engine for engine in ENGINES if engine in src_engines and engine in tgt_engines] or ["apertus"]
+
+    def quality(self, engine, src_lang, tgt_lang):
+        """Quality score of an engine for a pair (configured, else default)."""
+        score = self._lookup(self.quality_scores[engine], src_lang, tgt_lang)
+        if score is not None:
+            return score
+        if engine == "apertus" and (language_registry.supports(src_lang, "specialist")
+                                    or language_registry.supports(tgt_lang, "specialist")):
+            return SPECIALIST_QUALITY
+        return DEFAULT_QUALITY[engine]
+
+    def floor(self, src_lang, tgt_lang):
+        """Quality floor configured for a pair (0 if none)."""
+        return self._lookup(self.floors, src_lang, tgt_lang) or 0.0
+
+    def estimate(self, engine, src_lang, tgt_lang, chars):
+        """
+        Expected completion time of a request on an engine.
+
+        Returns:
+            dict with expected_time, service_time, queue_depth and samples
+            (measurements behind the estimate; 0 = prior)
+        """
+        with self._lock:
+            rate, samples = self._rates.get((engine, src_lang, tgt_lang),
+                                            self._rates.get((engine, None, None),
+                                                            (DEFAULT_SECONDS_PER_CHAR[engine], 0)))
+            depth = self._in_flight[engine]
+        service = rate * max(chars, 1)
+        return {
+            "expected_time": round(service * (1 + depth / self.concurrency[engine]), 3),
+            "service_time": round(service, 3),
+            "queue_depth": depth,
+            "samples": samples
+        }
+
+    def route(self, text, src_lang, tgt_lang):
+        """
+        Choose the engine for a request.
+
+        Returns:
+            (engine, decision) where decision holds the reason, the pair's
+            quality floor and the estimate of every candidate, for the
+            result metadata
+        """
+        floor = self.floor(src_lang, tgt_lang)
+        estimates = {}
+        for engine in self.candidates(src_lang, tgt_lang):
+            estimate = self.estimate(engine, src_lang, tgt_lang, len(text))
+            estimate["quality"] = self.quality(engine, src_lang, tgt_lang)
+            estimate["eligible"] = estimate["quality"] >= floor
+            estimates[engine] = estimate
+
+        eligible = [engine for engine, estimate in estimates.items() if estimate["eligible"]]
+        if eligible:
+            engine = min(eligible, key=lambda e: estimates[e]["expected_time"])
+            reason = "lowest expected time" if len(eligible) > 1 else "only eligible engine"
+        else:
+            engine = max(estimates, key=lambda e: (estimates[e]["quality"], -estimates[e]["expected_time"]))
+            reason = "no engine meets the quality floor, best quality"
+
+        with self._lock:
+            self.stats["decisions"] += 1
+            self.stats[engine] += 1
+            if not eligible:
+                self.stats["floor_fallbacks"] += 1
+
+        return engine, {"engine": engine, "reason": reason, "quality_floor": floor, "candidates": estimates}
+
+    def start(self, engine):
+        """Count a request as in flight on an engine; return the depth it found."""
+        with self._lock:
+            depth = self._in_flight[engine]
+            self._in_flight[engine] += 1
+        return depth
+
+    def finish(self, engine, src_lang, tgt_lang, chars, elapsed, depth=0, ok=True, measured=True):
+        """
+        Mark a request done and, if it succeeded, fold its latency into the estimates.
+
+        Args:
+            engine: Engine that served the request
+            src_lang: Source language code
+            tgt_lang: Target language code
+            chars: Source length in characters
+            elapsed: Seconds the engine spent translating (model loading
+                     excluded, so it is a service time)
+            depth: Requests in flight when it started (from start())
+            ok: False for failed requests, which are not measured
+            measured: False when the engine generated nothing (every segment
+                      came from the translation memory), so the near-zero
+                      time is not taken as its speed
+        """
+        with self._lock:
+            self._in_flight[engine] = max(0, self._in_flight[engine] - 1)
+            if not ok or not measured or chars <= 0:
+                return
+            # Remove the expected queueing share so estimates stay service times
+            rate = elapsed / (1 + depth / self.concurrency[engine]) / chars
+            for key in ((engine, src_lang, tgt_lang), (engine, None, None)):
+                if key in self._rates:
+                    old, samples = self._rates[key]
+                    self._rates[key] = (old + self.alpha * (rate - old), samples + 1)
+                else:
+                    self._rates[key] = (rate, 1)
+
+    def report(self):
+        """Routing counters, queue depths and the measured per-pair speeds."""
+        with self._lock:
+            return {
+                **self.stats,
+                "in_flight": dict(self._in_flight),
+                "seconds_per_char": {
+                    f"{engine}/{pair_key(src, tgt)}": round(rate, 5)
+                    for (engine, src, tgt), (rate, _) in self._rates.items() if src is not None
+                }
+            }
@@ -12,6 +12,8 @@ import gradio as gr
 import warnings
 warnings.filterwarnings("ignore")
 
+import language_registry
+
 # Run startup check for required models
 try:
     from startup_check import check_models
@@ -50,155 +52,52 @@ except ImportError as e:
     whisper_enabled = False
 
 # Initialize translator, TTS, and Whisper globally
-translator = UnifiedTranslator()
+# TRADUCTAL_BATCH_WAIT_MS > 0 micro-batches NLLB requests from concurrent users
+batch_wait_ms = float(os.environ.get("TRADUCTAL_BATCH_WAIT_MS", "0")) or None
+# TRADUCTAL_APERTUS_MAX_BATCH > 0 decodes concurrent Apertus requests in one continuous batch
+apertus_max_batch = int(os.environ.get("TRADUCTAL_APERTUS_MAX_BATCH", "0")) or None
+# TRADUCTAL_TM_PATH enables the shared translation memory (SQLite)
+# TRADUCTAL_FUZZY_THRESHOLD (0-1) adds near-match lookup, see TRADUCTAL_FUZZY_MODE
+# TRADUCTAL_NLLB_BACKEND=ctranslate2 serves NLLB with int8 CTranslate2 models
+# TRADUCTAL_NLLB_PRECISION=int8|bf16 loads reduced-precision PyTorch NLLB weights
+# TRADUCTAL_ROUTING_CONFIG points to per-pair quality floors for automatic engine selection
+translator = UnifiedTranslator(
+    batch_wait_ms=batch_wait_ms,
+    tm_path=os.environ.get("TRADUCTAL_TM_PATH") or None,
+    fuzzy_threshold=float(os.environ.get("TRADUCTAL_FUZZY_THRESHOLD", "0")) or None,
+    fuzzy_mode=os.environ.get("TRADUCTAL_FUZZY_MODE", "flag"),
+    nllb_backend=os.environ.get("TRADUCTAL_NLLB_BACKEND", "pytorch"),
+    nllb_precision=os.environ.get("TRADUCTAL_NLLB_PRECISION", "float32"),
+    apertus_backend=os.environ.get("TRADUCTAL_APERTUS_BACKEND", "transformers"),
+    apertus_gguf_path=os.environ.get("APERTUS_GGUF_PATH") or None,
+    apertus_load_mode=os.environ.get("TRADUCTAL_APERTUS_LOAD_MODE", "float32"),
+    apertus_max_batch=apertus_max_batch,
+    routing_config=os.environ.get("TRADUCTAL_ROUTING_CONFIG") or None
+)
 if tts_enabled:
     tts_engine = TTSEngine()
 if whisper_enabled:
     whisper_stt = WhisperSTT(model_size="base")
 
-# Language options - Expanded for production (50+ languages)
+# Language options, from the capability registry (language_registry.py)
 # NLLB-200 supports 200 languages, showing the most commonly used ones
-
-NLLB_LANGUAGES = {
-    # Core European Languages
-    "German": "de",
-    "English": "en",
-    "French": "fr",
-    "Italian": "it",
-    "Spanish": "es",
-    "Portuguese": "pt",
-
-    # Major World Languages
-    "Russian": "ru",
-    "Chinese": "zh",
-    "Hindi": "hi",
-    "Arabic": "ar",
-    "Japanese": "ja",
-    "Korean": "ko",
-
-    # Additional European Languages
-    "Dutch": "nl",
-    "Polish": "pl",
-    "Czech": "cs",
-    "Swedish": "sv",
-    "Danish": "da",
-    "Norwegian": "no",
-    "Finnish": "fi",
-    "Greek": "el",
-    "Turkish": "tr",
-    "Hungarian": "hu",
-    "Romanian": "ro",
-
-    # Major Asian Languages
-    "Vietnamese": "vi",
-    "Thai": "th",
-    "Indonesian": "id",
-    "Malay": "ms",
-    "Tamil": "ta",
-    "Bengali": "bn",
-    "Urdu": "ur",
-    "Persian": "fa",
-    "Hebrew": "he",
-
-    # African Languages
-    "Swahili": "sw",
-    "Amharic": "am",
-    "Hausa": "ha",
-    "Yoruba": "yo",
-
-    # Regional European Languages
-    "Catalan": "ca",
-    "Galician": "gl",
-    "Basque": "eu",
-
-    # Slavic Languages
-    "Ukrainian": "uk",
-    "Bulgarian": "bg",
-    "Serbian": "sr",
-    "Croatian": "hr",
-    "Slovak": "sk",
-    "Slovenian": "sl",
-
-    # Baltic & Other European
-    "Albanian": "sq",
-    "Macedonian": "mk",
-    "Lithuanian": "lt",
-    "Latvian": "lv",
-    "Estonian": "et",
-    "Icelandic": "is"
-}
+NLLB_LANGUAGES = language_registry.names("nllb")
 
 # Apertus-8B Specialist Languages (Swiss & Low-Resource Languages)
-APERTUS_LANGUAGES = {
-    # Romansh Variants (Swiss)
-    "Romansh Sursilvan": "rm-sursilv",
-    "Romansh Vallader": "rm-vallader",
-    "Romansh Puter": "rm-puter",
-    "Romansh Surmiran": "rm-surmiran",
-    "Romansh Sutsilvan": "rm-sutsilv",
-    "Rumantsch Grischun": "rm-rumgr",
-
-    # Other Low-Resource Languages supported by Apertus
-    "Occitan": "oc",
-    "Breton": "br",
-    "Welsh": "cy",
-    "Scottish Gaelic": "gd",
-    "Irish": "ga",
-    "Luxembourgish": "lb",
-    "Friulian": "fur",
-    "Ladin": "lld",
-    "Sardinian": "sc"
-}
+APERTUS_LANGUAGES = language_registry.names("specialist")
 
 # Keep backward compatibility
-ROMANSH_VARIANTS = {k: v for k, v in APERTUS_LANGUAGES.items() if k.startswith("Romansh") or k.startswith("Rumantsch")}
+ROMANSH_VARIANTS = language_registry.names("romansh")
 COMMON_LANGUAGES = NLLB_LANGUAGES  # For backward compatibility
 
-# Languages with TTS support (MMS-TTS subset)
-# Note: Not all languages have MMS-TTS models - only including confirmed ones
-TTS_LANGUAGES = {
-    # Core languages with MMS-TTS support
-    "English": "en",
-    "German": "de",
-    "French": "fr",
-    "Spanish": "es",
-    "Portuguese": "pt",
-    "Russian": "ru",
-    "Hindi": "hi",
-    "Arabic": "ar",
-    "Korean": "ko",
-
-    # Additional European languages with TTS
-    "Dutch": "nl",
-    "Polish": "pl",
-    "Czech": "cs",
-    "Swedish": "sv",
-    "Finnish": "fi",
-    "Greek": "el",
-    "Turkish": "tr",
-    "Hungarian": "hu",
-    "Romanian": "ro",
-
-    # Additional Asian languages with TTS
-    "Vietnamese": "vi",
-    "Thai": "th",
-    "Indonesian": "id",
-    "Tamil": "ta",
-    "Bengali": "bn",
-    "Urdu": "ur",
-    "Persian": "fa",
-    "Hebrew": "he",
-
-    # African languages with TTS
-    "Swahili": "sw"
-}
+# Languages with TTS support (MMS-TTS checkpoints only)
+TTS_LANGUAGES = language_registry.names("tts")
 
 # Combine all languages for full translation support
 ALL_LANGUAGES = {**NLLB_LANGUAGES, **APERTUS_LANGUAGES}
 
-# Languages with STT support (Whisper supports 100+ languages)
-# Including all NLLB languages + Apertus specialist languages
-STT_LANGUAGES = {**NLLB_LANGUAGES, **APERTUS_LANGUAGES}
+# Languages with STT support (Whisper, plus wav2vec2 for Romansh)
+STT_LANGUAGES = language_registry.names("stt")
 
 ENGINE_OPTIONS = {
     "Auto (Recommended)": None,
@@ -214,40 +113,97 @@ NLLB_MODEL_OPTIONS = {
     "NLLB-200-Distilled-1.3B (Fastest)": "nllb_200_distilled_1.3b"
 }
 
+# int8 CTranslate2 variants, only offered when the ctranslate2 package is installed
+try:
+    import ctranslate2_backend
+    if ctranslate2_backend.is_available():
+        for label, model_name in list(NLLB_MODEL_OPTIONS.items()):
+            if model_name:
+                ct2_name = ctranslate2_backend.converted_path(model_name).name
+                NLLB_MODEL_OPTIONS[f"{label.split(' (')[0]} int8 (CTranslate2, CPU)"] = ct2_name
+except ImportError:
+    pass
+
+# Decoding profiles (NLLB): speed vs. thoroughness of the beam search
+DECODING_PROFILE_OPTIONS = {
+    "Default (5 beams)": None,
+    "Interactive (fastest, greedy)": "interactive",
+    "Balanced (3 beams)": "balanced",
+    "Archival (5 beams, longest outputs)": "archival"
+}
+
 
-def translate_text(text, src_lang_name, tgt_lang_name, engine_name, nllb_model_name, show_details):
-    """Translate text with selected parameters."""
+def format_details(result):
+    """Markdown summary of a translation result."""
+    details = f"""
+**Translation Details:**
+- **Engine**: {result.get('engine', 'Unknown')}
+- **Model**: {result.get('model', 'Unknown')}
+- **Time**: {result.get('total_time', result.get('time', 'Unknown'))}
+- **Device**: {result.get('device', 'Unknown')}
+        """
+    if "decoding" in result:
+        decoding = result["decoding"]
+        adjusted = " (fitted to latency budget)" if decoding.get("budget_adjusted") else ""
+        details += f"- **Decoding**: {decoding['profile']}, {decoding['num_beams']} beams{adjusted}\n"
+    if "time_to_first_output" in result:
+        details += f"- **First output after**: {result['time_to_first_output']}\n"
+    if "precision" in result:
+        details += f"- **Precision**: {result['precision']}\n"
+    if "speculative" in result:
+        spec = result["speculative"]
+        details += (f"- **Speculative decoding**: {spec['tokens_per_step']:.2f} tokens per Apertus step "
+                    f"(~{spec['acceptance_rate']:.0%} of draft tokens accepted)\n")
+    if "cache_hits" in result:
+        details += f"- **Translation memory**: {result['cache_hits']} hits, {result['cache_misses']} misses\n"
+    if result.get("model_calls_saved"):
+        details += f"- **Repeated segments**: {result['model_calls_saved']} model calls saved\n"
+    if result.get("fuzzy_matches"):
+        matches = result["fuzzy_matches"]
+        scores = ", ".join(f"{match['score']:.0%}" for match in matches)
+        review = " — please review" if result.get("needs_review") else ""
+        details += f"- **Fuzzy matches**: {len(matches)} segments ({scores}, {matches[0]['mode']}){review}\n"
+    if "routing" in result:
+        routing = result["routing"]
+        estimates = ", ".join(f"{engine} ~{c['expected_time']:.1f}s" for engine, c in routing["candidates"].items())
+        details += f"- **Routing**: {routing['reason']} ({estimates})\n"
+    return details
+
+
+def translate_text(text, src_lang_name, tgt_lang_name, engine_name, nllb_model_name, show_details,
+                   stream_output=True, profile_name=None, latency_budget=0):
+    """Translate text with selected parameters, streaming the output if requested."""
     if not text.strip():
-        return "⚠️ Please enter text to translate", ""
+        yield "⚠️ Please enter text to translate", ""
+        return
 
     src_code = ALL_LANGUAGES.get(src_lang_name)
     tgt_code = ALL_LANGUAGES.get(tgt_lang_name)
     engine = ENGINE_OPTIONS.get(engine_name)
     model_name = NLLB_MODEL_OPTIONS.get(nllb_model_name) if nllb_model_name else None
+    profile = DECODING_PROFILE_OPTIONS.get(profile_name) if profile_name else None
 
     if not src_code or not tgt_code:
-        return "❌ Invalid language selection", ""
+        yield "❌ Invalid language selection", ""
+        return
 
     # Perform translation
-    result = translator.translate(text, src_code, tgt_code, engine=engine, model_name=model_name)
+    if stream_output:
+        result = {}
+        for result in translator.translate_stream(text, src_code, tgt_code, engine=engine,
+                                                  model_name=model_name, profile=profile):
+            if result.get("partial"):
+                yield result["translation"], ""
+    else:
+        result = translator.translate(text, src_code, tgt_code, engine=engine, model_name=model_name,
+                                      profile=profile, latency_budget=latency_budget or None)
 
     if "error" in result:
-        return f"❌ Translation Error:\n{result['error']}", ""
+        yield f"❌ Translation Error:\n{result['error']}", ""
+        return
 
     translation = result.get("translation", "")
-
-    # Build details string
-    details = ""
-    if show_details:
-        details = f"""
-**Translation Details:**
-- **Engine**: {result.get('engine', 'Unknown')}
-- **Model**: {result.get('model', 'Unknown')}
-- **Time**: {result.get('total_time', result.get('time', 'Unknown'))}
-- **Device**: {result.get('device', 'Unknown')}
-        """
-
-    return translation, details
+    yield translation, format_details(result) if show_details else ""
 
 
 def batch_translate(file_content, src_lang_name, tgt_lang_name):
@@ -259,19 +215,17 @@ def batch_translate(file_content, src_lang_name, tgt_lang_name):
     tgt_code = ALL_LANGUAGES.get(tgt_lang_name)
 
     lines = file_content.strip().split('\n')
-    translations = []
-
-    for i, line in enumerate(lines, 1):
-        if not line.strip():
-            translations.append("")
-            continue
+    translations = [""] * len(lines)
 
-        result = translator.translate(line.strip(), src_code, tgt_code)
+    # Translate all non-empty lines together so NLLB can batch them
+    indices = [i for i, line in enumerate(lines) if line.strip()]
+    results = translator.translate_batch([(lines[i].strip(), src_code, tgt_code) for i in indices])
 
+    for i, result in zip(indices, results):
         if "error" in result:
-            translations.append(f"[ERROR: {result['error']}]")
+            translations[i] = f"[ERROR: {result['error']}]"
         else:
-            translations.append(result.get("translation", ""))
+            translations[i] = result.get("translation", "")
 
     return "\n".join(translations)
 
@@ -285,7 +239,7 @@ def transcribe_audio_multilang(audio_file, src_lang_name="Romansh Sursilvan"):
         src_code = STT_LANGUAGES.get(src_lang_name)
 
         # Check if Romansh variant - use wav2vec2
-        if src_code and src_code.startswith('rm'):
+        if src_code and language_registry.is_romansh(src_code):
             print(f"🎤 Using wav2vec2 for Romansh transcription...")
             # Import speech recognition libraries
             import torch
@@ -293,7 +247,7 @@ def transcribe_audio_multilang(audio_file, src_lang_name="Romansh Sursilvan"):
             import librosa
 
             # Load wav2vec2 model from Hugging Face
-            model_name = "sammy786/wav2vec2-xlsr-romansh_sursilvan"
+            model_name = language_registry.ROMANSH_STT_MODEL
             processor = Wav2Vec2Processor.from_pretrained(model_name)
             model = Wav2Vec2ForCTC.from_pretrained(model_name)
 
@@ -316,9 +270,7 @@ def transcribe_audio_multilang(audio_file, src_lang_name="Romansh Sursilvan"):
         elif whisper_enabled:
             print(f"🎤 Using Whisper for {src_lang_name} transcription...")
             # Get language code for Whisper
-            lang_code = None
-            if src_code in ['de', 'en', 'fr', 'it', 'es', 'pt', 'ru', 'zh', 'hi', 'ar', 'ja', 'ko']:
-                lang_code = src_code
+            lang_code = language_registry.whisper_code(src_code)
 
             transcription = whisper_stt.transcribe(audio_file, language=lang_code)
             return transcription
@@ -501,6 +453,23 @@ with gr.Blocks(title="TraductAL - Multilingual, multimodal translation system",
                     value=True,
                     label="Show translation details"
                 )
+                stream_output = gr.Checkbox(
+                    value=True,
+                    label="Stream output (NLLB streams with the greedy profile only; "
+                          "beam profiles show the result when complete)"
+                )
+
+            with gr.Row():
+                profile_choice = gr.Dropdown(
+                    choices=list(DECODING_PROFILE_OPTIONS.keys()),
+                    value="Default (5 beams)",
+                    label="Decoding profile (NLLB)",
+                    filterable=False
+                )
+                latency_budget = gr.Number(
+                    value=0,
+                    label="Latency budget in seconds (0 = none, not used when streaming)"
+                )
 
             with gr.Row():
                 translate_btn = gr.Button("Translate", variant="primary", size="lg")
@@ -523,7 +492,8 @@ with gr.Blocks(title="TraductAL - Multilingual, multimodal translation system",
 
             translate_btn.click(
                 fn=translate_text,
-                inputs=[input_text, src_lang, tgt_lang, engine_choice, nllb_model_choice, show_details],
+                inputs=[input_text, src_lang, tgt_lang, engine_choice, nllb_model_choice, show_details,
+                        stream_output, profile_choice, latency_budget],
                 outputs=[output_text, details_output]
             )
 
@@ -887,6 +857,13 @@ if __name__ == "__main__":
     print("📡 Server will be available at: http://localhost:7860")
     print("="*60 + "\n")
 
+    # Queueing is required for streamed output; with micro-/continuous
+    # batching, let concurrent requests reach the translator so they can share batches
+    if batch_wait_ms or apertus_max_batch:
+        demo.queue(default_concurrency_limit=int(os.environ.get("TRADUCTAL_CONCURRENCY", "8")))
+    else:
+        demo.queue()
+
     demo.launch(
         server_name="0.0.0.0",
         server_port=7860,
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Language Capability Registry for TraductAL
+One precomputed table of which engines, models, TTS and STT voices support
+each language code; pure Python, so it can be queried without loading torch
+or any model files
+"""
+
+# Translation models the NLLB engine looks for in the models directory
+NLLB_MODELS = ["nllb_200_1.3b", "nllb_200_3.3b", "nllb_200_distilled_1.3b"]
+APERTUS_MODEL = "Apertus-8B"
+
+# Speech models (TTS checkpoints are facebook/mms-tts-<code>)
+TTS_MODEL_TEMPLATE = "facebook/mms-tts-{}"
+WHISPER_MODEL = "openai/whisper"
+ROMANSH_STT_MODEL = "sammy786/wav2vec2-xlsr-romansh_sursilvan"
+
+# Languages where Apertus8B is preferred over NLLB-200 as the Romansh counterpart
+APERTUS_PREFERRED = {"de", "en", "fr", "it", "es", "pt"}
+
+CAPABILITIES = ["nllb", "apertus", "specialist", "romansh", "tts", "stt"]
+
+# code, name, NLLB-200 code, Apertus8B ("core" / "specialist"), MMS-TTS code, Whisper code
+_TABLE = [
+    # Core European languages
+    ("de", "German", "deu_Latn", "core", "deu", "de"),
+    ("en", "English", "eng_Latn", "core", "eng", "en"),
+    ("fr", "French", "fra_Latn", "core", "fra", "fr"),
+    ("it", "Italian", "ita_Latn", "core", None, "it"),        # no MMS-TTS checkpoint
+    ("es", "Spanish", "spa_Latn", "core", "spa", "es"),
+    ("pt", "Portuguese", "por_Latn", "core", "por", "pt"),
+
+    # Major world languages
+    ("ru", "Russian", "rus_Cyrl", "core", "rus", "ru"),
+    ("zh", "Chinese", "zho_Hans", "core", None, "zh"),        # no MMS-TTS checkpoint
+    ("hi", "Hindi", "hin_Deva", "core", "hin", "hi"),
+    ("ar", "Arabic", "arb_Arab", "core", "ara", "ar"),
+    ("ja", "Japanese", "jpn_Jpan", "core", None, "ja"),       # no MMS-TTS checkpoint
+    ("ko", "Korean", "kor_Hang", "core", "kor", "ko"),
+
+    # Additional European languages
+    ("nl", "Dutch", "nld_Latn", None, "nld", "nl"),
+    ("pl", "Polish", "pol_Latn", None, "pol", "pl"),
+    ("cs", "Czech", "ces_Latn", None, "ces", "cs"),
+    ("sv", "Swedish", "swe_Latn", None, "swe", "sv"),
+    ("da", "Danish", "dan_Latn", None, None, "da"),
+    ("no", "Norwegian", "nob_Latn", None, None, "no"),
+    ("fi", "Finnish", "fin_Latn", None, "fin", "fi"),
+    ("el", "Greek", "ell_Grek", None, "ell", "el"),
+    ("tr", "Turkish", "tur_Latn", None, "tur", "tr"),
+    ("hu", "Hungarian", "hun_Latn", None, "hun", "hu"),
+    ("ro", "Romanian", "ron_Latn", None, "ron", "ro"),
+    ("is", "Icelandic", "isl_Latn", None, None, "is"),
+    ("mt", "Maltese", "mlt_Latn", None, None, "mt"),
+    ("ca", "Catalan", "cat_Latn", None, None, "ca"),
+    ("gl", "Galician", "glg_Latn", None, None, "gl"),
+    ("eu", "Basque", "eus_Latn", None, None, "eu"),
+
+    # Slavic and Baltic languages
+    ("uk", "Ukrainian", "ukr_Cyrl", None, None, "uk"),
+    ("bg", "Bulgarian", "bul_Cyrl", None, None, "bg"),
+    ("sr", "Serbian", "srp_Cyrl", None, None, "sr"),
+    ("hr", "Croatian", "hrv_Latn", None, None, "hr"),
+    ("sk", "Slovak", "slk_Latn", None, None, "sk"),
+    ("sl", "Slovenian", "slv_Latn", None, None, "sl"),
+    ("mk", "Macedonian", "mkd_Cyrl", None, None, "mk"),
+    ("sq", "Albanian", "als_Latn", None, None, "sq"),
+    ("lt", "Lithuanian", "lit_Latn", None, None, "lt"),
+    ("lv", "Latvian", "lav_Latn", None, None, "lv"),
+    ("et", "Estonian", "est_Latn", None, None, "et"),
+
+    # Asian and Middle Eastern languages
+    ("vi", "Vietnamese", "vie_Latn", None, "vie", "vi"),
+    ("th", "Thai", "tha_Thai", None, "tha", "th"),
+    ("id", "Indonesian", "ind_Latn", None, "ind", "id"),
+    ("ms", "Malay", "zsm_Latn", None, None, "ms"),
+    ("tl", "Filipino", "tgl_Latn", None, None, "tl"),
+    ("ta", "Tamil", "tam_Taml", None, "tam", "ta"),
+    ("bn", "Bengali", "ben_Beng", None, "ben", "bn"),
+    ("ur", "Urdu", "urd_Arab", None, "urd-script_arabic", "ur"),
+    ("fa", "Persian", "pes_Arab", None, "fas", "fa"),
+    ("he", "Hebrew", "heb_Hebr", None, "heb", "he"),
+
+    # African languages
+    ("sw", "Swahili", "swh_Latn", None, "swh", "sw"),
+    ("am", "Amharic", "amh_Ethi", None, None, "am"),
+    ("ha", "Hausa", "hau_Latn", None, None, "ha"),
+    ("yo", "Yoruba", "yor_Latn", None, None, "yo"),
+    ("ig", "Igbo", "ibo_Latn", None, None, None),
+    ("zu", "Zulu", "zul_Latn", None, None, None),
+    ("af", "Afrikaans", "afr_Latn", None, None, "af"),
+
+    # Celtic and regional languages (Apertus specialist, some also in NLLB-200)
+    ("cy", "Welsh", "cym_Latn", "specialist", None, "cy"),
+    ("ga", "Irish", "gle_Latn", "specialist", None, None),
+    ("gd", "Scottish Gaelic", None, "specialist", None, None),
+    ("br", "Breton", None, "specialist", None, "br"),
+    ("oc", "Occitan", None, "specialist", None, "oc"),
+    ("lb", "Luxembourgish", None, "specialist", None, "lb"),
+    ("fur", "Friulian", None, "specialist", None, None),
+    ("lld", "Ladin", None, "specialist", None, None),
+    ("sc", "Sardinian", None, "specialist", None, None),
+
+    # Romansh variants (Apertus8B only; speech via the Romansh wav2vec2 model)
+    ("rm", "Romansh", None, "specialist", None, None),
+    ("rm-sursilv", "Romansh Sursilvan", None, "specialist", None, None),
+    ("rm-vallader", "Romansh Vallader", None, "specialist", None, None),
+    ("rm-puter", "Romansh Puter", None, "specialist", None, None),
+    ("rm-surmiran", "Romansh Surmiran", None, "specialist", None, None),
+    ("rm-sutsilv", "Romansh Sutsilvan", None, "specialist", None, None),
+    ("rm-rumgr", "Rumantsch Grischun", None, "specialist", None, None),
+]
+
+
+def _build():
+    """Per-code entries with one flag per capability."""
+    registry = {}
+    for code, name, nllb, apertus, tts, whisper in _TABLE:
+        romansh = code == "rm" or code.startswith("rm-")
+        registry[code] = {
+            "name": name,
+            "nllb": nllb,
+            "apertus": apertus is not None,
+            "specialist": apertus == "specialist",
+            "romansh": romansh,
+            "tts": tts,
+            "whisper": whisper,
+            "stt": ROMANSH_STT_MODEL if romansh else (WHISPER_MODEL if whisper else None)
+        }
+    return registry
+
+
+LANGUAGES = _build()
+
+# Precomputed {code: name} per capability, and the reverse for the UI
+_BY_CAPABILITY = {
+    capability: {code: entry["name"] for code, entry in LANGUAGES.items() if entry[capability]}
+    for capability in CAPABILITIES
+}
+_CODES_BY_NAME = {entry["name"]: code for code, entry in LANGUAGES.items()}
+
+
+def supports(code, capability):
+    """True if a language code has a capability (one of CAPABILITIES)."""
+    return code in _BY_CAPABILITY[capability]
+
+
+def languages(capability=None):
+    """{code: name} of the languages with a capability, or of all languages."""
+    if capability is None:
+        return {code: entry["name"] for code, entry in LANGUAGES.items()}
+    return dict(_BY_CAPABILITY[capability])
+
+
+def names(capability=None):
+    """{name: code} of the languages with a capability, for dropdowns."""
+    return {name: code for code, name in languages(capability).items()}
+
+
+def language_name(code):
+    """Display name of a code (the code itself if unknown)."""
+    entry = LANGUAGES.get(code)
+    return entry["name"] if entry else code
+
+
+def code_for_name(name):
+    """Language code of a display name, or None."""
+    return _CODES_BY_NAME.get(name)
+
+
+def is_romansh(code):
+    """Check if a language code is a Romansh variant."""
+    return code == "rm" or code.startswith("rm-")
+
+
+def nllb_code(code):
+    """NLLB-200 language token (e.g. 'eng_Latn'), or None."""
+    entry = LANGUAGES.get(code)
+    return entry["nllb"] if entry else None
+
+
+def tts_code(code):
+    """MMS-TTS language code (ISO 639-3), or None."""
+    entry = LANGUAGES.get(code)
+    return entry["tts"] if entry else None
+
+
+def whisper_code(code):
+    """Whisper language code, or None (auto-detect)."""
+    entry = LANGUAGES.get(code)
+    return entry["whisper"] if entry else None
+
+
+def engines_for(code):
+    """Translation engines that support a code, preferred one first."""
+    entry = LANGUAGES.get(code)
+    if entry is None:
+        # Unlisted languages go to Apertus8B (broadest coverage)
+        return ["apertus"]
+    engines = [engine for engine in ("nllb", "apertus") if entry[engine]]
+    if entry["specialist"]:
+        engines.reverse()
+    return engines
+
+
+def models_for(code):
+    """
+    Every model that can handle a language code.
+
+    Returns:
+        dict with name, engines, translation models per engine, and the
+        TTS / STT model (None where unsupported)
+    """
+    entry = LANGUAGES.get(code, {})
+    engines = engines_for(code)
+    translation = {}
+    if "nllb" in engines:
+        translation["nllb"] = list(NLLB_MODELS)
+    if "apertus" in engines:
+        translation["apertus"] = [APERTUS_MODEL]
+    return {
+        "code": code,
+        "name": language_name(code),
+        "engines": engines,
+        "translation": translation,
+        "tts": TTS_MODEL_TEMPLATE.format(entry["tts"]) if entry.get("tts") else None,
+        "stt": entry.get("stt")
+    }
+
+
+def main():
+    """Print the capabilities of one or all languages."""
+    import sys
+
+    codes = sys.argv[1:] or list(LANGUAGES)
+    print(f"{'Code':12} {'Name':20} {'Engines':14} {'NLLB':10} {'TTS':18} STT")
+    print("=" * 80)
+    for code in codes:
+        info = models_for(code)
+        print(f"{code:12} {info['name']:20} {'+'.join(info['engines']):14} "
+              f"{nllb_code(code) or '-':10} {tts_code(code) or '-':18} {info['stt'] or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Dynamic Micro-Batching Scheduler for NLLB-200
+Gathers segments from concurrent callers into shared generate() batches
+"""
+
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class _PendingRequest:
+    """Rows submitted by one caller, waiting to be translated."""
+
+    def __init__(self, rows, model_name, config=None):
+        self.rows = rows
+        self.model_name = model_name
+        self.config = config
+        # Requests share generate() calls only with the same model and settings
+        self.group = (model_name, tuple(sorted(config.items())) if config else None)
+        self.future = Future()
+        # Cheap estimate (≈4 chars per token) - exact lengths are computed
+        # by the translator when the batch is built
+        self.tokens = sum(max(1, len(segment) // 4) for segment, _, _ in rows)
+
+
+class NLLBBatchScheduler:
+    """
+    Runs a single worker thread in front of an EnhancedOfflineTranslator.
+
+    Callers submit their chunks and block until their own translations are
+    ready. The worker waits up to ``max_wait_ms`` after the first pending
+    request (or until ``token_budget`` is filled), then translates everything
+    it collected in as few generate() calls as possible and hands each caller
+    back its own results, in order. Rows of different language pairs share
+    the same batches (each row carries its own source and target tags).
+    """
+
+    def __init__(self, translator, max_wait_ms=10, token_budget=None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            translator: EnhancedOfflineTranslator owning the models
+            max_wait_ms: How long to gather requests after the first arrives
+            token_budget: Estimated tokens that trigger an early flush
+                          (defaults to the translator's batch_token_budget)
+        """
+        self.translator = translator
+        self.max_wait = max_wait_ms / 1000.0
+        self.token_budget = token_budget or translator.batch_token_budget
+
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="nllb-scheduler", daemon=True)
+        self._worker.start()
+
+        # Counters for monitoring
+        self.stats = {"requests": 0, "flushes": 0, "segments": 0}
+
+    def submit(self, rows, model_name=None, config=None):
+        """
+        Queue rows for translation and return a Future of translations.
+
+        Args:
+            rows: List of (segment, src_lang, tgt_lang) tuples
+            model_name: Model to use (defaults to the translator's current model)
+            config: Generation settings (defaults to the translator's own)
+
+        Returns:
+            concurrent.futures.Future resolving to a list of strings
+        """
+        request = _PendingRequest(list(rows), model_name or self.translator.current_model_name, config)
+        if self._stopped.is_set():
+            request.future.set_exception(RuntimeError("Scheduler is stopped"))
+        else:
+            self._queue.put(request)
+        return request.future
+
+    def translate(self, rows, model_name=None, config=None):
+        """Blocking helper: submit rows and wait for their translations."""
+        return self.submit(rows, model_name, config).result()
+
+    def stop(self):
+        """Stop the worker thread after the current flush."""
+        self._stopped.set()
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self, first):
+        """Gather requests until the wait window closes or the budget fills."""
+        pending = [first]
+        tokens = first.tokens
+        deadline = time.monotonic() + self.max_wait
+
+        while tokens < self.token_budget:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                self._stopped.set()
+                break
+            pending.append(request)
+            tokens += request.tokens
+
+        return pending
+
+    def _flush(self, pending):
+        """Translate all pending requests, grouped by model and generation settings."""
+        groups = {}
+        for request in pending:
+            groups.setdefault(request.group, []).append(request)
+
+        self.stats["flushes"] += 1
+        self.stats["requests"] += len(pending)
+
+        for (model_name, _), requests in groups.items():
+            rows = [row for r in requests for row in r.rows]
+            self.stats["segments"] += len(rows)
+            try:
+                translations = self.translator.generate_segments(
+                    rows, model_name=model_name, config=requests[0].config
+                )
+            except Exception as e:
+                for request in requests:
+                    request.future.set_exception(e)
+                continue
+
+            offset = 0
+            for request in requests:
+                n = len(request.rows)
+                request.future.set_result(translations[offset:offset + n])
+                offset += n
+
+    def _run(self):
+        """Worker loop."""
+        while not self._stopped.is_set():
+            first = self._queue.get()
+            if first is None:
+                break
+            self._flush(self._collect(first))
+
+        # Fail anything still queued so callers don't block forever
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                request.future.set_exception(RuntimeError("Scheduler is stopped"))
@@ -14,9 +14,12 @@ from pathlib import Path
 import warnings
 warnings.filterwarnings("ignore")
 
+import language_registry
+from cpu_features import cpu_supports_bf16
+
 try:
     import torch
-    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+    from transformers import AutoConfig, AutoTokenizer, AutoModelForSeq2SeqLM
     print("✅ Required packages loaded successfully")
 except ImportError as e:
     print("❌ Error: Required packages not installed")
@@ -24,91 +27,101 @@ except ImportError as e:
     sys.exit(1)
 
 try:
-    from text_chunker import SmartTextChunker
+    from text_chunker import SmartTextChunker, deduplicate, normalize_segment
 except ImportError:
     # Chunker not available, will use basic sentence splitting
     SmartTextChunker = None
+    deduplicate = None
+
+try:
+    import ctranslate2_backend
+except ImportError:
+    ctranslate2_backend = None
+
+# Reduced-precision NLLB variants, cached next to the original as <name>_<precision>
+PRECISION_MODES = ["int8", "bf16"]
+
+
+def precision_supported(precision):
+    """Whether this machine can run NLLB weights in a reduced precision (one of PRECISION_MODES)."""
+    if precision == "int8":
+        # Dynamic quantization needs a quantized CPU kernel backend (fbgemm, x86, qnnpack)
+        return any(engine != "none" for engine in torch.backends.quantized.supported_engines)
+    if precision == "bf16":
+        if torch.cuda.is_available():
+            return torch.cuda.is_bf16_supported()
+        return cpu_supports_bf16()
+    return False
+
+# Named decoding profiles: beam width, length penalty and output length
+# (max_length = longest source row × max_length_ratio + max_length_offset,
+# never above the max_length of the base settings)
+DECODING_PROFILES = {
+    "interactive": {"num_beams": 1, "length_penalty": 1.0, "max_length_ratio": 1.5, "max_length_offset": 10},
+    "balanced": {"num_beams": 3, "length_penalty": 1.0, "max_length_ratio": 2.0, "max_length_offset": 16},
+    "archival": {"num_beams": 5, "length_penalty": 1.1, "max_length_ratio": 3.0, "max_length_offset": 32},
+}
+
+# Expected output tokens per source token, for latency estimates
+OUTPUT_LENGTH_RATIO = 1.2
+
 
 class EnhancedOfflineTranslator:
     """Enhanced offline neural machine translator supporting MT5 and NLLB-200."""
     
-    def __init__(self, models_dir="./models/deployed_models"):
+    def __init__(self, models_dir="./models/deployed_models", batch_token_budget=2048,
+                 translation_memory=None, backend="pytorch", precision="float32", fuzzy_memory=None):
         self.models_dir = Path(models_dir)
+
+        # Inference backend preferred when auto-selecting a model: "pytorch"
+        # or "ctranslate2" (int8 CTranslate2 conversion of the NLLB checkpoint)
+        self.backend = backend
+
+        # PyTorch weight precision preferred for NLLB: "float32", "int8"
+        # (dynamic quantization of Linear layers) or "bf16"
+        self.precision = precision
         self.models = {}
         self.tokenizers = {}
         self.current_model = None
         self.current_model_name = None
-        
-        # NLLB-200 language codes (subset of most common ones)
-        self.nllb_languages = {
-            'en': 'eng_Latn',    # English
-            'fr': 'fra_Latn',    # French  
-            'de': 'deu_Latn',    # German
-            'es': 'spa_Latn',    # Spanish
-            'it': 'ita_Latn',    # Italian
-            'pt': 'por_Latn',    # Portuguese
-            'ru': 'rus_Cyrl',    # Russian
-            'zh': 'zho_Hans',    # Chinese (Simplified)
-            'ja': 'jpn_Jpan',    # Japanese
-            'ko': 'kor_Hang',    # Korean
-            'ar': 'arb_Arab',    # Arabic
-            'hi': 'hin_Deva',    # Hindi
-            'tr': 'tur_Latn',    # Turkish
-            'pl': 'pol_Latn',    # Polish
-            'nl': 'nld_Latn',    # Dutch
-            'sv': 'swe_Latn',    # Swedish
-            'da': 'dan_Latn',    # Danish
-            'no': 'nor_Latn',    # Norwegian
-            'fi': 'fin_Latn',    # Finnish
-            'cs': 'ces_Latn',    # Czech
-            'hu': 'hun_Latn',    # Hungarian
-            'ro': 'ron_Latn',    # Romanian
-            'bg': 'bul_Cyrl',    # Bulgarian
-            'hr': 'hrv_Latn',    # Croatian
-            'sk': 'slk_Latn',    # Slovak
-            'sl': 'slv_Latn',    # Slovenian
-            'et': 'est_Latn',    # Estonian
-            'lv': 'lav_Latn',    # Latvian
-            'lt': 'lit_Latn',    # Lithuanian
-            'el': 'ell_Grek',    # Greek
-            'he': 'heb_Hebr',    # Hebrew
-            'th': 'tha_Thai',    # Thai
-            'vi': 'vie_Latn',    # Vietnamese
-            'id': 'ind_Latn',    # Indonesian
-            'ms': 'zsm_Latn',    # Malay
-            'tl': 'tgl_Latn',    # Filipino
-            'sw': 'swh_Latn',    # Swahili
-            'am': 'amh_Ethi',    # Amharic
-            'yo': 'yor_Latn',    # Yoruba
-            'ig': 'ibo_Latn',    # Igbo
-            'ha': 'hau_Latn',    # Hausa
-            'zu': 'zul_Latn',    # Zulu
-            'af': 'afr_Latn',    # Afrikaans
-            'is': 'isl_Latn',    # Icelandic
-            'mt': 'mlt_Latn',    # Maltese
-            'cy': 'cym_Latn',    # Welsh
-            'ga': 'gle_Latn',    # Irish
-            'eu': 'eus_Latn',    # Basque
-            'ca': 'cat_Latn',    # Catalan
-            'gl': 'glg_Latn',    # Galician
+
+        # Maximum padded source tokens (rows x longest row) per generate() call
+        self.batch_token_budget = batch_token_budget
+
+        # Optional cross-request micro-batching (see enable_scheduler)
+        self.scheduler = None
+
+        # Optional persistent segment cache (translation_memory.TranslationMemory)
+        self.translation_memory = translation_memory
+
+        # Optional near-match lookup per segment after an exact miss
+        # (translation_memory.FuzzyTranslationMemory)
+        self.fuzzy_memory = fuzzy_memory
+
+        # Beam search settings for NLLB (also part of the translation-memory key)
+        self.generation_config = {
+            "max_length": 512,
+            "num_beams": 5,
+            "early_stopping": True,
+            "no_repeat_ngram_size": 2
         }
-        
-        # Language names for display
-        self.language_names = {
-            'en': 'English', 'fr': 'French', 'de': 'German', 'es': 'Spanish',
-            'it': 'Italian', 'pt': 'Portuguese', 'ru': 'Russian', 'zh': 'Chinese',
-            'ja': 'Japanese', 'ko': 'Korean', 'ar': 'Arabic', 'hi': 'Hindi',
-            'tr': 'Turkish', 'pl': 'Polish', 'nl': 'Dutch', 'sv': 'Swedish',
-            'da': 'Danish', 'no': 'Norwegian', 'fi': 'Finnish', 'cs': 'Czech',
-            'hu': 'Hungarian', 'ro': 'Romanian', 'bg': 'Bulgarian', 'hr': 'Croatian',
-            'sk': 'Slovak', 'sl': 'Slovenian', 'et': 'Estonian', 'lv': 'Latvian',
-            'lt': 'Lithuanian', 'el': 'Greek', 'he': 'Hebrew', 'th': 'Thai',
-            'vi': 'Vietnamese', 'id': 'Indonesian', 'ms': 'Malay', 'tl': 'Filipino',
-            'sw': 'Swahili', 'am': 'Amharic', 'yo': 'Yoruba', 'ig': 'Igbo',
-            'ha': 'Hausa', 'zu': 'Zulu', 'af': 'Afrikaans', 'is': 'Icelandic',
-            'mt': 'Maltese', 'cy': 'Welsh', 'ga': 'Irish', 'eu': 'Basque',
-            'ca': 'Catalan', 'gl': 'Galician'
+
+        # Default beam search settings for MT5/T5
+        self.mt5_generation_config = {
+            "max_length": 512,
+            "num_beams": 4,
+            "early_stopping": True,
+            "no_repeat_ngram_size": 2
         }
+
+        # Measured decoding speed per loaded model (beam-tokens/sec), used to
+        # fit beam width to a latency budget
+        self.decode_rates = {}
+        
+        # NLLB-200 language tokens and display names, from the capability registry
+        self.nllb_languages = {code: language_registry.nllb_code(code)
+                               for code in language_registry.languages("nllb")}
+        self.language_names = language_registry.languages("nllb")
         
         print("🌍 Enhanced Offline Neural MT System")
         print("🔒 Complete privacy - all processing happens locally")
@@ -120,13 +133,25 @@ class EnhancedOfflineTranslator:
     def detect_available_models(self):
         """Detect which models are available."""
         self.available_models = {}
+        precisions = [precision for precision in PRECISION_MODES if precision_supported(precision)]
+        if self.precision in PRECISION_MODES and self.precision not in precisions:
+            print(f"⚠️  {self.precision} NLLB weights are not supported on this machine - using float32")
         
         # Check for NLLB models with correct naming
-        nllb_models = [
-            "nllb_200_1.3b", "nllb_200_3.3b", "nllb_200_distilled_1.3b"
-        ]
-        
-        for model_name in nllb_models:
+        for model_name in language_registry.NLLB_MODELS:
+            # Vocabulary-trimmed export (scripts/trim_nllb_vocab.py)
+            trimmed_path = self.models_dir / f"{model_name}_trimmed"
+            if (trimmed_path / "trim_metadata.json").exists():
+                with open(trimmed_path / "trim_metadata.json") as f:
+                    trim_info = json.load(f)
+                self.available_models[trimmed_path.name] = {
+                    "path": trimmed_path,
+                    "type": f"NLLB-200 (trimmed vocab, {trim_info['vocab']:,} tokens)",
+                    "vocab": trim_info["vocab"],
+                    "languages": len(self.nllb_languages),
+                    "quality": "High" if "3.3b" in model_name else "Very Good"
+                }
+
             model_path = self.models_dir / model_name
             if model_path.exists() and any(model_path.iterdir()):
                 self.available_models[model_name] = {
@@ -135,6 +160,33 @@ class EnhancedOfflineTranslator:
                     "languages": len(self.nllb_languages),
                     "quality": "High" if "3.3b" in model_name else "Very Good"
                 }
+
+                # Reduced-precision PyTorch variants the hardware can run,
+                # converted on first load if not cached yet
+                for precision in precisions:
+                    variant_path = self.models_dir / f"{model_name}_{precision}"
+                    self.available_models[variant_path.name] = {
+                        "path": variant_path,
+                        "source_path": model_path,
+                        "type": f"NLLB-200 ({precision})",
+                        "precision": precision,
+                        "converted": (variant_path / "precision.json").exists(),
+                        "languages": len(self.nllb_languages),
+                        "quality": "High" if "3.3b" in model_name else "Very Good"
+                    }
+
+                # int8 CTranslate2 variant, converted on first load if not cached yet
+                if ctranslate2_backend and ctranslate2_backend.is_available():
+                    ct2_path = ctranslate2_backend.converted_path(model_path)
+                    self.available_models[ct2_path.name] = {
+                        "path": ct2_path,
+                        "source_path": model_path,
+                        "type": "NLLB-200 (CTranslate2 int8)",
+                        "backend": "ctranslate2",
+                        "converted": ctranslate2_backend.is_converted(ct2_path),
+                        "languages": len(self.nllb_languages),
+                        "quality": "High" if "3.3b" in model_name else "Very Good"
+                    }
         
         # Check for MT5 models
         mt5_models = ["mt5_small", "mt5_base", "t5_small", "t5_base"]
@@ -170,6 +222,11 @@ class EnhancedOfflineTranslator:
         try:
             print(f"⏳ Loading model: {model_name}")
             start_time = time.time()
+
+            if self.available_models[model_name].get("backend") == "ctranslate2":
+                return self._load_ctranslate2(model_name, start_time)
+            if self.available_models[model_name].get("precision"):
+                return self._load_precision_variant(model_name, start_time)
             
             # Load tokenizer and model
             tokenizer = AutoTokenizer.from_pretrained(model_path)
@@ -197,14 +254,116 @@ class EnhancedOfflineTranslator:
             print(f"❌ Failed to load model {model_name}: {str(e)}")
             return False
     
-    def translate_nllb(self, text, src_lang, tgt_lang):
-        """Translate using NLLB-200 model with smart chunking for long texts."""
-        if src_lang not in self.nllb_languages or tgt_lang not in self.nllb_languages:
-            return f"❌ Language not supported. Available: {list(self.nllb_languages.keys())}"
+    def _load_ctranslate2(self, model_name, start_time):
+        """Load (converting first if needed) an int8 CTranslate2 NLLB model."""
+        info = self.available_models[model_name]
+        model_path = info["path"]
 
-        tokenizer = self.tokenizers[self.current_model_name]
-        tokenizer.src_lang = self.nllb_languages[src_lang]
+        if not ctranslate2_backend.is_converted(model_path):
+            ctranslate2_backend.convert_model(info["source_path"], model_path)
+            info["converted"] = True
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+        model = ctranslate2_backend.CTranslate2Seq2Seq(
+            model_path, device=device, compute_type="int8" if device == "cpu" else "int8_float16"
+        )
+
+        load_time = time.time() - start_time
+
+        self.models[model_name] = model
+        self.tokenizers[model_name] = tokenizer
+        self.current_model = model
+        self.current_model_name = model_name
 
+        print(f"✅ Model loaded in {load_time:.1f}s")
+        info["active_precision"] = model.compute_type
+        print(f"⚡ Backend: CTranslate2 ({model.compute_type})")
+        print(f"💾 Device: {device}")
+
+        return True
+
+    def _load_precision_variant(self, model_name, start_time):
+        """
+        Load an int8 (dynamic quantization) or bf16 NLLB variant.
+
+        The converted model is saved to the variant directory the first time,
+        so later loads read the smaller checkpoint directly instead of the
+        float32 weights. int8 variants are stored as a state_dict with the
+        model config: loading rebuilds the model from the config, quantizes
+        it again and fills in the saved weights (weights_only, no pickled
+        modules).
+        """
+        info = self.available_models[model_name]
+        precision = info["precision"]
+        cache_path = info["path"]
+        metadata_file = cache_path / "precision.json"
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+        if precision == "int8":
+            # Dynamically quantized Linear layers only run on CPU
+            device = torch.device("cpu")
+            state_file = cache_path / "model_state.pt"
+            if metadata_file.exists() and state_file.exists():
+                tokenizer = AutoTokenizer.from_pretrained(cache_path)
+                model = AutoModelForSeq2SeqLM.from_config(AutoConfig.from_pretrained(cache_path))
+                model.eval()
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                model.load_state_dict(torch.load(state_file, map_location="cpu", weights_only=True))
+            else:
+                print("🔧 Quantizing Linear layers to int8 (first load only)...")
+                tokenizer = AutoTokenizer.from_pretrained(info["source_path"])
+                model = AutoModelForSeq2SeqLM.from_pretrained(info["source_path"])
+                model.eval()
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                cache_path.mkdir(parents=True, exist_ok=True)
+                torch.save(model.state_dict(), state_file)
+                model.config.save_pretrained(cache_path)
+                tokenizer.save_pretrained(cache_path)
+                # Caches from earlier versions held a pickled module
+                (cache_path / "model.pt").unlink(missing_ok=True)
+
+        else:
+            if device.type == "cpu" and not cpu_supports_bf16():
+                # Emulated bf16 matmuls are slower than float32 - keep full precision
+                print("⚠️  CPU has no native bf16 support - loading float32 weights instead")
+                precision = "float32"
+                tokenizer = AutoTokenizer.from_pretrained(info["source_path"])
+                model = AutoModelForSeq2SeqLM.from_pretrained(info["source_path"])
+            elif metadata_file.exists():
+                tokenizer = AutoTokenizer.from_pretrained(cache_path)
+                model = AutoModelForSeq2SeqLM.from_pretrained(cache_path, torch_dtype=torch.bfloat16)
+            else:
+                print("🔧 Converting weights to bf16 (first load only)...")
+                tokenizer = AutoTokenizer.from_pretrained(info["source_path"])
+                model = AutoModelForSeq2SeqLM.from_pretrained(info["source_path"], torch_dtype=torch.bfloat16)
+                model.save_pretrained(cache_path)
+                tokenizer.save_pretrained(cache_path)
+
+        if info["precision"] == precision and not metadata_file.exists():
+            with open(metadata_file, "w") as f:
+                json.dump({"precision": precision, "source": info["source_path"].name}, f, indent=2)
+            info["converted"] = True
+
+        model = model.to(device)
+        load_time = time.time() - start_time
+
+        # Record the precision actually in use
+        info["active_precision"] = precision
+
+        self.models[model_name] = model
+        self.tokenizers[model_name] = tokenizer
+        self.current_model = model
+        self.current_model_name = model_name
+
+        print(f"✅ Model loaded in {load_time:.1f}s")
+        print(f"🎚️  Precision: {precision}")
+        print(f"💾 Device: {device}")
+
+        return True
+
+    def _chunk_text(self, text, tokenizer):
+        """Split text into (chunk, chunk_type) pairs that fit the model input."""
         # Use smart chunking if available
         if SmartTextChunker:
             chunker = SmartTextChunker(max_tokens=400, tokenizer=tokenizer)
@@ -219,52 +378,600 @@ class EnhancedOfflineTranslator:
             sentences = re.split(r'(?<=[.!?])\s+', text.strip())
             chunks = [(s, 'sentence') for s in sentences if s.strip()]
 
-        translations = []
-        device = next(self.current_model.parameters()).device
-        tgt_lang_code = self.nllb_languages[tgt_lang]
-        forced_bos_token_id = getattr(tokenizer, 'lang_code_to_id', {}).get(tgt_lang_code) or tokenizer.convert_tokens_to_ids(tgt_lang_code)
+        return chunks
 
-        for i, (chunk, chunk_type) in enumerate(chunks, 1):
-            if not chunk.strip():
+    def _join_chunks(self, translations, chunks):
+        """Join chunk translations, preserving paragraph breaks for paragraph-level chunks."""
+        if SmartTextChunker and any(ct == 'paragraph' for _, ct in chunks):
+            # Preserve paragraph structure
+            result = []
+            for translation, (_, chunk_type) in zip(translations, chunks):
+                result.append(translation)
+                if chunk_type == 'paragraph':
+                    result.append('\n\n')
+            return ''.join(result).strip()
+        else:
+            # Standard sentence joining
+            return ' '.join(translations)
+
+    def _generate_rows(self, rows, model_name=None, stats=None, config=None):
+        """
+        Translate (segment, src, tgt) rows, through the translation memory
+        and the scheduler if enabled.
+
+        Repeated rows are translated once and fanned back out to every
+        position they occupy.
+
+        Args:
+            rows: List of (segment, src_lang, tgt_lang) tuples
+            model_name: NLLB model to use (defaults to the current one)
+            stats: Optional dict that receives cache_hits / cache_misses and
+                   model_calls_saved (duplicates not translated) counts
+            config: Generation settings (see decoding_config; defaults to
+                    self.generation_config)
+        """
+        model_name = model_name or self.current_model_name
+        config = config or self.generation_config
+
+        if deduplicate and len(rows) > 1:
+            unique_rows, positions = deduplicate(
+                rows, key=lambda row: (normalize_segment(row[0]), row[1], row[2])
+            )
+            if len(unique_rows) < len(rows):
+                if stats is not None:
+                    stats["model_calls_saved"] = stats.get("model_calls_saved", 0) + len(rows) - len(unique_rows)
+                print(f"♻️  {len(rows) - len(unique_rows)} repeated segments translated once")
+                unique_translations = self._generate_rows(unique_rows, model_name, stats, config)
+                return [unique_translations[p] for p in positions]
+
+        translations = [None] * len(rows)
+        pending = list(range(len(rows)))
+
+        tm = self.translation_memory
+        if tm:
+            pending = []
+            for i, (segment, src_lang, tgt_lang) in enumerate(rows):
+                cached = tm.get("nllb", model_name, src_lang, tgt_lang, segment, config)
+                if cached is None:
+                    pending.append(i)
+                else:
+                    translations[i] = cached
+            if stats is not None:
+                stats["cache_hits"] = stats.get("cache_hits", 0) + len(rows) - len(pending)
+                stats["cache_misses"] = stats.get("cache_misses", 0) + len(pending)
+
+        if pending and self.fuzzy_memory:
+            unmatched = []
+            for i in pending:
+                segment, src_lang, tgt_lang = rows[i]
+                translations[i] = self._fuzzy_translation(segment, src_lang, tgt_lang, model_name, config, stats)
+                if translations[i] is None:
+                    unmatched.append(i)
+            pending = unmatched
+
+        if pending:
+            pending_rows = [rows[i] for i in pending]
+            if self.scheduler:
+                # Share generate() calls with other concurrent requests
+                generated = self.scheduler.translate(pending_rows, model_name, config)
+            else:
+                generated = self.generate_segments(pending_rows, model_name, config)
+
+            new_entries = {}
+            for i, translation in zip(pending, generated):
+                translations[i] = translation
+                segment, src_lang, tgt_lang = rows[i]
+                new_entries.setdefault((src_lang, tgt_lang), []).append((segment, translation))
+
+            if tm:
+                for (src_lang, tgt_lang), pairs in new_entries.items():
+                    tm.put_many(pairs, "nllb", model_name, src_lang, tgt_lang, config)
+
+        return translations
+
+    def _fuzzy_translation(self, segment, src_lang, tgt_lang, model_name, config, stats=None):
+        """
+        Stored translation of a near-identical segment, or None.
+
+        Looks in the fuzzy index of the same translation-memory key. Every
+        match is reported in ``stats['fuzzy_matches']``; NLLB cannot take a
+        reference example, so 'hint' matches are reported but not used.
+        """
+        match = self.fuzzy_memory.lookup(segment, src_lang, tgt_lang, "nllb", model_name, config)
+        if match is None:
+            return None
+        if stats is not None:
+            stats.setdefault("fuzzy_matches", []).append(match)
+        if match["mode"] == "hint":
+            return None
+        if stats is not None:
+            stats["fuzzy_hits"] = stats.get("fuzzy_hits", 0) + 1
+            stats["needs_review"] = stats.get("needs_review", False) or match["needs_review"]
+        return match["translation"]
+
+    def translate_nllb(self, text, src_lang, tgt_lang, stats=None, config=None):
+        """Translate using NLLB-200 model with smart chunking for long texts."""
+        if src_lang not in self.nllb_languages or tgt_lang not in self.nllb_languages:
+            return f"❌ Language not supported. Available: {list(self.nllb_languages.keys())}"
+
+        tokenizer = self.tokenizers[self.current_model_name]
+        chunks = self._chunk_text(text, tokenizer)
+
+        translations = self._generate_rows(
+            [(chunk, src_lang, tgt_lang) for chunk, _ in chunks], stats=stats, config=config
+        )
+
+        if len(chunks) > 1:
+            print(f"✅ Translation complete: {len(chunks)} chunks processed")
+
+        return self._join_chunks(translations, chunks)
+
+    def translate_batch(self, items, model_name=None, stats=None, profile=None):
+        """
+        Translate many texts with mixed language pairs in shared NLLB batches.
+
+        Every text is chunked, then all chunks - whatever their (src, tgt)
+        pair - are tokenized with their own source tag and decoded together,
+        each row starting from its own target-language token.
+
+        Args:
+            items: List of (text, src_lang, tgt_lang) tuples
+            model_name: NLLB model to use (defaults to the current/best one)
+            stats: Optional dict that receives cache_hits / cache_misses counts
+            profile: Decoding profile name (see DECODING_PROFILES)
+
+        Returns:
+            List of translations aligned with ``items``; rows with an
+            unsupported language pair contain an error string instead
+        """
+        if not self._ensure_model(model_name):
+            return ["❌ No models available"] * len(items)
+        if "NLLB" not in self.available_models[self.current_model_name]["type"]:
+            return [f"❌ Batch translation requires an NLLB model, not {self.current_model_name}"] * len(items)
+
+        tokenizer = self.tokenizers[self.current_model_name]
+        results = [None] * len(items)
+        rows = []
+        spans = []
+
+        for i, (text, src_lang, tgt_lang) in enumerate(items):
+            if src_lang not in self.nllb_languages or tgt_lang not in self.nllb_languages:
+                results[i] = f"❌ Language not supported: {src_lang} → {tgt_lang}"
+                continue
+            if not text.strip():
+                results[i] = ""
                 continue
+            chunks = self._chunk_text(text, tokenizer)
+            spans.append((i, len(rows), chunks))
+            rows.extend((chunk, src_lang, tgt_lang) for chunk, _ in chunks)
+
+        config, _ = self.decoding_config(profile)
+        translations = self._generate_rows(rows, stats=stats, config=config) if rows else []
+
+        for i, start, chunks in spans:
+            results[i] = self._join_chunks(translations[start:start + len(chunks)], chunks)
+
+        return results
+
+    def translate_many(self, text, src_lang, tgt_langs, model_name=None, stats=None, profile=None):
+        """
+        Translate one text into several target languages with a single encoder pass.
+
+        The source is chunked and encoded once; each chunk's encoder states are
+        then repeated for every target and decoded together, each row primed
+        with its own target-language token. Encoding cost is thus paid once
+        however many targets are requested. Generation does not go through the
+        micro-batching scheduler.
+
+        Args:
+            text: Source text
+            src_lang: Source language code
+            tgt_langs: List of target language codes
+            model_name: NLLB model to use (defaults to the current/best one)
+            stats: Optional dict that receives cache_hits / cache_misses and
+                   model_calls_saved counts
+            profile: Decoding profile name (see DECODING_PROFILES)
+
+        Returns:
+            dict mapping each target language to its translation (or an
+            error string for unsupported targets)
+        """
+        if not self._ensure_model(model_name):
+            return {tgt_lang: "❌ No models available" for tgt_lang in tgt_langs}
+        if "NLLB" not in self.available_models[self.current_model_name]["type"]:
+            return {tgt_lang: f"❌ Multi-target translation requires an NLLB model, not {self.current_model_name}"
+                    for tgt_lang in tgt_langs}
+        if src_lang not in self.nllb_languages:
+            return {tgt_lang: f"❌ Language not supported: {src_lang}" for tgt_lang in tgt_langs}
+
+        model_name = self.current_model_name
+        tokenizer = self.tokenizers[model_name]
+        config, _ = self.decoding_config(profile)
+        results = {}
+        targets = []
+        for tgt_lang in dict.fromkeys(tgt_langs):
+            if tgt_lang not in self.nllb_languages:
+                results[tgt_lang] = f"❌ Language not supported: {src_lang} → {tgt_lang}"
+            elif not text.strip():
+                results[tgt_lang] = ""
+            else:
+                targets.append(tgt_lang)
+        if not targets:
+            return results
+
+        chunks = self._chunk_text(text, tokenizer)
+        segments = [chunk for chunk, _ in chunks]
+        if deduplicate:
+            segments, positions = deduplicate(segments)
+        else:
+            positions = list(range(len(segments)))
+        if stats is not None and len(segments) < len(chunks):
+            stats["model_calls_saved"] = stats.get("model_calls_saved", 0) + (len(chunks) - len(segments)) * len(targets)
+
+        # translations[tgt][j] for every unique segment j
+        translations = {tgt_lang: [None] * len(segments) for tgt_lang in targets}
+        needed = [[] for _ in segments]
+        tm = self.translation_memory
+        for j, segment in enumerate(segments):
+            for tgt_lang in targets:
+                cached = tm.get("nllb", model_name, src_lang, tgt_lang, segment, config) if tm else None
+                if cached is None:
+                    needed[j].append(tgt_lang)
+                else:
+                    translations[tgt_lang][j] = cached
+        if tm and stats is not None:
+            misses = sum(len(tgts) for tgts in needed)
+            stats["cache_hits"] = stats.get("cache_hits", 0) + len(segments) * len(targets) - misses
+            stats["cache_misses"] = stats.get("cache_misses", 0) + misses
+
+        pending = []
+        for j, tgts in enumerate(needed):
+            if not tgts:
+                continue
+            if segments[j].strip():
+                pending.append(j)
+            else:
+                for tgt_lang in tgts:
+                    translations[tgt_lang][j] = ""
+
+        if pending:
+            encoded = self._encode(tokenizer, [segments[j] for j in pending], src_lang)
+            generated = self._generate_shared_encoder(
+                encoded, [needed[j] for j in pending], tokenizer, self.models[model_name], config
+            )
+
+            new_entries = {}
+            for j, outputs in zip(pending, generated):
+                for tgt_lang, translation in outputs.items():
+                    translations[tgt_lang][j] = translation
+                    new_entries.setdefault(tgt_lang, []).append((segments[j], translation))
+            if tm:
+                for tgt_lang, pairs in new_entries.items():
+                    tm.put_many(pairs, "nllb", model_name, src_lang, tgt_lang, config)
+
+        for tgt_lang in targets:
+            results[tgt_lang] = self._join_chunks([translations[tgt_lang][p] for p in positions], chunks)
+
+        return {tgt_lang: results[tgt_lang] for tgt_lang in dict.fromkeys(tgt_langs)}
+
+    def _generate_shared_encoder(self, input_ids, row_targets, tokenizer, model, config=None):
+        """
+        Encode each source row once and decode it into several targets.
+
+        Args:
+            input_ids: Per-row source token ids
+            row_targets: Per-row list of target language codes to generate
+            tokenizer: Tokenizer used for padding and decoding
+            model: Seq2seq NLLB model
+            config: Generation settings (defaults to self.generation_config)
+
+        Returns:
+            Per-row dict mapping target language code to translation
+        """
+        outputs = [{} for _ in input_ids]
+
+        if getattr(model, "backend", None) == "ctranslate2":
+            # No encoder-state reuse here: one (source, target) row per pair
+            flat_rows = [(i, tgt_lang) for i, tgts in enumerate(row_targets) for tgt_lang in tgts]
+            decoded = self._generate_batched(
+                [input_ids[i] for i, _ in flat_rows],
+                [self._lang_token_id(tokenizer, self.nllb_languages[tgt_lang]) for _, tgt_lang in flat_rows],
+                tokenizer, model, config
+            )
+            for (i, tgt_lang), translation in zip(flat_rows, decoded):
+                outputs[i][tgt_lang] = translation
+            return outputs
+
+        from transformers.modeling_outputs import BaseModelOutput
+
+        # Budget the decoder side: each source row fans out into one row per target
+        batches = self._plan_batches([len(ids) * len(tgts) for ids, tgts in zip(input_ids, row_targets)])
+
+        device = next(model.parameters()).device
+        decoder_start_token_id = model.config.decoder_start_token_id
+        encoder = model.get_encoder()
+
+        for n, batch in enumerate(batches, 1):
+            if len(batches) > 1:
+                print(f"   Batch {n}/{len(batches)}: {len(batch)} chunks × {len(row_targets[batch[0]])} targets")
+
+            features = {
+                'input_ids': [input_ids[i] for i in batch],
+                'attention_mask': [[1] * len(input_ids[i]) for i in batch],
+            }
+            inputs = tokenizer.pad(features, padding=True, return_tensors="pt")
+            inputs = {k: v.to(device) for k, v in inputs.items()}
+
+            # Expand encoder rows: one decoder row per (source row, target)
+            expand = []
+            decoder_rows = []
+            for b, i in enumerate(batch):
+                for tgt_lang in row_targets[i]:
+                    expand.append(b)
+                    decoder_rows.append((i, tgt_lang))
+            expand = torch.tensor(expand, device=device)
+
+            with torch.no_grad():
+                encoder_outputs = encoder(**inputs)
+                hidden_states = encoder_outputs.last_hidden_state.index_select(0, expand)
+                attention_mask = inputs['attention_mask'].index_select(0, expand)
+
+                decoder_input_ids = torch.tensor(
+                    [[decoder_start_token_id,
+                      self._lang_token_id(tokenizer, self.nllb_languages[tgt_lang])]
+                     for _, tgt_lang in decoder_rows],
+                    device=device
+                )
+                generated_tokens = model.generate(
+                    encoder_outputs=BaseModelOutput(last_hidden_state=hidden_states),
+                    attention_mask=attention_mask,
+                    decoder_input_ids=decoder_input_ids,
+                    **self._generation_kwargs(config, inputs['input_ids'].shape[1])
+                )
+
+            decoded = tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)
+            for (i, tgt_lang), translation in zip(decoder_rows, decoded):
+                outputs[i][tgt_lang] = translation
+
+        return outputs
+
+    def enable_scheduler(self, max_wait_ms=10, token_budget=None):
+        """
+        Route NLLB chunk generation through a shared micro-batching scheduler.
+
+        Concurrent translate() calls then have their chunks gathered for up to
+        ``max_wait_ms`` and translated together in batched generate() calls.
+        """
+        if self.scheduler is None:
+            from nllb_scheduler import NLLBBatchScheduler
+            self.scheduler = NLLBBatchScheduler(self, max_wait_ms=max_wait_ms, token_budget=token_budget)
+            print(f"🧺 Micro-batching enabled: {max_wait_ms}ms window, {self.scheduler.token_budget} token budget")
+        return self.scheduler
+
+    def _lang_token_id(self, tokenizer, lang_code):
+        """Token id of an NLLB language tag such as 'fra_Latn'."""
+        return getattr(tokenizer, 'lang_code_to_id', {}).get(lang_code) or tokenizer.convert_tokens_to_ids(lang_code)
+
+    def _encode(self, tokenizer, texts, src_lang):
+        """
+        Token ids of source texts, tagged with their language as the tokenizer would.
+
+        The tags are added here rather than by setting the shared
+        ``tokenizer.src_lang``, which the scheduler worker and the caller
+        threads would otherwise overwrite under each other.
+        """
+        lang_id = self._lang_token_id(tokenizer, self.nllb_languages[src_lang])
+        encoded = tokenizer(texts, add_special_tokens=False, truncation=True, max_length=510)['input_ids']
+        if getattr(tokenizer, "legacy_behaviour", False):
+            return [ids + [tokenizer.eos_token_id, lang_id] for ids in encoded]
+        return [[lang_id] + ids + [tokenizer.eos_token_id] for ids in encoded]
+
+    def generate_segments(self, rows, model_name=None, config=None):
+        """
+        Translate already-chunked segments with NLLB, mixing language pairs.
 
+        Each source is tokenized with its own language tag, and each row's
+        decoder is primed with ``</s> <tgt_lang>`` so rows with different
+        targets can share one generate() call.
+
+        Args:
+            rows: List of (segment, src_lang, tgt_lang) tuples
+            model_name: Loaded NLLB model to use (defaults to the current one)
+            config: Generation settings (defaults to self.generation_config)
+
+        Returns:
+            List of translations, aligned with ``rows``
+        """
+        model_name = model_name or self.current_model_name
+        tokenizer = self.tokenizers[model_name]
+
+        input_ids = [None] * len(rows)
+        by_src = {}
+        for i, (segment, src_lang, _) in enumerate(rows):
+            if segment.strip():
+                by_src.setdefault(src_lang, []).append(i)
+
+        for src_lang, indices in by_src.items():
+            encoded = self._encode(tokenizer, [rows[i][0] for i in indices], src_lang)
+            for i, ids in zip(indices, encoded):
+                input_ids[i] = ids
+
+        tgt_token_ids = [
+            self._lang_token_id(tokenizer, self.nllb_languages[tgt_lang])
+            for _, _, tgt_lang in rows
+        ]
+
+        return self._generate_batched(input_ids, tgt_token_ids, tokenizer, self.models[model_name], config)
+
+    def _plan_batches(self, lengths):
+        """
+        Group row indices into batches under the padded token budget.
+
+        Rows are sorted longest first so that each batch holds rows of
+        similar length and little compute is spent on padding.
+
+        Returns:
+            List of index lists, each one a batch for a single generate() call
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+
+        batches = []
+        current = []
+        for idx in order:
+            # The first row of a batch is its longest, so it sets the padded width
+            width = lengths[current[0]] if current else lengths[idx]
+            if current and width * (len(current) + 1) > self.batch_token_budget:
+                batches.append(current)
+                current = []
+            current.append(idx)
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+    def _generate_batched(self, input_ids, tgt_token_ids, tokenizer, model=None, config=None):
+        """
+        Generate translations for tokenized rows with length-sorted, padded batches.
+
+        Args:
+            input_ids: Per-row source token ids (None for empty rows)
+            tgt_token_ids: Per-row target-language token id
+            tokenizer: Tokenizer used for padding and decoding
+            model: Seq2seq model (defaults to the current one)
+            config: Generation settings (defaults to self.generation_config)
+
+        Returns:
+            Translations in the original row order (empty rows map to "")
+        """
+        translations = [""] * len(input_ids)
+        rows = [i for i, ids in enumerate(input_ids) if ids]
+        if not rows:
+            return translations
+
+        model = model or self.current_model
+        config = config or self.generation_config
+        lengths = [len(input_ids[i]) for i in rows]
+
+        if getattr(model, "backend", None) == "ctranslate2":
+            # CTranslate2 does its own length-sorted token batching
+            start = time.time()
+            translations = model.translate_rows(
+                input_ids, tgt_token_ids, tokenizer,
+                self._generation_kwargs(config, max(lengths)), self.batch_token_budget
+            )
+            self._record_decode_rate(model, sum(lengths) * OUTPUT_LENGTH_RATIO * config.get("num_beams", 1),
+                                     time.time() - start)
+            return translations
+
+        batches = self._plan_batches(lengths)
+
+        device = next(model.parameters()).device
+        decoder_start_token_id = model.config.decoder_start_token_id
+
+        for n, batch in enumerate(batches, 1):
             # Show progress for long texts
-            if len(chunks) > 5 and i % 5 == 0:
-                print(f"   Progress: {i}/{len(chunks)} chunks translated...")
+            if len(batches) > 1:
+                print(f"   Batch {n}/{len(batches)}: {len(batch)} chunks, {lengths[batch[0]]} tokens max")
 
-            inputs = tokenizer(chunk, return_tensors="pt", padding=True, truncation=True, max_length=512)
+            batch_rows = [rows[j] for j in batch]
+            features = {
+                'input_ids': [input_ids[i] for i in batch_rows],
+                'attention_mask': [[1] * len(input_ids[i]) for i in batch_rows],
+            }
+            inputs = tokenizer.pad(features, padding=True, return_tensors="pt")
             inputs = {k: v.to(device) for k, v in inputs.items()}
 
+            # Per-row decoder prefix replaces a single forced_bos_token_id
+            decoder_input_ids = torch.tensor(
+                [[decoder_start_token_id, tgt_token_ids[i]] for i in batch_rows],
+                device=device
+            )
+
+            kwargs = self._generation_kwargs(config, lengths[batch[0]])
+            start = time.time()
             with torch.no_grad():
-                generated_tokens = self.current_model.generate(
+                generated_tokens = model.generate(
                     **inputs,
-                    forced_bos_token_id=forced_bos_token_id,
-                    max_length=512,
-                    num_beams=5,
-                    early_stopping=True,
-                    no_repeat_ngram_size=2
+                    decoder_input_ids=decoder_input_ids,
+                    **kwargs
                 )
+            # Rows that finished early are padded to the longest one - count real tokens only
+            output_tokens = int((generated_tokens[:, decoder_input_ids.shape[1]:] != tokenizer.pad_token_id).sum())
+            self._record_decode_rate(model, output_tokens * kwargs.get("num_beams", 1), time.time() - start)
 
-            translation = tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)[0]
-            translations.append(translation)
+            decoded = tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)
+            for i, translation in zip(batch_rows, decoded):
+                translations[i] = translation
 
-        if len(chunks) > 1:
-            print(f"✅ Translation complete: {len(chunks)} chunks processed")
+        return translations
 
-        # Join translations, preserving paragraph breaks for paragraph-level chunks
-        if SmartTextChunker and any(ct == 'paragraph' for _, ct in chunks):
-            # Preserve paragraph structure
-            result = []
-            for translation, (_, chunk_type) in zip(translations, chunks):
-                result.append(translation)
-                if chunk_type == 'paragraph':
-                    result.append('\n\n')
-            return ''.join(result).strip()
+    def decoding_config(self, profile=None, source_tokens=0, latency_budget=None, model_name=None, base=None):
+        """
+        Generation settings for a named decoding profile.
+
+        With a latency budget, the beam width is lowered until the expected
+        decoding time - from the measured speed of the model - fits it.
+
+        Args:
+            profile: "interactive", "balanced", "archival", or None for the
+                     base settings
+            source_tokens: Source length in tokens (for the latency estimate)
+            latency_budget: Target seconds for the request, or None
+            model_name: Model whose measured speed is used (default: current)
+            base: Settings the profile is applied to (default: self.generation_config)
+
+        Returns:
+            (config, info): settings for _generation_kwargs, and a summary
+            for the result metadata
+        """
+        base = base or self.generation_config
+        if profile is None:
+            config = dict(base)
+        elif profile in DECODING_PROFILES:
+            config = {**base, **DECODING_PROFILES[profile]}
         else:
-            # Standard sentence joining
-            return ' '.join(translations)
-    
-    def translate_mt5(self, text, src_lang, tgt_lang):
+            raise ValueError(f"Unknown decoding profile: {profile}. Available: {list(DECODING_PROFILES)}")
+
+        info = {"profile": profile or "default", "num_beams": config["num_beams"]}
+
+        rate = self.decode_rates.get(self.models.get(model_name or self.current_model_name))
+        if latency_budget and rate and source_tokens:
+            expected_tokens = source_tokens * OUTPUT_LENGTH_RATIO
+            beams = config["num_beams"]
+            while beams > 1 and expected_tokens * beams / rate > latency_budget:
+                beams -= 1
+            if beams != config["num_beams"]:
+                print(f"⏱️  Beam width {config['num_beams']} → {beams} to fit the {latency_budget}s budget")
+                config["num_beams"] = beams
+                info["num_beams"] = beams
+                info["budget_adjusted"] = True
+            info["estimated_time"] = f"{expected_tokens * beams / rate:.2f}s"
+
+        return config, info
+
+    def _generation_kwargs(self, config, source_length):
+        """generate() arguments for a batch whose longest source row has ``source_length`` tokens."""
+        config = config or self.generation_config
+        kwargs = {k: v for k, v in config.items() if k not in ("max_length_ratio", "max_length_offset")}
+        if config.get("max_length_ratio"):
+            kwargs["max_length"] = min(
+                config["max_length"],
+                int(source_length * config["max_length_ratio"]) + config.get("max_length_offset", 0)
+            )
+        if kwargs.get("num_beams", 1) == 1:
+            kwargs.pop("early_stopping", None)
+        return kwargs
+
+    def _record_decode_rate(self, model, beam_tokens, seconds):
+        """Update the moving average of a model's decoding speed."""
+        if seconds <= 0:
+            return
+        rate = beam_tokens / seconds
+        previous = self.decode_rates.get(model)
+        self.decode_rates[model] = rate if previous is None else 0.7 * previous + 0.3 * rate
+
+    def translate_mt5(self, text, src_lang, tgt_lang, config=None):
         """Translate using MT5/T5 model."""
         tokenizer = self.tokenizers[self.current_model_name]
         
@@ -284,27 +991,39 @@ class EnhancedOfflineTranslator:
         with torch.no_grad():
             generated_tokens = self.current_model.generate(
                 **inputs,
-                max_length=512,
-                num_beams=4,
-                early_stopping=True,
-                no_repeat_ngram_size=2
+                **self._generation_kwargs(config or self.mt5_generation_config, inputs['input_ids'].shape[1])
             )
         
         # Decode translation
         translation = tokenizer.decode(generated_tokens[0], skip_special_tokens=True)
         return translation
     
-    def translate(self, text, src_lang, tgt_lang, model_name=None):
-        """Main translation function."""
-        if not text.strip():
-            return "❌ Empty text provided"
-        
+    def _resolve_model_name(self, model_name):
+        """Map a checkpoint name to its CTranslate2 or reduced-precision variant when preferred."""
+        if self.backend == "ctranslate2" and ctranslate2_backend:
+            ct2_name = ctranslate2_backend.converted_path(self.models_dir / model_name).name
+            if ct2_name in self.available_models:
+                return ct2_name
+        if self.precision in PRECISION_MODES:
+            variant_name = f"{model_name}_{self.precision}"
+            if variant_name in self.available_models:
+                return variant_name
+        return model_name
+
+    def _ensure_model(self, model_name=None):
+        """Load the requested model, or the best available one if none is loaded."""
+        if model_name:
+            model_name = self._resolve_model_name(model_name)
+
         # Load model if specified or use current
         if model_name and model_name != self.current_model_name:
             if not self.load_model(model_name):
-                return f"❌ Failed to load model: {model_name}"
+                return False
         
         if not self.current_model:
+            if not self.available_models:
+                return False
+
             # Auto-select best available model
             # Priority: nllb_200_3.3b > nllb_200_1.3b > nllb_200_distilled_1.3b > others
             if any("nllb" in name for name in self.available_models):
@@ -320,8 +1039,32 @@ class EnhancedOfflineTranslator:
             else:
                 best_model = next(iter(self.available_models))
 
+            best_model = self._resolve_model_name(best_model)
             if not self.load_model(best_model):
-                return "❌ No models available"
+                return False
+        
+        return True
+
+    def translate(self, text, src_lang, tgt_lang, model_name=None, profile=None, latency_budget=None):
+        """
+        Main translation function.
+
+        Args:
+            text: Text to translate
+            src_lang: Source language code
+            tgt_lang: Target language code
+            model_name: Specific model to use (default: current/best)
+            profile: Decoding profile ("interactive", "balanced", "archival")
+            latency_budget: Optional seconds within which decoding should
+                            finish; lowers the beam width if needed
+        """
+        if not text.strip():
+            return "❌ Empty text provided"
+        
+        if not self._ensure_model(model_name):
+            if model_name:
+                return f"❌ Failed to load model: {model_name}"
+            return "❌ No models available"
         
         # Validate languages
         if src_lang not in self.language_names or tgt_lang not in self.language_names:
@@ -333,10 +1076,18 @@ class EnhancedOfflineTranslator:
             # Choose translation method based on model type
             model_type = self.available_models[self.current_model_name]["type"]
             
+            tokenizer = self.tokenizers[self.current_model_name]
+            source_tokens = len(tokenizer(text)['input_ids']) if latency_budget else 0
+            config, decoding = self.decoding_config(
+                profile, source_tokens, latency_budget,
+                base=None if "NLLB" in model_type else self.mt5_generation_config
+            )
+
+            stats = {}
             if "NLLB" in model_type:
-                translation = self.translate_nllb(text, src_lang, tgt_lang)
+                translation = self.translate_nllb(text, src_lang, tgt_lang, stats=stats, config=config)
             else:
-                translation = self.translate_mt5(text, src_lang, tgt_lang)
+                translation = self.translate_mt5(text, src_lang, tgt_lang, config=config)
             
             translation_time = time.time() - start_time
             
@@ -344,14 +1095,111 @@ class EnhancedOfflineTranslator:
                 "translation": translation,
                 "model": self.current_model_name,
                 "model_type": model_type,
+                "precision": self.available_models[self.current_model_name].get("active_precision", "float32"),
                 "time": f"{translation_time:.2f}s",
                 "src_lang": f"{src_lang} ({self.language_names[src_lang]})",
-                "tgt_lang": f"{tgt_lang} ({self.language_names[tgt_lang]})"
+                "tgt_lang": f"{tgt_lang} ({self.language_names[tgt_lang]})",
+                "decoding": decoding,
+                **stats
             }
             
         except Exception as e:
             return f"❌ Translation failed: {str(e)}"
     
+    def translate_stream(self, text, src_lang, tgt_lang, model_name=None, profile=None, stats=None):
+        """
+        Translate text and yield the output as it is produced.
+
+        Chunks are translated in order; within a chunk the text grows token
+        by token. Token streaming needs greedy decoding, so streamed chunks
+        use num_beams=1 (stored in the translation memory under those
+        settings); a decoding profile still sets the length limits. With
+        the CTranslate2 backend output arrives per chunk.
+
+        Args:
+            stats: Optional dict that receives cache_hits / cache_misses and
+                   fuzzy match counts once the stream is exhausted
+
+        Yields:
+            The translation so far (all finished chunks plus the current one),
+            or a single error string
+        """
+        if not text.strip():
+            yield "❌ Empty text provided"
+            return
+        if not self._ensure_model(model_name):
+            yield f"❌ Failed to load model: {model_name}" if model_name else "❌ No models available"
+            return
+
+        model_name = self.current_model_name
+        if "NLLB" not in self.available_models[model_name]["type"]:
+            yield self.translate_mt5(text, src_lang, tgt_lang,
+                                     self.decoding_config(profile, base=self.mt5_generation_config)[0])
+            return
+        if src_lang not in self.nllb_languages or tgt_lang not in self.nllb_languages:
+            yield f"❌ Language not supported. Available: {list(self.nllb_languages.keys())}"
+            return
+
+        from streaming import stream_generate
+
+        tokenizer = self.tokenizers[model_name]
+        model = self.models[model_name]
+        tm = self.translation_memory
+        config, _ = self.decoding_config(profile)
+        stream_config = {**config, "num_beams": 1, "early_stopping": False}
+        tgt_token_id = self._lang_token_id(tokenizer, self.nllb_languages[tgt_lang])
+
+        chunks = self._chunk_text(text, tokenizer)
+        done = []
+        seen = {}
+        for chunk, _ in chunks:
+            key = normalize_segment(chunk) if deduplicate else chunk
+            translation = seen.get(key)
+            if translation is None and tm and chunk.strip():
+                # A beam-search translation is as good to show as a streamed one
+                for params in (config, stream_config):
+                    translation = tm.get("nllb", model_name, src_lang, tgt_lang, chunk, params)
+                    if translation is not None:
+                        break
+                if stats is not None:
+                    counter = "cache_misses" if translation is None else "cache_hits"
+                    stats[counter] = stats.get(counter, 0) + 1
+            if translation is None and self.fuzzy_memory and chunk.strip():
+                for params in (config, stream_config):
+                    translation = self._fuzzy_translation(chunk, src_lang, tgt_lang, model_name, params, stats)
+                    if translation is not None:
+                        break
+            if translation is None and not chunk.strip():
+                translation = ""
+
+            if translation is None:
+                input_ids = self._encode(tokenizer, [chunk], src_lang)[0]
+
+                if getattr(model, "backend", None) == "ctranslate2":
+                    translation = self._generate_batched(
+                        [input_ids], [tgt_token_id], tokenizer, model, stream_config
+                    )[0]
+                else:
+                    device = next(model.parameters()).device
+                    translation = ""
+                    for translation in stream_generate(
+                        model, tokenizer,
+                        input_ids=torch.tensor([input_ids], device=device),
+                        decoder_input_ids=torch.tensor(
+                            [[model.config.decoder_start_token_id, tgt_token_id]], device=device
+                        ),
+                        **self._generation_kwargs(stream_config, len(input_ids))
+                    ):
+                        yield self._join_chunks(done + [translation], chunks[:len(done) + 1])
+                    translation = translation.strip()
+
+                if tm:
+                    tm.put("nllb", model_name, src_lang, tgt_lang, chunk, translation, stream_config)
+
+            seen[key] = translation
+            done.append(translation)
+            yield self._join_chunks(done, chunks[:len(done)])
+
     def list_models(self):
         """List all available models."""
         if not self.available_models:
@@ -385,17 +1233,29 @@ def main():
     """Main CLI interface."""
     parser = argparse.ArgumentParser(description="Enhanced Offline Neural Machine Translation")
     parser.add_argument("src_lang", nargs="?", help="Source language code (e.g., en, fr, de)")
-    parser.add_argument("tgt_lang", nargs="?", help="Target language code (e.g., en, fr, de)")
+    parser.add_argument("tgt_lang", nargs="?",
+                        help="Target language code (e.g., en, fr, de); comma-separated for several targets")
     parser.add_argument("text", nargs="?", help="Text to translate")
     parser.add_argument("--model", help="Specific model to use")
     parser.add_argument("--list-models", action="store_true", help="List available models")
     parser.add_argument("--list-languages", action="store_true", help="List supported languages")
     parser.add_argument("--clean", action="store_true", help="Output only translation")
+    parser.add_argument("--batch-tokens", type=int, default=2048,
+                        help="Padded source tokens per generate() batch (default: 2048)")
+    parser.add_argument("--backend", choices=["pytorch", "ctranslate2"], default="pytorch",
+                        help="NLLB inference backend (ctranslate2 = int8 CPU inference)")
+    parser.add_argument("--profile", choices=list(DECODING_PROFILES),
+                        help="Decoding profile (default: 5-beam search up to 512 tokens)")
+    parser.add_argument("--latency-budget", type=float,
+                        help="Seconds per request; beam width is lowered to fit")
+    parser.add_argument("--precision", choices=["float32"] + PRECISION_MODES, default="float32",
+                        help="NLLB weight precision (or pick a variant directly, e.g. --model nllb_200_3.3b_int8)")
     
     args = parser.parse_args()
     
     # Initialize translator
-    translator = EnhancedOfflineTranslator()
+    translator = EnhancedOfflineTranslator(batch_token_budget=args.batch_tokens, backend=args.backend,
+                                           precision=args.precision)
     
     # Handle list commands
     if args.list_models:
@@ -410,8 +1270,23 @@ def main():
     if not all([args.src_lang, args.tgt_lang, args.text]):
         parser.error("src_lang, tgt_lang, and text are required for translation")
     
+    # Several targets: encode the source once and decode into each language
+    tgt_langs = [code.strip() for code in args.tgt_lang.split(",") if code.strip()]
+    if len(tgt_langs) > 1:
+        start_time = time.time()
+        results = translator.translate_many(args.text, args.src_lang, tgt_langs, args.model)
+        for tgt_lang, translation in results.items():
+            if args.clean:
+                print(f"{tgt_lang}\t{translation}")
+            else:
+                print(f"🌍 {tgt_lang}: {translation}")
+        if not args.clean:
+            print(f"⏱️  Time: {time.time() - start_time:.2f}s for {len(tgt_langs)} targets")
+        return
+
     # Perform translation
-    result = translator.translate(args.text, args.src_lang, args.tgt_lang, args.model)
+    result = translator.translate(args.text, args.src_lang, args.tgt_lang, args.model,
+                                  profile=args.profile, latency_budget=args.latency_budget)
     
     if args.clean:
         if isinstance(result, dict):
@@ -423,6 +1298,7 @@ def main():
             print(f"🔤 Original ({result['src_lang']}): {args.text}")
             print(f"🌍 Translation ({result['tgt_lang']}): {result['translation']}")
             print(f"🤖 Model: {result['model']} ({result['model_type']})")
+            print(f"🎚️  Precision: {result['precision']}")
             print(f"⏱️  Time: {result['time']}")
         else:
             print(result)
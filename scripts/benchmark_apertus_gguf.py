@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Apertus8B with transformers vs llama.cpp (GGUF) on CPU
+Reports load time, output tokens/sec and resident memory for each backend
+"""
+
+import sys
+import json
+import time
+import resource
+import argparse
+import subprocess
+from pathlib import Path
+
+# Allow running from scripts/ or project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+DEFAULT_FILE = PROJECT_ROOT / "data/samples/raw_glossaire_vaud.txt"
+BACKENDS = ["transformers", "llama.cpp"]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_segments(path, count):
+    """First ``count`` short, non-trivial lines of a text file."""
+    lines = [line.strip() for line in Path(path).read_text(encoding="utf-8").splitlines()]
+    return [line for line in lines if 4 <= len(line.split()) <= 40][:count]
+
+
+def run_worker(args):
+    """Benchmark one backend in this process and print a JSON report."""
+    if args.backend == "llama.cpp":
+        from apertus_gguf import ApertusGGUFTranslator
+        translator = ApertusGGUFTranslator(model_path=args.model_path, gguf_path=args.gguf,
+                                           quantization=args.quantization)
+    else:
+        from apertus_translator import ApertusTranslator
+        translator = ApertusTranslator(model_path=args.model_path, load_mode=args.load_mode)
+    # Greedy decoding so both backends produce comparable outputs
+    translator.generation_config = {"do_sample": False}
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    if not translator.load_model():
+        print(json.dumps({"error": "could not load model"}))
+        return
+    load_time = time.perf_counter() - start
+
+    segments = load_segments(args.file, args.segments)
+
+    # Warm-up on one segment, then time the full set
+    translator.translate(segments[0], args.src, args.tgt)
+    start = time.perf_counter()
+    results = [translator.translate(segment, args.src, args.tgt) for segment in segments]
+    elapsed = time.perf_counter() - start
+
+    output_tokens = sum(r.get("generation", {}).get("generated_tokens", 0) for r in results)
+
+    print(json.dumps({
+        "backend": args.backend,
+        "model_type": results[0].get("model_type") if results else None,
+        "load_time": load_time,
+        "segments": len(segments),
+        "seconds": elapsed,
+        "tokens_per_sec": output_tokens / elapsed if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "model_rss_mb": peak_rss_mb() - rss_before,
+        "translations": [r.get("translation", "") for r in results],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Apertus transformers vs llama.cpp inference")
+    parser.add_argument("--model-path", help="Apertus checkpoint (default: APERTUS_PATH / usual locations)")
+    parser.add_argument("--gguf", help="GGUF file or directory (default: <model-path>-gguf)")
+    parser.add_argument("--quantization", default="Q4_K_M", help="GGUF export to use (default: Q4_K_M)")
+    parser.add_argument("--load-mode", choices=["float32", "bf16-mmap", "offload"], default="float32",
+                        help="Weight loading of the transformers run (default: float32)")
+    parser.add_argument("--file", default=str(DEFAULT_FILE), help="Text file to take segments from")
+    parser.add_argument("--segments", type=int, default=10, help="Number of segments to translate")
+    parser.add_argument("--src", default="de", help="Source language (default: de)")
+    parser.add_argument("--tgt", default="rm-sursilv", help="Target language (default: rm-sursilv)")
+    parser.add_argument("--backend", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_worker(args)
+        return
+
+    # Each backend runs in a fresh process so RSS figures don't mix
+    reports = {}
+    for backend in BACKENDS:
+        print(f"⏳ Benchmarking {backend}...")
+        cmd = [sys.executable, __file__, "--backend", backend] + sys.argv[1:]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"❌ {backend} failed:\n{proc.stderr[-2000:]}")
+            continue
+        report = json.loads(lines[-1])
+        if "error" in report:
+            print(f"❌ {backend}: {report['error']}")
+            continue
+        reports[backend] = report
+
+    print("\n" + "=" * 72)
+    print(f"{'Backend':14} {'Load':>8} {'Time':>9} {'Tokens/s':>10} {'Peak RSS':>11} {'Model RSS':>11}")
+    print("=" * 72)
+    for backend, r in reports.items():
+        print(f"{backend:14} {r['load_time']:7.1f}s {r['seconds']:8.2f}s {r['tokens_per_sec']:10.1f} "
+              f"{r['peak_rss_mb']:9.0f}MB {r['model_rss_mb']:9.0f}MB")
+
+    if len(reports) == 2:
+        hf, gguf = reports["transformers"], reports["llama.cpp"]
+        same = sum(1 for a, b in zip(hf["translations"], gguf["translations"]) if a == b)
+        print("-" * 72)
+        print(f"Speed-up: {gguf['tokens_per_sec'] / max(hf['tokens_per_sec'], 1e-9):.1f}x   "
+              f"Memory: {hf['peak_rss_mb'] / max(gguf['peak_rss_mb'], 1e-9):.1f}x less   "
+              f"Identical outputs: {same}/{len(hf['translations'])}")
+        print(f"Model: {gguf['model_type']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-piece vs single-pass tokenization in SmartTextChunker
+Compares chunking time, tokenizer calls and resulting chunks on the sample books
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Allow running from scripts/ or project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from text_chunker import SmartTextChunker
+
+DEFAULT_FILES = [
+    PROJECT_ROOT / "data/samples/osage-full.txt",
+    PROJECT_ROOT / "data/samples/raw_glossaire_vaud.txt",
+]
+
+
+class CountingTokenizer:
+    """Wraps a tokenizer and counts how often it is called."""
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.is_fast = getattr(tokenizer, "is_fast", False)
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.tokenizer(*args, **kwargs)
+
+
+def find_tokenizer_path():
+    """Use a local NLLB model if one is deployed, else the Hub name."""
+    models_dir = PROJECT_ROOT / "models/deployed_models"
+    for name in ["nllb_200_distilled_1.3b", "nllb_200_1.3b", "nllb_200_3.3b"]:
+        if (models_dir / name).exists():
+            return str(models_dir / name)
+    return "facebook/nllb-200-distilled-600M"
+
+
+def run(chunker_tokenizer, text, max_tokens, single_pass, repeats):
+    """Chunk text ``repeats`` times; return (best seconds, calls per run, chunks)."""
+    best = None
+    for _ in range(repeats):
+        counting = CountingTokenizer(chunker_tokenizer)
+        chunker = SmartTextChunker(max_tokens=max_tokens, tokenizer=counting, single_pass=single_pass)
+        start = time.perf_counter()
+        chunks = chunker.chunk_text(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, counting.calls, chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SmartTextChunker tokenization strategies")
+    parser.add_argument("files", nargs="*", help="Text files (default: data/samples books)")
+    parser.add_argument("--tokenizer", default=None, help="Tokenizer path or Hub name (default: local NLLB)")
+    parser.add_argument("--max-tokens", type=int, default=400, help="Chunk budget (default: 400)")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per configuration (best is kept)")
+    args = parser.parse_args()
+
+    try:
+        from transformers import AutoTokenizer
+    except ImportError:
+        print("❌ transformers is required for this benchmark")
+        sys.exit(1)
+
+    tokenizer_path = args.tokenizer or find_tokenizer_path()
+    print(f"⏳ Loading tokenizer: {tokenizer_path}")
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_path)
+    if not getattr(tokenizer, "is_fast", False):
+        print("⚠️  Tokenizer is not a fast tokenizer - single-pass mode will fall back to per-piece counting")
+
+    files = [Path(f) for f in args.files] or DEFAULT_FILES
+
+    print("\n" + "=" * 78)
+    print(f"{'File':28} {'Mode':12} {'Time':>9} {'Calls':>7} {'Chunks':>7} {'Max tok':>8} {'>budget':>8}")
+    print("=" * 78)
+
+    for path in files:
+        text = path.read_text(encoding="utf-8")
+        results = {}
+
+        for label, single_pass in [("per-piece", False), ("single-pass", True)]:
+            elapsed, calls, chunks = run(tokenizer, text, args.max_tokens, single_pass, args.repeats)
+            sizes = [len(tokenizer(c, add_special_tokens=False)["input_ids"]) for c, _ in chunks]
+            over = sum(1 for n in sizes if n > args.max_tokens)
+            results[label] = (elapsed, chunks)
+            print(f"{path.name[:28]:28} {label:12} {elapsed:8.2f}s {calls:7d} {len(chunks):7d} "
+                  f"{max(sizes) if sizes else 0:8d} {over:8d}")
+
+        old_time, old_chunks = results["per-piece"]
+        new_time, new_chunks = results["single-pass"]
+        same = sum(1 for a, b in zip(old_chunks, new_chunks) if a == b)
+        print(f"{'':28} {'speed-up':12} {old_time / max(new_time, 1e-9):8.1f}x  "
+              f"identical chunks: {same}/{max(len(old_chunks), len(new_chunks))}")
+        print("-" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PyTorch vs CTranslate2 int8 NLLB-200 inference
+Reports load time, output tokens/sec and resident memory for each backend
+"""
+
+import sys
+import json
+import time
+import resource
+import argparse
+import subprocess
+from pathlib import Path
+
+# Allow running from scripts/ or project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+DEFAULT_FILE = PROJECT_ROOT / "data/samples/raw_glossaire_vaud.txt"
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_segments(path, count):
+    """First ``count`` non-trivial lines of a text file."""
+    lines = [line.strip() for line in Path(path).read_text(encoding="utf-8").splitlines()]
+    return [line for line in lines if len(line.split()) >= 4][:count]
+
+
+def run_worker(args):
+    """Benchmark one backend in this process and print a JSON report."""
+    from nllb_translator import EnhancedOfflineTranslator
+
+    translator = EnhancedOfflineTranslator(args.models_dir, batch_token_budget=args.batch_tokens)
+    model_name = args.model
+    if args.backend == "ctranslate2":
+        import ctranslate2_backend
+        model_name = ctranslate2_backend.converted_path(Path(args.models_dir) / args.model).name
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    if not translator.load_model(model_name):
+        print(json.dumps({"error": f"could not load {model_name}"}))
+        return
+    load_time = time.perf_counter() - start
+
+    segments = load_segments(args.file, args.segments)
+    rows = [(segment, args.src, args.tgt) for segment in segments]
+
+    # Warm-up on a few rows, then time the full set
+    translator.generate_segments(rows[:2], model_name)
+    start = time.perf_counter()
+    translations = translator.generate_segments(rows, model_name)
+    elapsed = time.perf_counter() - start
+
+    tokenizer = translator.tokenizers[model_name]
+    output_tokens = sum(len(tokenizer(t, add_special_tokens=False)["input_ids"]) for t in translations)
+
+    print(json.dumps({
+        "backend": args.backend,
+        "model": model_name,
+        "load_time": load_time,
+        "segments": len(rows),
+        "seconds": elapsed,
+        "tokens_per_sec": output_tokens / elapsed if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "model_rss_mb": peak_rss_mb() - rss_before,
+        "translations": translations,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PyTorch vs CTranslate2 NLLB inference")
+    parser.add_argument("--model", default="nllb_200_distilled_1.3b", help="Deployed NLLB model name")
+    parser.add_argument("--models-dir", default=str(PROJECT_ROOT / "models/deployed_models"))
+    parser.add_argument("--file", default=str(DEFAULT_FILE), help="Text file to take segments from")
+    parser.add_argument("--segments", type=int, default=64, help="Number of segments to translate")
+    parser.add_argument("--src", default="fr", help="Source language (default: fr)")
+    parser.add_argument("--tgt", default="de", help="Target language (default: de)")
+    parser.add_argument("--batch-tokens", type=int, default=2048, help="Token budget per batch")
+    parser.add_argument("--backend", choices=["pytorch", "ctranslate2"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_worker(args)
+        return
+
+    # Each backend runs in a fresh process so RSS figures don't mix
+    reports = {}
+    for backend in ["pytorch", "ctranslate2"]:
+        print(f"⏳ Benchmarking {backend}...")
+        cmd = [sys.executable, __file__, "--backend", backend] + sys.argv[1:]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"❌ {backend} failed:\n{proc.stderr[-2000:]}")
+            continue
+        report = json.loads(lines[-1])
+        if "error" in report:
+            print(f"❌ {backend}: {report['error']}")
+            continue
+        reports[backend] = report
+
+    print("\n" + "=" * 72)
+    print(f"{'Backend':14} {'Load':>8} {'Time':>9} {'Tokens/s':>10} {'Peak RSS':>11} {'Model RSS':>11}")
+    print("=" * 72)
+    for backend, r in reports.items():
+        print(f"{backend:14} {r['load_time']:7.1f}s {r['seconds']:8.2f}s {r['tokens_per_sec']:10.1f} "
+              f"{r['peak_rss_mb']:9.0f}MB {r['model_rss_mb']:9.0f}MB")
+
+    if len(reports) == 2:
+        pt, ct2 = reports["pytorch"], reports["ctranslate2"]
+        same = sum(1 for a, b in zip(pt["translations"], ct2["translations"]) if a == b)
+        print("-" * 72)
+        print(f"Speed-up: {ct2['tokens_per_sec'] / max(pt['tokens_per_sec'], 1e-9):.1f}x   "
+              f"Memory: {pt['peak_rss_mb'] / max(ct2['peak_rss_mb'], 1e-9):.1f}x less   "
+              f"Identical outputs: {same}/{len(pt['translations'])}")
+
+
+if __name__ == "__main__":
+    main()
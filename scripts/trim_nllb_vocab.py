@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Vocabulary trimming for NLLB-200
+Builds a smaller checkpoint and tokenizer that keep only the tokens used by a
+representative corpus of the deployed languages, then compares it to the original
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from collections import Counter
+
+# Allow running from scripts/ or project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+try:
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+except ImportError:
+    print("❌ Error: Required packages not installed (torch, transformers)")
+    sys.exit(1)
+
+# Trimmed models live next to the original as <name>_trimmed, with this metadata file
+TRIM_SUFFIX = "_trimmed"
+METADATA_FILE = "trim_metadata.json"
+
+
+def read_corpus(paths):
+    """Yield non-empty lines from text/TSV files (directories are searched recursively)."""
+    for path in map(Path, paths):
+        files = sorted(list(path.rglob("*.txt")) + list(path.rglob("*.tsv"))) if path.is_dir() else [path]
+        for file in files:
+            with open(file, encoding="utf-8", errors="ignore") as f:
+                for line in f:
+                    # Every TSV column is text (source and reference sides)
+                    for field in line.rstrip("\n").split("\t"):
+                        if field.strip():
+                            yield field.strip()
+
+
+def count_tokens(tokenizer, lines, batch_size=1000):
+    """Token id frequencies of the corpus (without special tokens)."""
+    counts = Counter()
+    batch = []
+    total = 0
+    for line in lines:
+        batch.append(line)
+        if len(batch) == batch_size:
+            for ids in tokenizer(batch, add_special_tokens=False)["input_ids"]:
+                counts.update(ids)
+            total += len(batch)
+            batch = []
+    if batch:
+        for ids in tokenizer(batch, add_special_tokens=False)["input_ids"]:
+            counts.update(ids)
+        total += len(batch)
+    return counts, total
+
+
+def select_tokens(tokenizer, counts, min_count):
+    """Sorted ids to keep: corpus tokens plus every special and added (language-code) token."""
+    keep = {token_id for token_id, n in counts.items() if n >= min_count}
+    keep.update(tokenizer.all_special_ids)
+    keep.update(tokenizer.get_added_vocab().values())
+    # The first ids (<s>, <pad>, </s>, <unk>) must stay in place
+    keep.update(range(4))
+    return sorted(keep)
+
+
+def trim_tokenizer_files(tokenizer_dir, keep_ids):
+    """
+    Rewrite a saved fast tokenizer so that token ``keep_ids[i]`` becomes id ``i``.
+
+    The Unigram vocabulary in tokenizer.json is filtered in order; added
+    tokens (all of which are kept), the post-processor and
+    tokenizer_config.json are remapped to the new ids.
+    """
+    tokenizer_dir = Path(tokenizer_dir)
+    old_to_new = {old: new for new, old in enumerate(keep_ids)}
+
+    with open(tokenizer_dir / "tokenizer.json", encoding="utf-8") as f:
+        data = json.load(f)
+
+    model = data["model"]
+    vocab = model["vocab"]
+    model["vocab"] = [vocab[i] for i in keep_ids if i < len(vocab)]
+    if model.get("unk_id") is not None:
+        model["unk_id"] = old_to_new[model["unk_id"]]
+
+    # Added tokens beyond the Unigram vocabulary keep following it, in their original order
+    for token in data.get("added_tokens", []):
+        token["id"] = old_to_new[token["id"]]
+
+    post_processor = data.get("post_processor") or {}
+    for special in (post_processor.get("special_tokens") or {}).values():
+        special["ids"] = [old_to_new[i] for i in special["ids"]]
+
+    with open(tokenizer_dir / "tokenizer.json", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+    config_file = tokenizer_dir / "tokenizer_config.json"
+    if config_file.exists():
+        with open(config_file, encoding="utf-8") as f:
+            config = json.load(f)
+        if "added_tokens_decoder" in config:
+            config["added_tokens_decoder"] = {
+                str(old_to_new[int(i)]): token for i, token in config["added_tokens_decoder"].items()
+            }
+        # The SentencePiece model still has the full vocabulary - use tokenizer.json only
+        config.pop("vocab_file", None)
+        with open(config_file, "w", encoding="utf-8") as f:
+            json.dump(config, f, ensure_ascii=False, indent=2)
+
+    sp_model = tokenizer_dir / "sentencepiece.bpe.model"
+    if sp_model.exists():
+        sp_model.unlink()
+
+    return old_to_new
+
+
+def trim_model(model, keep_ids, old_to_new):
+    """Shrink the shared embeddings / output projection and remap special ids in the config."""
+    index = torch.tensor(keep_ids, dtype=torch.long)
+    weight = model.get_input_embeddings().weight.data.index_select(0, index).clone()
+
+    model.resize_token_embeddings(len(keep_ids))
+    model.get_input_embeddings().weight.data.copy_(weight)
+    model.tie_weights()
+
+    for config in [model.config, getattr(model, "generation_config", None)]:
+        if config is None:
+            continue
+        for key in ["pad_token_id", "bos_token_id", "eos_token_id", "decoder_start_token_id", "forced_bos_token_id"]:
+            value = getattr(config, key, None)
+            if isinstance(value, int) and value in old_to_new:
+                setattr(config, key, old_to_new[value])
+    model.config.vocab_size = len(keep_ids)
+    return model
+
+
+def model_size_mb(model):
+    """Parameter memory, counting tied weights once."""
+    seen = {}
+    for p in model.parameters():
+        seen[p.data_ptr()] = p.numel() * p.element_size()
+    return sum(seen.values()) / 1e6
+
+
+def build(args):
+    """Build the trimmed checkpoint; return its directory."""
+    source_path = Path(args.models_dir) / args.model
+    output_dir = Path(args.output) if args.output else source_path.parent / f"{args.model}{TRIM_SUFFIX}"
+
+    print(f"⏳ Loading tokenizer: {source_path}")
+    tokenizer = AutoTokenizer.from_pretrained(source_path)
+    if not getattr(tokenizer, "is_fast", False):
+        print("❌ A fast tokenizer (tokenizer.json) is required")
+        sys.exit(1)
+
+    print("📚 Counting corpus tokens...")
+    counts, lines = count_tokens(tokenizer, read_corpus(args.corpus))
+    keep_ids = select_tokens(tokenizer, counts, args.min_count)
+    original_vocab = len(tokenizer)
+    print(f"   {lines:,} lines, {len(counts):,} distinct tokens")
+    print(f"✂️  Keeping {len(keep_ids):,} of {original_vocab:,} tokens ({len(keep_ids) / original_vocab:.1%})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tokenizer.save_pretrained(tmp)
+        old_to_new = trim_tokenizer_files(tmp, keep_ids)
+        trimmed_tokenizer = AutoTokenizer.from_pretrained(tmp)
+
+    # Consistency check: corpus text must tokenize to the remapped ids
+    sample = [line for _, line in zip(range(200), read_corpus(args.corpus))]
+    for line in sample:
+        old = tokenizer(line, add_special_tokens=False)["input_ids"]
+        if all(i in old_to_new for i in old):
+            new = trimmed_tokenizer(line, add_special_tokens=False)["input_ids"]
+            if new != [old_to_new[i] for i in old]:
+                print(f"❌ Tokenizer remapping mismatch on: {line[:80]}")
+                sys.exit(1)
+
+    print(f"⏳ Loading model: {source_path}")
+    model = AutoModelForSeq2SeqLM.from_pretrained(source_path)
+    size_before = model_size_mb(model)
+    model = trim_model(model, keep_ids, old_to_new)
+    size_after = model_size_mb(model)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model.save_pretrained(output_dir)
+    trimmed_tokenizer.save_pretrained(output_dir)
+    with open(output_dir / METADATA_FILE, "w", encoding="utf-8") as f:
+        json.dump({
+            "source": args.model,
+            "original_vocab": original_vocab,
+            "vocab": len(keep_ids),
+            "min_count": args.min_count,
+            "corpus_lines": lines,
+            "size_mb_before": round(size_before, 1),
+            "size_mb_after": round(size_after, 1),
+        }, f, indent=2)
+
+    print(f"✅ Trimmed model saved to {output_dir}")
+    print(f"💾 Parameters: {size_before:,.0f} MB → {size_after:,.0f} MB ({1 - size_after / size_before:.1%} smaller)")
+    return output_dir
+
+
+def read_heldout(path, limit):
+    """(source, reference) pairs from a TSV file; reference may be missing."""
+    pairs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if fields[0].strip():
+                pairs.append((fields[0].strip(), fields[1].strip() if len(fields) > 1 else None))
+    return pairs[:limit]
+
+
+def evaluate(args, trimmed_name):
+    """Compare latency and quality of the original and trimmed models on a held-out set."""
+    from nllb_translator import EnhancedOfflineTranslator
+
+    pairs = read_heldout(args.heldout, args.heldout_limit)
+    rows = [(source, args.src, args.tgt) for source, _ in pairs]
+    translator = EnhancedOfflineTranslator(args.models_dir)
+
+    outputs = {}
+    for name in [args.model, trimmed_name]:
+        if not translator.load_model(name):
+            return
+        translator.generate_segments(rows[:2], name)  # warm-up
+        start = time.perf_counter()
+        outputs[name] = translator.generate_segments(rows, name)
+        elapsed = time.perf_counter() - start
+        print(f"⏱️  {name}: {elapsed:.2f}s for {len(rows)} segments "
+              f"({elapsed / max(len(rows), 1) * 1000:.0f} ms/segment), "
+              f"{model_size_mb(translator.models[name]):,.0f} MB parameters")
+
+    original, trimmed = outputs[args.model], outputs[trimmed_name]
+    same = sum(1 for a, b in zip(original, trimmed) if a == b)
+    print(f"🔁 Identical outputs: {same}/{len(rows)}")
+
+    try:
+        import sacrebleu
+    except ImportError:
+        print("⚠️  sacrebleu not installed - skipping chrF/BLEU")
+        return
+
+    references = [reference for _, reference in pairs]
+    if all(references):
+        for name, hyps in outputs.items():
+            bleu = sacrebleu.corpus_bleu(hyps, [references]).score
+            chrf = sacrebleu.corpus_chrf(hyps, [references]).score
+            print(f"📊 {name}: BLEU {bleu:.1f}, chrF {chrf:.1f}")
+    else:
+        chrf = sacrebleu.corpus_chrf(trimmed, [original]).score
+        print(f"📊 chrF of trimmed vs original outputs: {chrf:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a vocabulary-trimmed NLLB-200 checkpoint")
+    parser.add_argument("corpus", nargs="+", help="Corpus files or directories (.txt / .tsv) in the served languages")
+    parser.add_argument("--model", default="nllb_200_distilled_1.3b", help="Deployed NLLB model to trim")
+    parser.add_argument("--models-dir", default=str(PROJECT_ROOT / "models/deployed_models"))
+    parser.add_argument("--output", help=f"Output directory (default: <model>{TRIM_SUFFIX} next to the original)")
+    parser.add_argument("--min-count", type=int, default=1, help="Keep tokens seen at least this often")
+    parser.add_argument("--heldout", help="Held-out TSV (source[TAB]reference) for the comparison")
+    parser.add_argument("--heldout-limit", type=int, default=200, help="Max held-out segments")
+    parser.add_argument("--src", default="fr", help="Held-out source language (default: fr)")
+    parser.add_argument("--tgt", default="de", help="Held-out target language (default: de)")
+    parser.add_argument("--skip-build", action="store_true", help="Only run the comparison")
+    args = parser.parse_args()
+
+    output_dir = Path(args.output) if args.output else Path(args.models_dir) / f"{args.model}{TRIM_SUFFIX}"
+    if not args.skip_build:
+        output_dir = build(args)
+
+    if args.heldout:
+        if output_dir.parent != Path(args.models_dir):
+            print("⚠️  Comparison needs the trimmed model inside --models-dir - skipping")
+            return
+        evaluate(args, output_dir.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Token Streaming Helper
+Runs model.generate() in a background thread and yields the growing output text
+"""
+
+import threading
+
+from transformers import TextIteratorStreamer
+
+
+def stream_generate(model, tokenizer, **generate_kwargs):
+    """
+    Generate with a TextIteratorStreamer and yield the decoded text so far.
+
+    Args:
+        model: Hugging Face model (seq2seq or causal)
+        tokenizer: Tokenizer used to decode the streamed tokens
+        **generate_kwargs: Inputs and settings for model.generate()
+                           (batch size 1, no beam search)
+
+    Yields:
+        The cumulative decoded output after each new piece of text
+    """
+    # skip_prompt drops the input (causal) or decoder prefix (seq2seq) tokens
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    errors = []
+
+    def run():
+        try:
+            model.generate(**generate_kwargs, streamer=streamer)
+        except Exception as e:
+            errors.append(e)
+            # Unblock the consumer loop
+            streamer.end()
+
+    thread = threading.Thread(target=run, name="generate-stream", daemon=True)
+    thread.start()
+
+    text = ""
+    for piece in streamer:
+        if piece:
+            text += piece
+            yield text
+
+    thread.join()
+    if errors:
+        raise errors[0]
@@ -0,0 +1,159 @@
+"""Tests for apertus_continuous_batching.ApertusContinuousBatcher with a tiny fake model."""
+
+import math
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from apertus_continuous_batching import ApertusContinuousBatcher, _SlotCache
+
+EOS = 0
+VOCAB = 16
+DIM = 8
+
+
+class FakeModel(torch.nn.Module):
+    """Two-layer single-head attention model speaking the Hugging Face cache interface."""
+
+    def __init__(self, layers=2):
+        super().__init__()
+        torch.manual_seed(0)
+        self.embed = torch.nn.Embedding(VOCAB, DIM)
+        self.positions = torch.nn.Embedding(256, DIM)
+        self.qkv = torch.nn.ModuleList(torch.nn.Linear(DIM, 3 * DIM) for _ in range(layers))
+        self.head = torch.nn.Linear(DIM, VOCAB)
+
+    def forward(self, input_ids, attention_mask=None, position_ids=None, past_key_values=None,
+                cache_position=None, use_cache=True):
+        batch, length = input_ids.shape
+        legacy = past_key_values if isinstance(past_key_values, tuple) else None
+        past_length = legacy[0][0].shape[2] if legacy else 0
+        if position_ids is None:
+            position_ids = torch.arange(past_length, past_length + length).expand(batch, -1)
+
+        hidden = self.embed(input_ids) + self.positions(position_ids)
+        layers = []
+        for index, qkv in enumerate(self.qkv):
+            query, key, value = (t.unsqueeze(1) for t in qkv(hidden).split(DIM, dim=-1))
+            if isinstance(past_key_values, _SlotCache):
+                key, value = past_key_values.update(key, value, index)
+            elif legacy:
+                key = torch.cat([legacy[index][0], key], dim=2)
+                value = torch.cat([legacy[index][1], value], dim=2)
+            layers.append((key, value))
+
+            total = key.shape[2]
+            scores = query @ key.transpose(-1, -2) / math.sqrt(DIM)
+            causal = torch.ones(length, total, dtype=torch.bool).tril(total - length)
+            allowed = causal if attention_mask is None else causal & attention_mask[:, None, None, :].bool()
+            scores = scores.masked_fill(~allowed, float("-inf"))
+            hidden = hidden + (scores.softmax(dim=-1) @ value).squeeze(1)
+
+        return SimpleNamespace(logits=self.head(hidden), past_key_values=tuple(layers))
+
+
+class FakeTokenizer:
+    eos_token_id = EOS
+
+    def decode(self, tokens, skip_special_tokens=True):
+        return " ".join(str(t) for t in tokens)
+
+
+class FakeTranslator:
+    """The parts of ApertusTranslator the batcher uses; chunks are space-separated token ids."""
+
+    def __init__(self):
+        self.model = FakeModel().eval()
+        self.tokenizer = FakeTokenizer()
+        self.generation_config = {"do_sample": False}
+        self.stop_markers = ()
+
+    def _model_inputs(self, chunk, src_name, tgt_name, hint=None):
+        input_ids = torch.tensor([[int(t) for t in chunk.split()]])
+        return {"input_ids": input_ids, "attention_mask": torch.ones_like(input_ids)}
+
+    def _new_token_budget(self, chunk, max_tokens):
+        return max_tokens
+
+    def _clean_output(self, output):
+        return output
+
+
+def reference(model, chunk, max_tokens):
+    """Greedy decode of one chunk on its own, with a plain growing cache."""
+    input_ids = torch.tensor([[int(t) for t in chunk.split()]])
+    generated, past = [], None
+    with torch.no_grad():
+        while len(generated) < max_tokens:
+            output = model(input_ids=input_ids, past_key_values=past)
+            token = int(output.logits[0, -1].argmax())
+            if token == EOS:
+                break
+            generated.append(token)
+            input_ids, past = torch.tensor([[token]]), output.past_key_values
+    return " ".join(str(t) for t in generated)
+
+
+REQUESTS = [("3 5 7", 6), ("1 2 3 4 5 6 7 8 9 10 11", 9), ("4", 3),
+            ("9 9 2 1", 12), ("12 13 14 15 1 2", 5), ("8 6", 10)]
+
+
+@pytest.mark.parametrize("max_batch_size, max_prefill_tokens, initial_capacity", [
+    (16, 2048, 1024),   # all requests in one batch
+    (2, 1, 1024),       # rows freed and reused, one newcomer per step
+    (3, 4, 8),          # compaction and growth of the cache buffer
+])
+def test_batched_decoding_matches_sequential(max_batch_size, max_prefill_tokens, initial_capacity):
+    translator = FakeTranslator()
+    expected = [reference(translator.model, chunk, max_tokens) for chunk, max_tokens in REQUESTS]
+
+    batcher = ApertusContinuousBatcher(translator, max_batch_size=max_batch_size,
+                                       max_prefill_tokens=max_prefill_tokens,
+                                       initial_capacity=initial_capacity)
+    try:
+        futures = [batcher.submit(chunk, "German", "English", max_tokens) for chunk, max_tokens in REQUESTS]
+        results = [future.result(timeout=30) for future in futures]
+    finally:
+        batcher.stop()
+
+    assert [translation for translation, _ in results] == expected
+    for (translation, info), (_, max_tokens) in zip(results, REQUESTS):
+        assert info["max_new_tokens"] == max_tokens
+        assert info["generated_tokens"] == len(translation.split())
+    assert batcher.stats["requests"] == len(REQUESTS)
+    assert 1 < batcher.stats["max_batch"] <= max_batch_size
+
+
+def test_streaming_callback_sees_growing_output():
+    translator = FakeTranslator()
+    updates = []
+    batcher = ApertusContinuousBatcher(translator)
+    try:
+        translation, _ = batcher.submit("3 5 7", "German", "English", 6, on_text=updates.append).result(timeout=30)
+    finally:
+        batcher.stop()
+
+    assert updates[-1:] == ([translation] if translation else [])
+    assert all(later.startswith(earlier) for earlier, later in zip(updates, updates[1:]))
+
+
+def test_slot_cache_writes_in_place():
+    keys = [torch.zeros(4, 1, 10, DIM)]
+    values = [torch.zeros(4, 1, 10, DIM)]
+    cache = _SlotCache(keys, values, slice(0, 2), column=3)
+
+    key, value = cache.update(torch.ones(2, 1, 1, DIM), torch.full((2, 1, 1, DIM), 2.0), 0)
+
+    assert key.shape == (2, 1, 4, DIM) and key.data_ptr() == keys[0].data_ptr()
+    assert keys[0][:2, :, 3].eq(1).all() and values[0][:2, :, 3].eq(2).all()
+    assert keys[0][2:].eq(0).all() and keys[0][:, :, :3].eq(0).all()
+    assert cache.get_seq_length() == 3
+
+
+def test_submit_after_stop_fails():
+    batcher = ApertusContinuousBatcher(FakeTranslator())
+    batcher.stop()
+    with pytest.raises(RuntimeError):
+        batcher.submit("3 5 7", "German", "English", 4).result(timeout=5)
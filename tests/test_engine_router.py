@@ -0,0 +1,93 @@
+"""Tests for engine_router.EngineRouter."""
+
+import pytest
+
+from engine_router import DEFAULT_SECONDS_PER_CHAR, EngineRouter
+
+
+@pytest.mark.parametrize("src, tgt, expected", [
+    ("de", "en", "exact"),
+    ("de", "fr", "source"),
+    ("fr", "en", "target"),
+    ("fr", "it", "any"),
+])
+def test_lookup_prefers_the_most_specific_key(src, tgt, expected):
+    table = {"de:en": "exact", "de:*": "source", "*:en": "target", "*": "any"}
+    assert EngineRouter._lookup(table, src, tgt) == expected
+
+
+def test_lookup_romansh_wildcards():
+    table = {"de:rm-*": "de to romansh", "*:rm-*": "to romansh", "rm-*:*": "from romansh"}
+    assert EngineRouter._lookup(table, "de", "rm-sursilv") == "de to romansh"
+    assert EngineRouter._lookup(table, "fr", "rm-vallader") == "to romansh"
+    assert EngineRouter._lookup(table, "rm-vallader", "de") == "from romansh"
+    assert EngineRouter._lookup(table, "de", "en") is None
+
+
+def test_candidates_come_from_the_registry():
+    router = EngineRouter()
+    assert router.candidates("de", "en") == ["nllb", "apertus"]
+    assert router.candidates("nl", "de") == ["nllb"]
+    assert router.candidates("de", "rm-sursilv") == ["apertus"]
+    # Unlisted languages, and pairs no engine covers, fall back to Apertus
+    assert router.candidates("xyz", "de") == ["apertus"]
+    assert router.candidates("nl", "rm-sursilv") == ["apertus"]
+
+
+def test_route_picks_lowest_expected_time():
+    router = EngineRouter()
+    engine, decision = router.route("Guten Tag", "de", "en")
+    assert engine == "nllb"
+    assert decision["reason"] == "lowest expected time"
+    assert set(decision["candidates"]) == {"nllb", "apertus"}
+
+    # A measured slow engine loses to the other one's prior
+    depth = router.start("nllb")
+    router.finish("nllb", "de", "en", 10, 10.0, depth=depth)
+    assert router.route("Guten Tag", "de", "en")[0] == "apertus"
+
+
+def test_route_respects_quality_floor():
+    router = EngineRouter(floors={"*:rm-*": 0.85}, quality={"nllb": {"de:en": 0.7}})
+    assert router.route("Guten Tag", "de", "rm-sursilv")[1]["reason"] == "only eligible engine"
+
+    router.floors["de:en"] = 0.75
+    engine, decision = router.route("Guten Tag", "de", "en")
+    assert engine == "apertus"
+    assert not decision["candidates"]["nllb"]["eligible"]
+
+    router.floors["de:en"] = 0.95
+    engine, decision = router.route("Guten Tag", "de", "en")
+    assert engine == "apertus"  # best quality when no engine meets the floor
+    assert decision["reason"] == "no engine meets the quality floor, best quality"
+    assert router.stats["floor_fallbacks"] == 1
+
+
+def test_finish_updates_rolling_estimates():
+    router = EngineRouter(concurrency={"nllb": 2}, alpha=0.5)
+    assert router.estimate("nllb", "de", "en", 100)["samples"] == 0
+    assert router.estimate("nllb", "de", "en", 100)["service_time"] == pytest.approx(
+        DEFAULT_SECONDS_PER_CHAR["nllb"] * 100)
+
+    router.finish("nllb", "de", "en", 100, 2.0)
+    assert router.estimate("nllb", "de", "en", 100)["service_time"] == pytest.approx(2.0)
+
+    # Started behind two requests on a 2-wide engine: half the time was queueing
+    router.finish("nllb", "de", "en", 100, 8.0, depth=2)
+    estimate = router.estimate("nllb", "de", "en", 100)
+    assert estimate["service_time"] == pytest.approx(3.0)
+    assert estimate["samples"] == 2
+
+    # Other pairs fall back to the engine's mean over all pairs
+    assert router.estimate("nllb", "fr", "en", 100)["samples"] == 2
+
+
+def test_finish_skips_failed_and_unmeasured_requests():
+    router = EngineRouter()
+    for kwargs in ({"ok": False}, {"measured": False}):
+        depth = router.start("apertus")
+        assert router.estimate("apertus", "de", "en", 10)["queue_depth"] == 1
+        router.finish("apertus", "de", "en", 10, 0.001, depth=depth, **kwargs)
+        estimate = router.estimate("apertus", "de", "en", 10)
+        assert estimate["queue_depth"] == 0
+        assert estimate["samples"] == 0
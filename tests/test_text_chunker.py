@@ -0,0 +1,31 @@
+"""Tests for text_chunker.SentenceSegmenter."""
+
+import pytest
+
+from text_chunker import SentenceSegmenter
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("He said no. She left.", ["He said no.", "She left."]),
+    ("Dr. Smith arrived. Then he left.", ["Dr. Smith arrived.", "Then he left."]),
+    ("Apples, pears, etc. The rest stayed.", ["Apples, pears, etc.", "The rest stayed."]),
+    ("Apples, pears etc. and the rest.", ["Apples, pears etc. and the rest."]),
+    ("Siehe Nr. 5 im Text. Dann weiter.", ["Siehe Nr. 5 im Text.", "Dann weiter."]),
+    ("Vgl. Kapitel drei. Das war es.", ["Vgl. Kapitel drei.", "Das war es."]),
+    ("J. Smith came. He left.", ["J. Smith came.", "He left."]),
+    ("J. R. R. Tolkien wrote it. Fine.", ["J. R. R. Tolkien wrote it.", "Fine."]),
+    ("Am 12. März war es kalt. Ja.", ["Am 12. März war es kalt.", "Ja."]),
+    ("Das 3. kapitel ist gut. Ok.", ["Das 3. kapitel ist gut.", "Ok."]),
+    # Numbers and single letters that end a sentence
+    ("He was 12. She left.", ["He was 12.", "She left."]),
+    ("I met A. Then we left.", ["I met A.", "Then we left."]),
+    ("Plan B. It worked.", ["Plan B.", "It worked."]),
+])
+def test_abbreviations(text, expected):
+    assert SentenceSegmenter().split(text) == expected
+
+
+def test_abbreviation_lists_do_not_overlap_with_common_words():
+    for word in ("no", "art", "fr", "m", "p", "co", "st", "mar"):
+        assert word not in SentenceSegmenter.ABBREVIATIONS | SentenceSegmenter.TRAILING_ABBREVIATIONS
+    assert not SentenceSegmenter.ABBREVIATIONS & SentenceSegmenter.TRAILING_ABBREVIATIONS
@@ -0,0 +1,167 @@
+"""Tests for translation_memory.TranslationMemory and FuzzyTranslationMemory."""
+
+import pytest
+
+from translation_memory import ANY, FuzzyTranslationMemory, TranslationMemory
+
+PARAMS = {"num_beams": 5}
+
+
+@pytest.fixture
+def tm(tmp_path):
+    memory = TranslationMemory(tmp_path / "tm.db")
+    yield memory
+    memory.close()
+
+
+def test_get_exact_entry_and_reference_fallback(tm):
+    tm.put("nllb", "m1", "de", "en", "Guten  Morgen", "Good morning", PARAMS)
+    tm.import_pairs([("Danke", "Thanks")], "de", "en")
+
+    # Whitespace is normalized; key includes engine, model and params
+    assert tm.get("nllb", "m1", "de", "en", "Guten Morgen", PARAMS) == "Good morning"
+    assert tm.get("nllb", "m2", "de", "en", "Guten Morgen", PARAMS) is None
+    assert tm.get("nllb", "m1", "de", "en", "Guten Morgen", {"num_beams": 1}) is None
+    # Reference entries match any engine and model
+    assert tm.get("apertus", "x", "de", "en", "Danke", {}) == "Thanks"
+    assert tm.stats["hits"] == 2 and tm.stats["misses"] == 2
+
+
+def test_hits_are_buffered_until_flush(tm):
+    tm.put("nllb", "m1", "de", "en", "Hallo", "Hello")
+    key = tm.make_key("nllb", "m1", "de", "en", "Hallo")
+    hits = "SELECT hits FROM segments WHERE key = ?"
+
+    assert tm.get("nllb", "m1", "de", "en", "Hallo") == "Hello"
+    assert tm.get("nllb", "m1", "de", "en", "Hallo") == "Hello"
+    assert tm._connect().execute(hits, (key,)).fetchone()[0] == 0
+
+    assert tm.flush_usage() == 1
+    assert tm._connect().execute(hits, (key,)).fetchone()[0] == 2
+
+
+def test_evict_drops_least_recently_used_and_notifies(tm):
+    tm.put_many([(f"Satz {i} " + "x" * 200, f"Sentence {i}") for i in range(200)], "nllb", "m1", "de", "en")
+    evicted = []
+    tm.add_evict_listener(evicted.extend)
+    tm.max_size_bytes = tm.size_bytes() // 2
+
+    removed = tm.evict()
+
+    assert removed == len(evicted) > 0
+    assert tm.get("nllb", "m1", "de", "en", "Satz 0 " + "x" * 200) is None
+    assert tm.get("nllb", "m1", "de", "en", "Satz 199 " + "x" * 200) == "Sentence 199"
+
+
+def test_dice_score_of_near_match(tm):
+    fuzzy = FuzzyTranslationMemory(tm, threshold=0.5, mode="return")
+    grams_a = fuzzy._ngrams("Der Hund schläft.")
+    grams_b = fuzzy._ngrams("Der Hund schläft!")
+    expected = 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+    tm.put("nllb", "m1", "de", "en", "Der Hund schläft.", "The dog sleeps.", PARAMS)
+    match = fuzzy.lookup("Der Hund schläft!", "de", "en", "nllb", "m1", PARAMS)
+
+    assert match["translation"] == "The dog sleeps."
+    assert match["score"] == round(expected, 4)
+    assert not match["exact"]
+
+
+def test_lookup_is_scoped_like_the_translation_memory(tm):
+    fuzzy = FuzzyTranslationMemory(tm, threshold=0.8)
+    tm.put("nllb", "m1", "de", "en", "Der Hund schläft im Garten.", "The dog sleeps in the garden.", PARAMS)
+
+    assert fuzzy.lookup("Der Hund schläft im Garten!", "de", "en", "nllb", "m1", PARAMS)
+    assert fuzzy.lookup("Der Hund schläft im Garten!", "de", "en", "nllb", "m2", PARAMS) is None
+    assert fuzzy.lookup("Der Hund schläft im Garten!", "de", "en", "apertus", "m1", PARAMS) is None
+    assert fuzzy.lookup("Der Hund schläft im Garten!", "de", "fr", "nllb", "m1", PARAMS) is None
+
+
+def test_reference_entries_match_every_engine_and_win_ties(tm):
+    fuzzy = FuzzyTranslationMemory(tm, threshold=0.8)
+    tm.put("nllb", "m1", "de", "en", "Der Hund schläft im Garten.", "machine", PARAMS)
+    tm.import_pairs([("Der Hund schläft im Garten.", "reference")], "de", "en")
+
+    match = fuzzy.lookup("Der Hund schläft im Garten!", "de", "en", "nllb", "m1", PARAMS)
+    assert match["translation"] == "reference"
+    assert fuzzy.lookup("Der Hund schläft im Garten!", "de", "en", "apertus", "a", {})["translation"] == "reference"
+
+
+def test_flag_mode_does_not_flag_identical_sources(tm):
+    fuzzy = FuzzyTranslationMemory(tm, threshold=0.8, mode="flag")
+    tm.import_pairs([("Der Hund schläft im Garten.", "The dog sleeps in the garden.")], "de", "en")
+
+    identical = fuzzy.lookup("Der  Hund schläft im Garten.", "de", "en")
+    near = fuzzy.lookup("Der Hund schläft im Garten!", "de", "en")
+
+    assert identical["exact"] and not identical["needs_review"]
+    assert not near["exact"] and near["needs_review"]
+
+
+def test_below_threshold_and_overlong_segments_do_not_match(tm):
+    fuzzy = FuzzyTranslationMemory(tm, threshold=0.9, max_segment_chars=50)
+    tm.import_pairs([("Der Hund schläft im Garten.", "The dog sleeps in the garden.")], "de", "en")
+
+    assert fuzzy.lookup("Die Katze spielt im Haus.", "de", "en") is None
+    assert fuzzy.lookup("Der Hund schläft im Garten. " * 5, "de", "en") is None
+
+
+def indexed(tm, scope):
+    """Segments in the on-disk fuzzy index of a scope."""
+    return tm._connect().execute(
+        "SELECT COUNT(*) FROM fuzzy_segments s JOIN fuzzy_scopes c ON c.id = s.scope "
+        "WHERE c.engine = ? AND c.model = ? AND c.params = ? AND c.src_lang = ? AND c.tgt_lang = ?", scope
+    ).fetchone()[0]
+
+
+def test_index_fills_incrementally(tm):
+    fuzzy = FuzzyTranslationMemory(tm, threshold=0.8, max_rows_per_refresh=10)
+    tm.import_pairs([(f"Eintrag Nummer {i:03d} im Glossar", f"Entry {i}") for i in range(25)], "de", "en")
+
+    scope = fuzzy._scope(ANY, ANY, ANY, "de", "en")
+    fuzzy.lookup("Eintrag Nummer 000 im Glossar", "de", "en")
+    assert indexed(tm, scope) == 10
+
+    # A partly loaded index keeps loading without waiting for refresh_interval
+    fuzzy.lookup("Eintrag Nummer 000 im Glossar", "de", "en")
+    fuzzy.lookup("Eintrag Nummer 000 im Glossar", "de", "en")
+    assert indexed(tm, scope) == 25
+
+
+def test_index_is_kept_on_disk(tm):
+    tm.import_pairs([("Der Hund schläft im Garten.", "The dog sleeps in the garden.")], "de", "en")
+    FuzzyTranslationMemory(tm, threshold=0.8).lookup("Der Hund schläft!", "de", "en")
+    grams = tm._connect().execute("SELECT COUNT(*) FROM fuzzy_grams").fetchone()[0]
+
+    # A new instance (e.g. after a restart) reuses the index instead of rebuilding it
+    fresh = FuzzyTranslationMemory(tm, threshold=0.8)
+    assert fresh.lookup("Der Hund schläft im Garten!", "de", "en")["translation"] == "The dog sleeps in the garden."
+    assert tm._connect().execute("SELECT COUNT(*) FROM fuzzy_grams").fetchone()[0] == grams > 0
+
+
+def test_replaced_rows_are_pruned_on_lookup(tm):
+    fuzzy = FuzzyTranslationMemory(tm, threshold=0.8, refresh_interval=3600)
+    tm.put("nllb", "m1", "de", "en", "Der Hund schläft im Garten.", "old", PARAMS)
+    assert fuzzy.lookup("Der Hund schläft im Garten!", "de", "en", "nllb", "m1", PARAMS)["translation"] == "old"
+
+    # Another process deletes the row; the index finds out at the next lookup
+    tm._connect().execute("DELETE FROM segments")
+    assert fuzzy.lookup("Der Hund schläft im Garten!", "de", "en", "nllb", "m1", PARAMS) is None
+    assert fuzzy.stats["pruned"] == 1
+
+
+def test_evicted_rows_are_pruned_from_the_index(tm):
+    fuzzy = FuzzyTranslationMemory(tm, threshold=0.8)
+    tm.put_many([(f"Satz Nummer {i:03d} " + "x" * 200, f"Sentence {i}") for i in range(100)],
+                "nllb", "m1", "de", "en", PARAMS)
+    assert fuzzy.lookup("Satz Nummer 000 " + "x" * 200, "de", "en", "nllb", "m1", PARAMS)
+
+    tm.max_size_bytes = tm.size_bytes() // 2
+    removed = tm.evict()
+
+    scope = fuzzy._scope("nllb", "m1", PARAMS, "de", "en")
+    assert fuzzy.stats["pruned"] == removed > 0
+    assert indexed(tm, scope) == 100 - removed
+    # The oldest segment is gone
+    match = fuzzy.lookup("Satz Nummer 000 " + "x" * 200, "de", "en", "nllb", "m1", PARAMS)
+    assert match is None or match["source"] != "Satz Nummer 000 " + "x" * 200
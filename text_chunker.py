@@ -5,7 +5,167 @@ Handles texts of any length by intelligently splitting at natural boundaries
 """
 
 import re
-from typing import List, Tuple
+from bisect import bisect_left
+from math import ceil
+from typing import List, Optional, Tuple
+
+
+class SentenceSegmenter:
+    """
+    Script-aware sentence segmenter.
+
+    Recognizes Latin, full-width (CJK), Devanagari, Arabic/Urdu, Armenian,
+    Ethiopic, Myanmar and Tibetan sentence terminators, closing quotes and
+    brackets after them, and common abbreviations, initials and ordinals
+    that end with a period but do not end a sentence. Sentences may start
+    with any character (lowercase, digits, non-Latin scripts).
+
+    Any object with a ``spans(text, begin, end)`` method returning
+    (start, end) character spans can be passed to SmartTextChunker instead.
+    """
+
+    # Terminators that end a sentence when followed by whitespace
+    TERMINATORS = '.!?…' '։' '؟۔' '።፧' '။' '།'
+    # Terminators that end a sentence even without following whitespace
+    CLOSED_TERMINATORS = '。！？｡．' '।॥'
+    # Characters that may follow a terminator and still belong to the sentence
+    CLOSERS = '"\'”’»›」』）)]}' '\u200e\u200f'
+
+    # Abbreviations that precede what they qualify (titles, "e.g.", "vgl."),
+    # so their period never ends a sentence
+    ABBREVIATIONS = {
+        # English
+        'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'vs', 'e.g', 'i.e', 'cf', 'approx',
+        # German
+        'z.b', 'bzw', 'ca', 'vgl', 'evtl', 'ggf', 'inkl', 'u.a', 'd.h', 'bzgl', 'hr',
+        # French / Italian / Spanish / Romansh
+        'mme', 'mlle', 'sig', 'sra',
+    }
+
+    # Abbreviations that often end a sentence ("... and so on, etc."): their
+    # period only continues the sentence before a lowercase word or a digit
+    TRAILING_ABBREVIATIONS = {
+        # English
+        'etc', 'jr', 'inc', 'ltd', 'vol', 'fig', 'a.m', 'p.m',
+        'feb', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+        # German
+        'usw', 'nr', 'str', 'abs',
+        # French / Italian / Spanish / Romansh
+        'ecc', 'pag',
+    }
+
+    # Months after which "12." is an ordinal date ("am 12. März", "den 3. maj")
+    MONTHS = {
+        'januar', 'jänner', 'februar', 'märz', 'april', 'mai', 'juni', 'juli', 'august',
+        'september', 'oktober', 'november', 'dezember',
+        'marts', 'mars', 'maj', 'december', 'desember',
+    }
+
+    # Capitalized words that start sentences rather than follow an initial,
+    # so "Plan B. It worked." still splits while "J. Smith" does not
+    SENTENCE_STARTERS = {
+        # English
+        'a', 'an', 'the', 'i', 'it', 'he', 'she', 'we', 'you', 'they', 'this', 'that', 'these',
+        'those', 'there', 'then', 'but', 'and', 'or', 'so', 'if', 'when', 'in', 'on', 'at', 'for',
+        'my', 'his', 'her', 'our', 'their', 'what', 'who', 'how', 'why', 'no', 'yes',
+        # German
+        'der', 'die', 'das', 'ein', 'eine', 'er', 'es', 'wir', 'ich', 'ihr', 'sie', 'dann',
+        'aber', 'und', 'im', 'am', 'auf', 'mit', 'nach', 'wenn', 'dies', 'diese', 'dieser',
+        # French / Italian / Romansh
+        'le', 'la', 'les', 'il', 'elle', 'ils', 'nous', 'je', 'un', 'une', 'mais', 'et',
+        'lo', 'gli', 'ma', 'io', 'noi', 'igl', 'jeu', 'nus',
+    }
+
+    def __init__(self, abbreviations=None):
+        """
+        Args:
+            abbreviations: Extra lowercased abbreviations (without final period)
+                           whose period never ends a sentence
+        """
+        self.abbreviations = set(self.ABBREVIATIONS)
+        if abbreviations:
+            self.abbreviations.update(a.lower().rstrip('.') for a in abbreviations)
+        self.trailing_abbreviations = set(self.TRAILING_ABBREVIATIONS) - self.abbreviations
+
+        terminators = re.escape(self.TERMINATORS + self.CLOSED_TERMINATORS)
+        self._boundary = re.compile(f'[{terminators}]+[{re.escape(self.CLOSERS)}]*')
+        self._closed = set(self.CLOSED_TERMINATORS)
+
+    @staticmethod
+    def _next_word(text: str, dot: int, end: int) -> str:
+        """The word after the period at ``dot`` (opening quotes and brackets removed)."""
+        start = dot + 1
+        while start < end and text[start].isspace():
+            start += 1
+        stop = start
+        while stop < end and not text[stop].isspace():
+            stop += 1
+        return text[start:stop].lstrip('([{"\'«‹“‘').rstrip('.,;:!?)]}"\'»›”’')
+
+    def _is_abbreviation(self, text: str, begin: int, dot: int, end: int) -> bool:
+        """Check whether the period at ``dot`` ends an abbreviation, initial or ordinal."""
+        start = dot
+        while start > begin and not text[start - 1].isspace():
+            start -= 1
+        raw = text[start:dot].lstrip('([{"\'«‹“‘')
+        word = raw.lower()
+        if not word:
+            return False
+        if word in self.abbreviations:
+            return True
+
+        following = self._next_word(text, dot, end)
+        if not following:
+            return False
+        if word in self.trailing_abbreviations:
+            # "etc. and more", "Nr. 5" - but not "... etc. The next"
+            return following[0].islower() or following[0].isdigit()
+        # Short ordinals: "am 12. März", "der 3. kapitel" - but not "He was 12. She left."
+        if word.isdigit() and len(word) <= 2:
+            return following[0].islower() or following.lower() in self.MONTHS
+        # Initials before a name: "J. Smith", "J. R. Tolkien" - but not "Plan B. It worked."
+        if len(raw) == 1 and raw.isupper():
+            return following[0].isupper() and following.lower() not in self.SENTENCE_STARTERS
+        return False
+
+    def spans(self, text: str, begin: int = 0, end: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Sentence spans (start, end) inside text[begin:end], without surrounding whitespace."""
+        end = len(text) if end is None else end
+        spans = []
+        start = begin
+
+        for match in self._boundary.finditer(text, begin, end):
+            stop = match.end()
+            run = match.group()
+            at_end = stop >= end
+            followed_by_space = at_end or text[stop].isspace()
+
+            if any(ch in self._closed for ch in run):
+                pass
+            elif not followed_by_space:
+                # "3.14", "e.g.", URLs, ...
+                continue
+            elif run.rstrip(self.CLOSERS) == '.' and self._is_abbreviation(text, begin, match.start(), end):
+                continue
+
+            spans.append((start, stop))
+            start = stop
+
+        spans.append((start, end))
+
+        stripped = []
+        for a, b in spans:
+            while a < b and text[a].isspace():
+                a += 1
+            while b > a and text[b - 1].isspace():
+                b -= 1
+            if a < b:
+                stripped.append((a, b))
+        return stripped
+
+    def split(self, text: str) -> List[str]:
+        """Split text into sentences."""
+        return [text[a:b] for a, b in self.spans(text)]
 
 
 class SmartTextChunker:
@@ -16,16 +176,26 @@ class SmartTextChunker:
     - Context and coherence
     """
 
-    def __init__(self, max_tokens=400, tokenizer=None):
+    _PARAGRAPH_SEP = re.compile(r'\n\s*\n')
+    # Scripts written without spaces between words (≈1 token per character)
+    _UNSPACED_CHARS = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]')
+
+    def __init__(self, max_tokens=400, tokenizer=None, single_pass=True, segmenter=None):
         """
         Initialize the text chunker.
 
         Args:
             max_tokens: Target maximum tokens per chunk (default 400, safe margin from 512)
             tokenizer: Optional tokenizer for accurate token counting
+            single_pass: With a fast tokenizer, tokenize the document once and
+                         take every boundary decision from its offset mapping
+                         (False restores per-paragraph/sentence/word counting)
+            segmenter: Sentence segmenter (default: script-aware SentenceSegmenter)
         """
         self.max_tokens = max_tokens
         self.tokenizer = tokenizer
+        self.single_pass = single_pass
+        self.segmenter = segmenter or SentenceSegmenter()
 
     def estimate_tokens(self, text: str) -> int:
         """
@@ -33,7 +203,7 @@ class SmartTextChunker:
 
         If tokenizer available, use it. Otherwise estimate:
         - 1 token ≈ 0.75 words for European languages
-        - 1 token ≈ 4 characters
+        - 1 token per character for CJK scripts (no spaces between words)
         """
         if self.tokenizer:
             try:
@@ -43,9 +213,10 @@ class SmartTextChunker:
                 pass
 
         # Fallback: estimate based on words
-        word_count = len(text.split())
+        unspaced = len(self._UNSPACED_CHARS.findall(text))
+        word_count = len(self._UNSPACED_CHARS.sub(' ', text).split())
         # Conservative estimate: 1.3 tokens per word (safer than 0.75 words per token)
-        return int(word_count * 1.3)
+        return int(word_count * 1.3) + unspaced
 
     def split_paragraphs(self, text: str) -> List[str]:
         """Split text into paragraphs."""
@@ -54,12 +225,76 @@ class SmartTextChunker:
         return [p.strip() for p in paragraphs if p.strip()]
 
     def split_sentences(self, text: str) -> List[str]:
-        """Split text into sentences."""
-        # Enhanced sentence splitting pattern
-        # Handles: . ! ? followed by space and capital letter, or end of string
-        pattern = r'(?<=[.!?])\s+(?=[A-Z])|(?<=[.!?])$'
-        sentences = re.split(pattern, text)
-        return [s.strip() for s in sentences if s.strip()]
+        """Split text into sentences with the configured segmenter."""
+        return [text[a:b] for a, b in self.segmenter.spans(text, 0, len(text))]
+
+    def join_sentences(self, sentences: List[str]) -> str:
+        """Join sentences with a space, except where the script uses none (CJK)."""
+        result = ''
+        for sentence in sentences:
+            if result and not (self._UNSPACED_CHARS.match(sentence[0])
+                               or self._UNSPACED_CHARS.match(result[-1])
+                               or result[-1] in SentenceSegmenter.CLOSED_TERMINATORS):
+                result += ' '
+            result += sentence
+        return result
+
+    def _balanced_groups(self, counts: List[int], max_tokens: int) -> List[Tuple[List[int], bool]]:
+        """
+        Group consecutive sentences into chunks of similar size.
+
+        Runs of sentences that fit are split into the fewest chunks the budget
+        allows, each aiming at the run's average chunk size, so that chunks
+        batched together carry little padding. Sentences longer than the
+        budget form their own group, flagged for further splitting.
+
+        Returns:
+            List of (sentence indices, too_long) tuples
+        """
+        groups = []
+        run = []
+
+        def flush():
+            if not run:
+                return
+            total = sum(counts[i] for i in run)
+            target = total / max(1, ceil(total / max_tokens))
+            current, current_tokens = [], 0
+            for i in run:
+                c = counts[i]
+                overshoot = current_tokens + c - target
+                if current and (current_tokens + c > max_tokens
+                                or (overshoot > 0 and overshoot > target - current_tokens)):
+                    groups.append((current, False))
+                    current, current_tokens = [], 0
+                current.append(i)
+                current_tokens += c
+            if current:
+                groups.append((current, False))
+
+        for i, c in enumerate(counts):
+            if c > max_tokens:
+                flush()
+                run = []
+                groups.append(([i], True))
+            else:
+                run.append(i)
+        flush()
+
+        return groups
+
+    def _split_long_word(self, word: str, max_tokens: int) -> List[str]:
+        """Cut a single unspaced 'word' (e.g. a CJK sentence) into estimated-size pieces."""
+        pieces = []
+        current = ''
+        for ch in word:
+            if current and self.estimate_tokens(current + ch) > max_tokens:
+                pieces.append(current)
+                current = ''
+            current += ch
+        if current:
+            pieces.append(current)
+        return pieces
 
     def split_by_tokens(self, text: str, max_tokens: int) -> List[str]:
         """
@@ -67,52 +302,130 @@ class SmartTextChunker:
         Tries to split at sentence boundaries if possible.
         """
         sentences = self.split_sentences(text)
+        counts = [self.estimate_tokens(sentence) for sentence in sentences]
         chunks = []
-        current_chunk = []
-        current_tokens = 0
 
-        for sentence in sentences:
-            sentence_tokens = self.estimate_tokens(sentence)
-
-            # If single sentence is too long, split it further
-            if sentence_tokens > max_tokens:
-                # Save current chunk if any
-                if current_chunk:
-                    chunks.append(' '.join(current_chunk))
-                    current_chunk = []
-                    current_tokens = 0
-
-                # Split long sentence by words
-                words = sentence.split()
-                temp_chunk = []
-                temp_tokens = 0
-
-                for word in words:
-                    word_tokens = self.estimate_tokens(word)
-                    if temp_tokens + word_tokens > max_tokens and temp_chunk:
-                        chunks.append(' '.join(temp_chunk))
-                        temp_chunk = [word]
-                        temp_tokens = word_tokens
-                    else:
-                        temp_chunk.append(word)
-                        temp_tokens += word_tokens
+        for indices, too_long in self._balanced_groups(counts, max_tokens):
+            if not too_long:
+                chunks.append(self.join_sentences([sentences[i] for i in indices]))
+                continue
+
+            # Split long sentence by words
+            temp_chunk = []
+            temp_tokens = 0
 
-                if temp_chunk:
+            for word in sentences[indices[0]].split():
+                word_tokens = self.estimate_tokens(word)
+                if word_tokens > max_tokens:
+                    # No spaces to split at (CJK): cut by characters
+                    if temp_chunk:
+                        chunks.append(' '.join(temp_chunk))
+                        temp_chunk, temp_tokens = [], 0
+                    chunks.extend(self._split_long_word(word, max_tokens))
+                elif temp_tokens + word_tokens > max_tokens and temp_chunk:
                     chunks.append(' '.join(temp_chunk))
+                    temp_chunk = [word]
+                    temp_tokens = word_tokens
+                else:
+                    temp_chunk.append(word)
+                    temp_tokens += word_tokens
 
-            # If adding this sentence would exceed limit, start new chunk
-            elif current_tokens + sentence_tokens > max_tokens and current_chunk:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = [sentence]
-                current_tokens = sentence_tokens
+            if temp_chunk:
+                chunks.append(' '.join(temp_chunk))
 
-            else:
-                current_chunk.append(sentence)
-                current_tokens += sentence_tokens
+        return chunks
+
+    def token_offsets(self, text: str) -> Optional[List[int]]:
+        """
+        Tokenize the whole text once and return the start offset of every token.
+
+        Returns None when no fast tokenizer (with offset mappings) is available.
+        """
+        if not self.tokenizer or not getattr(self.tokenizer, 'is_fast', False):
+            return None
+        try:
+            encoding = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        except Exception:
+            return None
+        return [start for start, _ in encoding['offset_mapping']]
+
+    def _span_tokens(self, starts: List[int], begin: int, end: int) -> int:
+        """Number of tokens starting inside text[begin:end]."""
+        return bisect_left(starts, end) - bisect_left(starts, begin)
+
+    @staticmethod
+    def _strip_span(text: str, begin: int, end: int) -> Tuple[int, int]:
+        """Shrink a span so it has no leading or trailing whitespace."""
+        while begin < end and text[begin].isspace():
+            begin += 1
+        while end > begin and text[end - 1].isspace():
+            end -= 1
+        return begin, end
+
+    def _split_spans(self, text: str, pattern, begin: int, end: int) -> List[Tuple[int, int]]:
+        """Split text[begin:end] on a separator regex, returning stripped spans."""
+        spans = []
+        for match in pattern.finditer(text, begin, end):
+            spans.append(self._strip_span(text, begin, match.start()))
+            begin = match.end()
+        spans.append(self._strip_span(text, begin, end))
+        return [(a, b) for a, b in spans if a < b]
+
+    def _split_at_tokens(self, text: str, starts: List[int], begin: int, end: int) -> List[str]:
+        """
+        Split an over-long span into pieces of at most max_tokens tokens.
+
+        Cuts happen at token boundaries, preferring a token that starts a
+        new word (preceded by whitespace); scripts without spaces are cut at
+        the last token boundary that fits.
+        """
+        first = bisect_left(starts, begin)
+        last = bisect_left(starts, end)
+
+        pieces = []
+        piece_begin = begin
+        i = first
+        while last - i > self.max_tokens:
+            cut = i + self.max_tokens
+            for k in range(cut, i, -1):
+                pos = starts[k]
+                if text[pos].isspace() or (pos > 0 and text[pos - 1].isspace()):
+                    cut = k
+                    break
+            a, b = self._strip_span(text, piece_begin, starts[cut])
+            if a < b:
+                pieces.append(text[a:b])
+            piece_begin = starts[cut]
+            i = cut
+
+        a, b = self._strip_span(text, piece_begin, end)
+        if a < b:
+            pieces.append(text[a:b])
+        return pieces
+
+    def _chunk_with_offsets(self, text: str, starts: List[int]) -> List[Tuple[str, str]]:
+        """Chunk text using token start offsets from a single tokenizer pass."""
+        if len(starts) <= self.max_tokens:
+            return [(text, 'full')]
 
-        # Add remaining chunk
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
+        chunks = []
+        for p_begin, p_end in self._split_spans(text, self._PARAGRAPH_SEP, 0, len(text)):
+            # If paragraph fits, keep it whole
+            if self._span_tokens(starts, p_begin, p_end) <= self.max_tokens:
+                chunks.append((text[p_begin:p_end], 'paragraph'))
+                continue
+
+            # Otherwise pack sentences into balanced chunks, splitting long ones at token boundaries
+            spans = self.segmenter.spans(text, p_begin, p_end)
+            counts = [self._span_tokens(starts, a, b) for a, b in spans]
+
+            for indices, too_long in self._balanced_groups(counts, self.max_tokens):
+                if too_long:
+                    a, b = spans[indices[0]]
+                    for piece in self._split_at_tokens(text, starts, a, b):
+                        chunks.append((piece, 'word-split'))
+                else:
+                    chunks.append((self.join_sentences([text[a:b] for a, b in (spans[i] for i in indices)]), 'sentence'))
 
         return chunks
 
@@ -134,6 +447,12 @@ class SmartTextChunker:
         if not text:
             return []
 
+        # Single tokenizer pass: all boundary decisions from one offset array
+        if self.single_pass:
+            starts = self.token_offsets(text)
+            if starts is not None:
+                return self._chunk_with_offsets(text, starts)
+
         # Check if entire text fits
         total_tokens = self.estimate_tokens(text)
         if total_tokens <= self.max_tokens:
@@ -189,6 +508,35 @@ class SmartTextChunker:
         }
 
 
+def normalize_segment(segment: str) -> str:
+    """Whitespace-normalized form of a segment, used to detect repeats."""
+    return ' '.join(segment.split())
+
+
+def deduplicate(items, key=normalize_segment):
+    """
+    Collapse repeated items (datelines, headers, "Fortsetzung folgt" lines).
+
+    Args:
+        items: Sequence of segments (or tuples, with a matching ``key``)
+        key: Function giving the identity of an item
+
+    Returns:
+        (unique_items, positions): the first occurrence of every distinct
+        item, and for each original item the index of its unique item
+    """
+    unique = []
+    seen = {}
+    positions = []
+    for item in items:
+        k = key(item)
+        if k not in seen:
+            seen[k] = len(unique)
+            unique.append(item)
+        positions.append(seen[k])
+    return unique, positions
+
+
 def demo():
     """Demo the text chunker."""
     chunker = SmartTextChunker(max_tokens=100)
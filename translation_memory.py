@@ -0,0 +1,777 @@
+#!/usr/bin/env python3
+"""
+Persistent Translation Memory for TraductAL
+SQLite-backed segment cache shared by the NLLB and Apertus engines,
+with fuzzy (near-match) lookup through a character n-gram index
+"""
+
+import os
+import json
+import math
+import time
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+
+# Entries imported from parallel corpora apply to every engine and model
+ANY = "*"
+
+
+class TranslationMemory:
+    """
+    On-disk translation memory keyed on engine, model, language pair,
+    normalized segment text and decoding parameters.
+
+    - Safe to share between processes (SQLite WAL mode + busy timeout)
+    - Least-recently-used eviction once the database exceeds ``max_size_mb``
+    - Lookups only read; hit counts and last-used times are buffered and
+      written with the next store, eviction or flush
+    - Bulk import of existing parallel corpora (TSV or aligned line files)
+    """
+
+    def __init__(self, db_path="./cache/translation_memory.db", max_size_mb=512,
+                 usage_flush_interval=30.0, usage_flush_size=512):
+        """
+        Open (or create) a translation memory.
+
+        Args:
+            db_path: SQLite database file
+            max_size_mb: Size above which least-recently-used entries are evicted
+            usage_flush_interval: Seconds after which buffered hit updates
+                                  are written on the next lookup
+            usage_flush_size: Buffered hit updates that trigger a write
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+        # One connection per thread; SQLite handles cross-process locking
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._puts_since_check = 0
+
+        # key -> (last used, hits) not yet written, so lookups need no write lock
+        self._usage = {}
+        self._usage_flushed = time.time()
+        self.usage_flush_interval = usage_flush_interval
+        self.usage_flush_size = usage_flush_size
+
+        # Callbacks told the rowids of evicted entries (e.g. the fuzzy index)
+        self._evict_listeners = []
+
+        # Counters for this process
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        self._init_schema()
+
+    # ------------------------------------------------------------------ #
+    # Storage
+    # ------------------------------------------------------------------ #
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS segments (
+                key TEXT PRIMARY KEY,
+                engine TEXT NOT NULL,
+                model TEXT NOT NULL,
+                src_lang TEXT NOT NULL,
+                tgt_lang TEXT NOT NULL,
+                params TEXT NOT NULL,
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_segments_last_used ON segments(last_used);
+            CREATE INDEX IF NOT EXISTS idx_segments_pair ON segments(src_lang, tgt_lang);
+        """)
+
+    def close(self):
+        """Write buffered usage and close this thread's database connection."""
+        self.flush_usage()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ------------------------------------------------------------------ #
+    # Keys
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize a segment for lookup (NFC, collapsed whitespace)."""
+        text = unicodedata.normalize("NFC", text)
+        return re.sub(r"\s+", " ", text).strip()
+
+    @staticmethod
+    def make_key(engine, model, src_lang, tgt_lang, text, params=None) -> str:
+        """Stable hash of everything that determines a translation."""
+        params_json = params if isinstance(params, str) else json.dumps(params or {}, sort_keys=True)
+        payload = "\x1f".join([
+            engine, str(model), src_lang, tgt_lang, params_json,
+            TranslationMemory.normalize(text)
+        ])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------ #
+    # Lookup / store
+    # ------------------------------------------------------------------ #
+
+    def get(self, engine, model, src_lang, tgt_lang, text, params=None) -> Optional[str]:
+        """
+        Look up a segment.
+
+        Tries the exact (engine, model, params) entry first, then entries
+        imported from reference corpora for the same language pair.
+
+        Returns:
+            Cached translation, or None on a miss
+        """
+        keys = [
+            self.make_key(engine, model, src_lang, tgt_lang, text, params),
+            self.make_key(ANY, ANY, src_lang, tgt_lang, text, ANY),
+        ]
+        conn = self._connect()
+
+        for key in keys:
+            row = conn.execute("SELECT target FROM segments WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                now = time.time()
+                with self._lock:
+                    self.stats["hits"] += 1
+                    self._usage[key] = (now, self._usage.get(key, (0, 0))[1] + 1)
+                    flush = len(self._usage) >= self.usage_flush_size or \
+                        now - self._usage_flushed >= self.usage_flush_interval
+                if flush:
+                    self.flush_usage()
+                return row[0]
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, engine, model, src_lang, tgt_lang, text, translation, params=None):
+        """Store a segment translation."""
+        self.put_many([(text, translation)], engine, model, src_lang, tgt_lang, params)
+
+    def put_many(self, pairs: Iterable[Tuple[str, str]], engine, model, src_lang, tgt_lang, params=None):
+        """Store many (source, translation) pairs in one transaction."""
+        params_json = params if isinstance(params, str) else json.dumps(params or {}, sort_keys=True)
+        now = time.time()
+        records = [
+            (self.make_key(engine, model, src_lang, tgt_lang, source, params_json),
+             engine, str(model), src_lang, tgt_lang, params_json,
+             self.normalize(source), target, now, now)
+            for source, target in pairs
+            if source.strip() and target.strip()
+        ]
+        if not records:
+            return 0
+
+        conn = self._connect()
+        usage = self._take_usage()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_usage(conn, usage)
+            conn.executemany(
+                "INSERT OR REPLACE INTO segments "
+                "(key, engine, model, src_lang, tgt_lang, params, source, target, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                records
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            self.stats["stores"] += len(records)
+            self._puts_since_check += len(records)
+            check = self._puts_since_check >= 1000
+            if check:
+                self._puts_since_check = 0
+
+        if check:
+            self.evict()
+
+        return len(records)
+
+    def _take_usage(self):
+        """Buffered usage updates, clearing the buffer."""
+        with self._lock:
+            usage, self._usage = self._usage, {}
+            self._usage_flushed = time.time()
+        return usage
+
+    @staticmethod
+    def _write_usage(conn, usage):
+        """Apply buffered (last used, hits) updates inside the caller's transaction."""
+        conn.executemany(
+            "UPDATE segments SET last_used = MAX(last_used, ?), hits = hits + ? WHERE key = ?",
+            [(last_used, hits, key) for key, (last_used, hits) in usage.items()]
+        )
+
+    def flush_usage(self):
+        """Write buffered hit counts and last-used times; return how many entries were updated."""
+        usage = self._take_usage()
+        if not usage:
+            return 0
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_usage(conn, usage)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(usage)
+
+    # ------------------------------------------------------------------ #
+    # Eviction
+    # ------------------------------------------------------------------ #
+
+    def size_bytes(self) -> int:
+        """Bytes used by live pages of the database."""
+        conn = self._connect()
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def evict(self, target_ratio=0.9) -> int:
+        """
+        Drop least-recently-used entries until the database is below
+        ``target_ratio`` of ``max_size_bytes``.
+
+        Returns:
+            Number of entries removed
+        """
+        size = self.size_bytes()
+        if size <= self.max_size_bytes:
+            return 0
+
+        # Recently used entries must not look stale
+        self.flush_usage()
+        conn = self._connect()
+        count = conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        if count == 0:
+            return 0
+
+        # Assume roughly uniform entry size to pick how many to drop
+        excess = size - self.max_size_bytes * target_ratio
+        n_drop = max(1, int(count * excess / size))
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rowids = [row[0] for row in conn.execute(
+                "SELECT rowid FROM segments ORDER BY last_used ASC LIMIT ?", (n_drop,)
+            )]
+            conn.executemany("DELETE FROM segments WHERE rowid = ?", [(rowid,) for rowid in rowids])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            self.stats["evictions"] += len(rowids)
+            listeners = list(self._evict_listeners)
+        for listener in listeners:
+            listener(rowids)
+        return len(rowids)
+
+    def add_evict_listener(self, callback):
+        """Call ``callback(rowids)`` whenever this process evicts entries."""
+        with self._lock:
+            self._evict_listeners.append(callback)
+
+    # ------------------------------------------------------------------ #
+    # Bulk import
+    # ------------------------------------------------------------------ #
+
+    def import_pairs(self, pairs: Iterable[Tuple[str, str]], src_lang, tgt_lang,
+                     engine=ANY, model=ANY, params=ANY, batch_size=5000) -> int:
+        """
+        Import (source, target) pairs.
+
+        By default pairs are stored as reference entries that match any
+        engine, model and decoding parameters for the language pair.
+        """
+        total = 0
+        batch = []
+        for pair in pairs:
+            batch.append(pair)
+            if len(batch) >= batch_size:
+                total += self.put_many(batch, engine, model, src_lang, tgt_lang, params)
+                batch = []
+        if batch:
+            total += self.put_many(batch, engine, model, src_lang, tgt_lang, params)
+        self.evict()
+        return total
+
+    def import_tsv(self, path, src_lang, tgt_lang, **kwargs) -> int:
+        """Import a tab-separated file with source and target columns."""
+        def pairs():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) >= 2:
+                        yield parts[0], parts[1]
+        return self.import_pairs(pairs(), src_lang, tgt_lang, **kwargs)
+
+    def import_parallel(self, source_path, target_path, src_lang, tgt_lang, **kwargs) -> int:
+        """Import two line-aligned files (one segment per line)."""
+        def pairs():
+            with open(source_path, "r", encoding="utf-8") as fs, \
+                 open(target_path, "r", encoding="utf-8") as ft:
+                for source, target in zip(fs, ft):
+                    yield source.rstrip("\n"), target.rstrip("\n")
+        return self.import_pairs(pairs(), src_lang, tgt_lang, **kwargs)
+
+    # ------------------------------------------------------------------ #
+    # Info
+    # ------------------------------------------------------------------ #
+
+    def info(self) -> Dict:
+        """Summary of the database and this process's counters."""
+        conn = self._connect()
+        count = conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        pairs = conn.execute(
+            "SELECT src_lang, tgt_lang, COUNT(*) FROM segments GROUP BY src_lang, tgt_lang"
+        ).fetchall()
+        return {
+            "path": str(self.db_path),
+            "entries": count,
+            "size_mb": round(self.size_bytes() / (1024 * 1024), 2),
+            "max_size_mb": round(self.max_size_bytes / (1024 * 1024), 2),
+            "pairs": {f"{s}→{t}": n for s, t, n in pairs},
+            **self.stats
+        }
+
+
+class FuzzyTranslationMemory:
+    """
+    Near-match lookup over a TranslationMemory.
+
+    Keeps a character n-gram inverted index of stored source segments in
+    the TranslationMemory database, per TranslationMemory scope (engine,
+    model, decoding parameters and language pair), plus one for the
+    reference entries of the pair that apply to every engine:
+
+        fuzzy_scopes    scope id, key fields, last indexed segments rowid
+        fuzzy_segments  indexed segments rowid -> scope, n-gram count
+        fuzzy_grams     (scope, n-gram, segment) postings
+        fuzzy_df        (scope, n-gram) -> posting count
+
+    Candidates are found with prefix filtering (only the rarest query
+    n-grams are probed, which is sufficient to find every segment above
+    the threshold; probing k more of them, while their postings stay
+    within ``max_probe_postings``, lets SQLite keep only segments sharing
+    k + 1 probed n-grams), read from the database on demand and scored
+    with the Dice coefficient of their n-gram sets. Nothing but the query is held
+    in memory, and the index survives restarts.
+
+    Lookups are meant per segment, after an exact TranslationMemory miss.
+    New database rows are indexed at most ``max_rows_per_refresh`` at a
+    time, so a large memory fills its index over several lookups instead
+    of stalling the first one. Rows evicted by this process's
+    TranslationMemory are dropped from the index; rows removed otherwise
+    are dropped when a lookup no longer finds them.
+
+    Modes for matches above ``threshold``:
+        'return' - use the stored translation directly
+        'flag'   - use it, but mark the result for review (unless the
+                   stored source is identical to the segment)
+        'hint'   - run the model, passing the match as a reference example
+    """
+
+    MODES = ("return", "flag", "hint")
+
+    # Host parameters per IN (...) list, below SQLite's limit
+    _BATCH = 500
+
+    def __init__(self, memory: TranslationMemory, threshold=0.85, mode="flag",
+                 ngram_size=3, max_segment_chars=1000, refresh_interval=5.0,
+                 max_rows_per_refresh=5000, max_probe_postings=10000):
+        """
+        Args:
+            memory: TranslationMemory whose segments are indexed
+            threshold: Minimum Dice similarity (0-1) for a fuzzy match
+            mode: 'return', 'flag' or 'hint'
+            ngram_size: Character n-gram length (part of the index; use
+                        one size per database)
+            max_segment_chars: Longer segments are not indexed
+            refresh_interval: Seconds between checks for new database rows
+            max_rows_per_refresh: Database rows indexed per refresh at most
+            max_probe_postings: Postings read per lookup to narrow down
+                                candidates (beyond the minimum probe)
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown fuzzy mode: {mode} (expected one of {self.MODES})")
+
+        self.memory = memory
+        self.threshold = threshold
+        self.mode = mode
+        self.n = ngram_size
+        self.max_segment_chars = max_segment_chars
+        self.refresh_interval = refresh_interval
+        self.max_rows_per_refresh = max_rows_per_refresh
+        self.max_probe_postings = max_probe_postings
+
+        # scope -> monotonic time of the last refresh (None while partly loaded)
+        self._refreshed = {}
+        self._lock = threading.Lock()
+        self._init_schema()
+        memory.add_evict_listener(self._on_evict)
+
+        self.stats = {"lookups": 0, "matches": 0, "pruned": 0}
+
+    def _init_schema(self):
+        self.memory._connect().executescript("""
+            CREATE TABLE IF NOT EXISTS fuzzy_scopes (
+                id INTEGER PRIMARY KEY,
+                engine TEXT NOT NULL,
+                model TEXT NOT NULL,
+                params TEXT NOT NULL,
+                src_lang TEXT NOT NULL,
+                tgt_lang TEXT NOT NULL,
+                last_rowid INTEGER NOT NULL DEFAULT 0,
+                pruned INTEGER NOT NULL DEFAULT 0,
+                UNIQUE (engine, model, params, src_lang, tgt_lang)
+            );
+            CREATE TABLE IF NOT EXISTS fuzzy_segments (
+                segment INTEGER PRIMARY KEY,
+                scope INTEGER NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_fuzzy_segments_scope ON fuzzy_segments(scope);
+            CREATE TABLE IF NOT EXISTS fuzzy_grams (
+                scope INTEGER NOT NULL,
+                gram TEXT NOT NULL,
+                segment INTEGER NOT NULL,
+                PRIMARY KEY (scope, gram, segment)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS fuzzy_df (
+                scope INTEGER NOT NULL,
+                gram TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (scope, gram)
+            ) WITHOUT ROWID;
+        """)
+
+    def _ngrams(self, text):
+        """Set of character n-grams of a normalized, lowercased segment."""
+        text = f" {TranslationMemory.normalize(text).lower()} "
+        if len(text) <= self.n:
+            return frozenset([text])
+        return frozenset(text[i:i + self.n] for i in range(len(text) - self.n + 1))
+
+    @staticmethod
+    def _scope(engine, model, params, src_lang, tgt_lang):
+        """Index key: the TranslationMemory key fields apart from the text."""
+        params_json = params if isinstance(params, str) else json.dumps(params or {}, sort_keys=True)
+        return (engine, str(model), params_json, src_lang, tgt_lang)
+
+    @staticmethod
+    def _write(conn, work):
+        """Run ``work(conn)`` in a write transaction and return its result."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    @staticmethod
+    def _scope_id(conn, scope):
+        """Id of a scope's index, or None if it has never been indexed."""
+        row = conn.execute(
+            "SELECT id FROM fuzzy_scopes WHERE engine = ? AND model = ? AND params = ? "
+            "AND src_lang = ? AND tgt_lang = ?", scope
+        ).fetchone()
+        return row[0] if row else None
+
+    def _refresh(self, scope):
+        """Index new rows of a scope if due (at once while it is partly loaded)."""
+        now = time.monotonic()
+        with self._lock:
+            last = self._refreshed.get(scope)
+            if last is not None and now - last < self.refresh_interval:
+                return
+            self._refreshed[scope] = now
+
+        complete = self._write(self.memory._connect(), lambda conn: self._load_rows(conn, scope))
+        if not complete:
+            with self._lock:
+                self._refreshed[scope] = None
+
+    def _load_rows(self, conn, scope):
+        """Index up to max_rows_per_refresh rows added since the last refresh; True if none remain."""
+        scope_id = self._scope_id(conn, scope)
+        if scope_id is None:
+            scope_id = conn.execute(
+                "INSERT INTO fuzzy_scopes (engine, model, params, src_lang, tgt_lang) VALUES (?, ?, ?, ?, ?)",
+                scope
+            ).lastrowid
+        last_rowid = conn.execute("SELECT last_rowid FROM fuzzy_scopes WHERE id = ?", (scope_id,)).fetchone()[0]
+
+        engine, model, params, src_lang, tgt_lang = scope
+        rows = conn.execute(
+            "SELECT rowid, source FROM segments "
+            "WHERE rowid > ? AND src_lang = ? AND tgt_lang = ? AND engine = ? AND model = ? AND params = ? "
+            "ORDER BY rowid LIMIT ?",
+            (last_rowid, src_lang, tgt_lang, engine, model, params, self.max_rows_per_refresh)
+        ).fetchall()
+        if not rows:
+            return True
+
+        segments, postings, df = [], [], {}
+        for rowid, source in rows:
+            if len(source) > self.max_segment_chars:
+                continue
+            grams = self._ngrams(source)
+            segments.append((rowid, scope_id, len(grams)))
+            for gram in grams:
+                postings.append((scope_id, gram, rowid))
+                df[gram] = df.get(gram, 0) + 1
+
+        conn.executemany("INSERT OR IGNORE INTO fuzzy_segments (segment, scope, size) VALUES (?, ?, ?)", segments)
+        # In key order, so the postings B-tree is appended to rather than split at random
+        postings.sort()
+        conn.executemany("INSERT OR IGNORE INTO fuzzy_grams (scope, gram, segment) VALUES (?, ?, ?)", postings)
+        conn.executemany(
+            "INSERT INTO fuzzy_df (scope, gram, count) VALUES (?, ?, ?) "
+            "ON CONFLICT (scope, gram) DO UPDATE SET count = count + excluded.count",
+            [(scope_id, gram, count) for gram, count in df.items()]
+        )
+        conn.execute("UPDATE fuzzy_scopes SET last_rowid = ? WHERE id = ?", (rows[-1][0], scope_id))
+
+        print(f"🔎 Fuzzy TM: indexed {len(segments)} new segments ({src_lang} → {tgt_lang})")
+        return len(rows) < self.max_rows_per_refresh
+
+    def _prune(self, conn, rowids):
+        """Drop segments from the index (postings go with the next compaction of their scope)."""
+        by_scope = {}
+        for start in range(0, len(rowids), self._BATCH):
+            batch = rowids[start:start + self._BATCH]
+            marks = ",".join("?" * len(batch))
+            for scope_id, count in conn.execute(
+                    f"SELECT scope, COUNT(*) FROM fuzzy_segments WHERE segment IN ({marks}) GROUP BY scope", batch):
+                by_scope[scope_id] = by_scope.get(scope_id, 0) + count
+            conn.execute(f"DELETE FROM fuzzy_segments WHERE segment IN ({marks})", batch)
+
+        for scope_id, count in by_scope.items():
+            conn.execute("UPDATE fuzzy_scopes SET pruned = pruned + ? WHERE id = ?", (count, scope_id))
+            pruned = conn.execute("SELECT pruned FROM fuzzy_scopes WHERE id = ?", (scope_id,)).fetchone()[0]
+            live = conn.execute("SELECT COUNT(*) FROM fuzzy_segments WHERE scope = ?", (scope_id,)).fetchone()[0]
+            if pruned > live:
+                self._compact(conn, scope_id)
+
+        removed = sum(by_scope.values())
+        with self._lock:
+            self.stats["pruned"] += removed
+        return removed
+
+    @staticmethod
+    def _compact(conn, scope_id):
+        """Delete the postings of pruned segments and recount n-gram frequencies."""
+        conn.execute(
+            "DELETE FROM fuzzy_grams WHERE scope = ? AND segment NOT IN "
+            "(SELECT segment FROM fuzzy_segments WHERE scope = ?)", (scope_id, scope_id)
+        )
+        conn.execute("DELETE FROM fuzzy_df WHERE scope = ?", (scope_id,))
+        conn.execute(
+            "INSERT INTO fuzzy_df (scope, gram, count) "
+            "SELECT scope, gram, COUNT(*) FROM fuzzy_grams WHERE scope = ? GROUP BY gram", (scope_id,)
+        )
+        conn.execute("UPDATE fuzzy_scopes SET pruned = 0 WHERE id = ?", (scope_id,))
+
+    def _on_evict(self, rowids):
+        """Drop evicted database rows from the index."""
+        self._write(self.memory._connect(), lambda conn: self._prune(conn, list(rowids)))
+
+    def _best(self, conn, scope, query):
+        """(source, translation, Dice score) of the most similar indexed segment of a scope, or None."""
+        scope_id = self._scope_id(conn, scope)
+        if scope_id is None:
+            return None
+
+        q = len(query)
+        t = self.threshold
+        grams = list(query)
+        df = {}
+        for start in range(0, q, self._BATCH):
+            batch = grams[start:start + self._BATCH]
+            df.update(conn.execute(
+                f"SELECT gram, count FROM fuzzy_df WHERE scope = ? AND gram IN ({','.join('?' * len(batch))})",
+                [scope_id, *batch]
+            ))
+
+        # Dice >= t requires at least ceil(t*q/(2-t)) shared n-grams, so
+        # probing the q - min_overlap + 1 rarest n-grams finds every candidate
+        min_overlap = max(1, math.ceil(t * q / (2 - t)))
+        ordered = sorted(grams, key=lambda g: df.get(g, 0))
+        prefix = q - min_overlap + 1
+        postings = sum(df.get(gram, 0) for gram in ordered[:prefix])
+        if not postings:
+            return None
+
+        # Each further probed n-gram raises the number a candidate must share by one
+        probe_size = prefix
+        while probe_size < q and postings + df.get(ordered[probe_size], 0) <= self.max_probe_postings:
+            postings += df.get(ordered[probe_size], 0)
+            probe_size += 1
+        probe = [gram for gram in ordered[:probe_size] if gram in df]
+        required = probe_size - prefix + 1
+
+        # Length filter: Dice >= t bounds the candidate's n-gram count
+        candidates = [row[0] for row in conn.execute(
+            f"SELECT s.segment FROM (SELECT segment FROM fuzzy_grams "
+            f"WHERE scope = ? AND gram IN ({','.join('?' * len(probe))}) "
+            f"GROUP BY segment HAVING COUNT(*) >= ?) m "
+            f"JOIN fuzzy_segments s ON s.segment = m.segment WHERE s.size BETWEEN ? AND ?",
+            [scope_id, *probe, required, t * q / (2 - t), q * (2 - t) / t]
+        )]
+
+        engine, model, params, src_lang, tgt_lang = scope
+        best, found = None, set()
+        for start in range(0, len(candidates), self._BATCH):
+            batch = candidates[start:start + self._BATCH]
+            for rowid, source, target in conn.execute(
+                    f"SELECT rowid, source, target FROM segments WHERE rowid IN ({','.join('?' * len(batch))}) "
+                    f"AND src_lang = ? AND tgt_lang = ? AND engine = ? AND model = ? AND params = ?",
+                    [*batch, src_lang, tgt_lang, engine, model, params]):
+                found.add(rowid)
+                grams = self._ngrams(source)
+                score = 2.0 * len(query & grams) / (q + len(grams))
+                if best is None or score > best[2]:
+                    best = (source, target, score)
+
+        # Rows replaced or evicted by another process since they were indexed
+        stale = [rowid for rowid in candidates if rowid not in found]
+        if stale:
+            self._write(conn, lambda conn: self._prune(conn, stale))
+        return best
+
+    def lookup(self, text, src_lang, tgt_lang, engine=ANY, model=ANY, params=ANY) -> Optional[Dict]:
+        """
+        Find the most similar stored segment.
+
+        Searches the segments stored under the same engine, model and
+        decoding parameters as ``text`` would be, and the reference entries
+        of the language pair (which win ties).
+
+        Returns:
+            dict with 'source', 'translation', 'score', 'mode', 'exact'
+            (stored source identical after normalization) and
+            'needs_review', or None when nothing reaches the threshold
+        """
+        with self._lock:
+            self.stats["lookups"] += 1
+        if len(text) > self.max_segment_chars:
+            return None
+
+        scopes = [self._scope(ANY, ANY, ANY, src_lang, tgt_lang)]
+        if engine != ANY:
+            scopes.append(self._scope(engine, model, params, src_lang, tgt_lang))
+
+        query = self._ngrams(text)
+        conn = self.memory._connect()
+        best = None
+        for scope in scopes:
+            self._refresh(scope)
+            match = self._best(conn, scope, query)
+            if match is not None and match[2] >= self.threshold and (best is None or match[2] > best["score"]):
+                best = {"source": match[0], "translation": match[1], "score": match[2]}
+
+        if best is None:
+            return None
+
+        exact = best["source"] == TranslationMemory.normalize(text)
+        with self._lock:
+            self.stats["matches"] += 1
+        return {
+            **best,
+            "score": round(best["score"], 4),
+            "mode": self.mode,
+            "exact": exact,
+            "needs_review": self.mode == "flag" and not exact
+        }
+
+
+def main():
+    """CLI for importing corpora and inspecting the translation memory."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="TraductAL Translation Memory")
+    parser.add_argument("--db", default=os.environ.get("TRADUCTAL_TM_PATH", "./cache/translation_memory.db"),
+                        help="Translation memory database")
+    parser.add_argument("--max-size-mb", type=float, default=512, help="Eviction threshold")
+    sub = parser.add_subparsers(dest="command")
+
+    p_tsv = sub.add_parser("import-tsv", help="Import a source<TAB>target file")
+    p_tsv.add_argument("path")
+    p_tsv.add_argument("--src", required=True, help="Source language code")
+    p_tsv.add_argument("--tgt", required=True, help="Target language code")
+
+    p_par = sub.add_parser("import-parallel", help="Import two line-aligned files")
+    p_par.add_argument("source_path")
+    p_par.add_argument("target_path")
+    p_par.add_argument("--src", required=True, help="Source language code")
+    p_par.add_argument("--tgt", required=True, help="Target language code")
+
+    sub.add_parser("stats", help="Show database statistics")
+
+    p_fuzzy = sub.add_parser("fuzzy", help="Look up the closest imported reference segment")
+    p_fuzzy.add_argument("text")
+    p_fuzzy.add_argument("--src", required=True, help="Source language code")
+    p_fuzzy.add_argument("--tgt", required=True, help="Target language code")
+    p_fuzzy.add_argument("--threshold", type=float, default=0.85, help="Minimum similarity (0-1)")
+
+    args = parser.parse_args()
+    tm = TranslationMemory(args.db, max_size_mb=args.max_size_mb)
+
+    if args.command == "import-tsv":
+        n = tm.import_tsv(args.path, args.src, args.tgt)
+        print(f"✅ Imported {n} segments ({args.src} → {args.tgt})")
+    elif args.command == "import-parallel":
+        n = tm.import_parallel(args.source_path, args.target_path, args.src, args.tgt)
+        print(f"✅ Imported {n} segments ({args.src} → {args.tgt})")
+    elif args.command == "stats":
+        print(json.dumps(tm.info(), indent=2, ensure_ascii=False))
+    elif args.command == "fuzzy":
+        fuzzy = FuzzyTranslationMemory(tm, threshold=args.threshold)
+        start = time.perf_counter()
+        match = fuzzy.lookup(args.text, args.src, args.tgt)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if match:
+            print(f"✅ {match['score']:.0%} match ({elapsed_ms:.2f}ms)")
+            print(f"   Source: {match['source']}")
+            print(f"   Target: {match['translation']}")
+        else:
+            print(f"⚪ No match above {args.threshold:.0%} ({elapsed_ms:.2f}ms)")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
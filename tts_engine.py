@@ -13,6 +13,8 @@ from typing import Optional, Tuple
 import warnings
 warnings.filterwarnings("ignore")
 
+import language_registry
+
 
 class TTSEngine:
     """
@@ -20,24 +22,11 @@ class TTSEngine:
     Supports caching of models for efficient repeated use
     """
 
-    # Language code mapping for supported languages (ISO 639-3 codes)
-    # Note: Only languages with available MMS-TTS checkpoints on HuggingFace
-    LANGUAGE_CODES = {
-        # Original European languages (TTS available)
-        "English": "eng",
-        "German": "deu",
-        "French": "fra",
-        "Spanish": "spa",
-        "Portuguese": "por",
-        # Tier 1: Major World Languages (added Dec 2025)
-        "Russian": "rus",
-        "Hindi": "hin",
-        # Tier 2: Additional Major Languages (added Dec 2025)
-        "Arabic": "ara",   # Modern Standard Arabic
-        "Korean": "kor"
-        # NOTE: Italian, Chinese (Mandarin), Japanese not available in MMS-TTS
-        # These languages work for TRANSLATION only, not TTS
-    }
+    # Language name to ISO 639-3 code, for languages with an MMS-TTS
+    # checkpoint on HuggingFace (from the capability registry; Italian,
+    # Chinese and Japanese work for TRANSLATION only, not TTS)
+    LANGUAGE_CODES = {name: language_registry.tts_code(code)
+                      for code, name in language_registry.languages("tts").items()}
 
     def __init__(self):
         """Initialize TTS engine with empty model cache."""
@@ -8,11 +8,14 @@ import os
 import sys
 import time
 import argparse
+import threading
 from pathlib import Path
 import warnings
 warnings.filterwarnings("ignore")
 
 try:
+    import language_registry
+    from engine_router import EngineRouter
     from nllb_translator import EnhancedOfflineTranslator
     from apertus_translator import ApertusTranslator
     print("✅ Translation engines loaded successfully")
@@ -28,39 +31,82 @@ class UnifiedTranslator:
     - Apertus8B: 1811 languages, causal LLM, specialized for Swiss languages
     """
 
-    def __init__(self, models_dir="./models/deployed_models"):
+    def __init__(self, models_dir="./models/deployed_models", batch_wait_ms=None,
+                 tm_path=None, tm_max_size_mb=512, fuzzy_threshold=None, fuzzy_mode="flag",
+                 nllb_backend="pytorch", nllb_precision="float32", apertus_backend="transformers",
+                 apertus_gguf_path=None, apertus_load_mode="float32", apertus_max_batch=None,
+                 routing_config=None):
+        """
+        Initialize the unified engine.
+
+        Args:
+            models_dir: Directory containing the NLLB-200 models
+            batch_wait_ms: If set, concurrent NLLB requests are micro-batched,
+                           gathering chunks for up to this many milliseconds
+            tm_path: If set, SQLite translation memory shared by both engines
+            tm_max_size_mb: Size above which the translation memory evicts
+                            least-recently-used segments
+            fuzzy_threshold: If set (0-1), segments missing the translation
+                             memory are looked up for near matches above
+                             this similarity
+            fuzzy_mode: 'return' (use the match), 'flag' (use it, mark for
+                        review) or 'hint' (give it to Apertus as a reference)
+            nllb_backend: 'pytorch' or 'ctranslate2' (int8 CPU inference,
+                          converted and cached on first use)
+            nllb_precision: 'float32', 'int8' (dynamic quantization) or 'bf16'
+                            for the PyTorch NLLB weights (cached on first use)
+            apertus_backend: 'transformers' or 'llama.cpp' (4/8-bit GGUF export on CPU)
+            apertus_gguf_path: GGUF file or directory for the llama.cpp backend
+            apertus_load_mode: 'float32', 'bf16-mmap' (transformers backend on
+                               CPU; about half the memory, float32 fallback on
+                               CPUs without bf16) or 'offload' (layers beyond
+                               APERTUS_RAM_BUDGET_GB stay on disk)
+            apertus_max_batch: If set, concurrent Apertus requests share one
+                               continuous decode batch of up to this many chunks
+            routing_config: JSON file with per-pair quality floors, quality
+                            scores and engine concurrency for the cost-based
+                            engine router (see engine_router.py)
+        """
         self.models_dir = Path(models_dir)
         self.nllb_translator = None
         self.apertus_translator = None
+        self.batch_wait_ms = batch_wait_ms
+        self.nllb_backend = nllb_backend
+        self.nllb_precision = nllb_precision
+        self.apertus_backend = apertus_backend
+        self.apertus_gguf_path = apertus_gguf_path
+        self.apertus_load_mode = apertus_load_mode
+        self.apertus_max_batch = apertus_max_batch
+        # Concurrent (e.g. Gradio) requests must not load an engine twice
+        self._init_lock = threading.Lock()
+
+        self.translation_memory = None
+        if tm_path:
+            from translation_memory import TranslationMemory
+            self.translation_memory = TranslationMemory(tm_path, max_size_mb=tm_max_size_mb)
+            print(f"💾 Translation memory: {tm_path}")
+
+        self.fuzzy_memory = None
+        if self.translation_memory and fuzzy_threshold:
+            from translation_memory import FuzzyTranslationMemory
+            self.fuzzy_memory = FuzzyTranslationMemory(
+                self.translation_memory, threshold=fuzzy_threshold, mode=fuzzy_mode
+            )
+            print(f"🔎 Fuzzy matching: ≥{fuzzy_threshold:.0%} ({fuzzy_mode})")
+
+        # Auto engine selection by expected completion time (engine_router.py);
+        # batched engines serve several requests at once
+        concurrency = {"nllb": 4 if batch_wait_ms else 1, "apertus": apertus_max_batch or 1}
+        if routing_config:
+            self.router = EngineRouter.from_file(routing_config, concurrency=concurrency)
+            print(f"🧭 Routing config: {routing_config}")
+        else:
+            self.router = EngineRouter(concurrency=concurrency)
 
-        # Romansh language codes (Apertus8B specialty)
-        self.romansh_languages = {
-            'rm': 'Romansh (generic)',
-            'rm-sursilv': 'Romansh Sursilvan',
-            'rm-vallader': 'Romansh Vallader',
-            'rm-puter': 'Romansh Puter',
-            'rm-surmiran': 'Romansh Surmiran',
-            'rm-sutsilv': 'Romansh Sutsilvan',
-            'rm-rumgr': 'Rumantsch Grischun'
-        }
-
-        # Common languages supported by both (expanded Dec 2025)
-        self.common_languages = {
-            # Original 6 languages
-            'de': 'German',
-            'en': 'English',
-            'fr': 'French',
-            'it': 'Italian',
-            'es': 'Spanish',
-            'pt': 'Portuguese',
-            # New languages added Dec 2025
-            'ru': 'Russian',
-            'zh': 'Chinese',
-            'hi': 'Hindi',
-            'ar': 'Arabic',
-            'ja': 'Japanese',
-            'ko': 'Korean'
-        }
+        # Romansh variants (Apertus8B specialty) and languages both engines translate
+        self.romansh_languages = language_registry.languages("romansh")
+        self.common_languages = {code: name for code, name in language_registry.languages("apertus").items()
+                                 if language_registry.supports(code, "nllb")}
 
         print("🌍 Unified TraductAL Translation Engine")
         print("=" * 60)
@@ -70,26 +116,74 @@ class UnifiedTranslator:
 
     def _init_nllb(self):
         """Lazy load NLLB-200 translator."""
-        if self.nllb_translator is None:
-            print("\n⏳ Initializing NLLB-200...")
-            self.nllb_translator = EnhancedOfflineTranslator(self.models_dir)
+        with self._init_lock:
+            if self.nllb_translator is None:
+                print("\n⏳ Initializing NLLB-200...")
+                translator = EnhancedOfflineTranslator(
+                    self.models_dir, translation_memory=self.translation_memory,
+                    backend=self.nllb_backend, precision=self.nllb_precision, fuzzy_memory=self.fuzzy_memory
+                )
+                if self.batch_wait_ms:
+                    translator.enable_scheduler(max_wait_ms=self.batch_wait_ms)
+                self.nllb_translator = translator
         return self.nllb_translator
 
     def _init_apertus(self):
         """Lazy load Apertus8B translator."""
-        if self.apertus_translator is None:
-            print("\n⏳ Initializing Apertus8B...")
-            self.apertus_translator = ApertusTranslator()
+        with self._init_lock:
+            if self.apertus_translator is None:
+                print("\n⏳ Initializing Apertus8B...")
+                if self.apertus_backend == "llama.cpp":
+                    from apertus_gguf import ApertusGGUFTranslator
+                    translator = ApertusGGUFTranslator(
+                        gguf_path=self.apertus_gguf_path, translation_memory=self.translation_memory,
+                        fuzzy_memory=self.fuzzy_memory
+                    )
+                else:
+                    translator = ApertusTranslator(
+                        translation_memory=self.translation_memory, load_mode=self.apertus_load_mode,
+                        fuzzy_memory=self.fuzzy_memory
+                    )
+                    if self.apertus_max_batch:
+                        translator.enable_continuous_batching(max_batch_size=self.apertus_max_batch)
+                # Published only once fully set up
+                self.apertus_translator = translator
         return self.apertus_translator
 
+    def _load_engine(self, engine, model_name=None):
+        """
+        Translator of an engine with its model loaded (a no-op once loaded).
+
+        Load failures are left to the translate call, which reports them.
+        """
+        if engine == "nllb":
+            translator = self._init_nllb()
+            translator._ensure_model(model_name)
+        else:
+            translator = self._init_apertus()
+            if translator.model is None:
+                translator.load_model()
+        return translator
+
+    @staticmethod
+    def _generated(stats):
+        """Whether an engine translated any segment itself, rather than all from the memories."""
+        if "cache_misses" not in stats:
+            return True
+        return stats["cache_misses"] > stats.get("fuzzy_hits", 0)
+
     def _is_romansh(self, lang_code):
         """Check if language code is Romansh variant."""
-        return lang_code.startswith('rm')
+        return language_registry.is_romansh(lang_code)
 
     def auto_select_engine(self, src_lang, tgt_lang):
         """
         Automatically select best translation engine.
 
+        Fixed rules answered from the language registry, without loading
+        any model; used to group batch requests, while single requests go
+        through the cost-based router (self.router).
+
         Rules (updated Dec 2025):
         1. If either language is Romansh AND target is common EU language → Use Apertus8B
         2. If Romansh AND target is world language (Hindi/Russian/Arabic/etc) → Use NLLB
@@ -100,35 +194,22 @@ class UnifiedTranslator:
         is_src_romansh = self._is_romansh(src_lang)
         is_tgt_romansh = self._is_romansh(tgt_lang)
 
-        # If Romansh involved
+        # If Romansh involved, and the other side is a core European language,
+        # use Apertus (specialized)
         if is_src_romansh or is_tgt_romansh:
-            # If target is core European language, use Apertus (specialized)
-            apertus_preferred = {'de', 'en', 'fr', 'it', 'es', 'pt'}
             other_lang = tgt_lang if is_src_romansh else src_lang
-
-            if other_lang in apertus_preferred:
+            if other_lang in language_registry.APERTUS_PREFERRED:
                 return "apertus"
 
-            # For Romansh + world languages (Hindi, Russian, etc.), use NLLB
-            # Check if NLLB supports both languages
-            nllb = self._init_nllb()
-            nllb_src = nllb.nllb_languages.get(src_lang) or src_lang
-            nllb_tgt = nllb.nllb_languages.get(tgt_lang) or tgt_lang
-
-            if nllb_src in nllb.nllb_languages.values() and nllb_tgt in nllb.nllb_languages.values():
-                return "nllb"
-
-            # Fallback to Apertus
-            return "apertus"
-
-        # No Romansh: check if both languages supported by NLLB
-        nllb = self._init_nllb()
-        if src_lang in nllb.nllb_languages and tgt_lang in nllb.nllb_languages:
+        # Romansh + world languages (Hindi, Russian, etc.) or no Romansh at all:
+        # NLLB if it supports both languages
+        if language_registry.supports(src_lang, "nllb") and language_registry.supports(tgt_lang, "nllb"):
             return "nllb"
 
         return "apertus"
 
-    def translate(self, text, src_lang, tgt_lang, engine=None, model_name=None):
+    def translate(self, text, src_lang, tgt_lang, engine=None, model_name=None,
+                  profile=None, latency_budget=None):
         """
         Translate text using the best available engine.
 
@@ -138,6 +219,9 @@ class UnifiedTranslator:
             tgt_lang: Target language code
             engine: Force specific engine ("nllb" or "apertus"), or None for auto
             model_name: Specific NLLB model to use (if engine="nllb")
+            profile: NLLB decoding profile ("interactive", "balanced", "archival")
+            latency_budget: Optional seconds for NLLB decoding; the beam width
+                            is lowered to fit, based on measured speed
 
         Returns:
             dict with translation and metadata
@@ -146,38 +230,279 @@ class UnifiedTranslator:
             return {"error": "Empty text provided"}
 
         # Auto-select engine if not specified
+        routing = None
         if engine is None:
-            engine = self.auto_select_engine(src_lang, tgt_lang)
-            print(f"🤖 Auto-selected engine: {engine.upper()}")
+            engine, routing = self.router.route(text, src_lang, tgt_lang)
+            print(f"🤖 Auto-selected engine: {engine.upper()} ({routing['reason']})")
+
+        if engine not in ("nllb", "apertus"):
+            return {"error": f"Unknown engine: {engine}"}
 
         try:
             start_time = time.time()
 
-            if engine == "nllb":
-                translator = self._init_nllb()
-                result = translator.translate(text, src_lang, tgt_lang, model_name)
+            # Load the model first, so the router only times translation
+            translator = self._load_engine(engine, model_name)
+
+            # Track the request so the router sees queue depth and latency; the
+            # engines check the translation memory, then fuzzy matches, per segment
+            depth = self.router.start(engine)
+            engine_start = time.time()
+            result = None
+            try:
+                if engine == "nllb":
+                    result = translator.translate(text, src_lang, tgt_lang, model_name,
+                                                  profile=profile, latency_budget=latency_budget)
+
+                    # Ensure result is dict format
+                    if isinstance(result, str):
+                        result = {"translation": result, "model": model_name or "NLLB-200"}
+
+                    result["engine"] = "NLLB-200"
+
+                else:
+                    result = translator.translate(text, src_lang, tgt_lang)
+                    result["engine"] = "Apertus8B"
+            finally:
+                ok = isinstance(result, dict) and "error" not in result and \
+                    not result.get("translation", "").startswith("❌")
+                self.router.finish(engine, src_lang, tgt_lang, len(text), time.time() - engine_start,
+                                   depth=depth, ok=ok, measured=ok and self._generated(result))
+
+            if routing:
+                result["routing"] = routing
 
-                # Ensure result is dict format
-                if isinstance(result, str):
-                    result = {"translation": result, "model": model_name or "NLLB-200"}
+            total_time = time.time() - start_time
+            result["total_time"] = f"{total_time:.2f}s"
 
-                result["engine"] = "NLLB-200"
+            return result
 
-            elif engine == "apertus":
-                translator = self._init_apertus()
-                result = translator.translate(text, src_lang, tgt_lang)
-                result["engine"] = "Apertus8B"
+        except Exception as e:
+            return {"error": f"Translation failed: {str(e)}"}
+
+    def translate_stream(self, text, src_lang, tgt_lang, engine=None, model_name=None, profile=None):
+        """
+        Translate text, yielding partial results as they are generated.
+
+        Args:
+            text: Text to translate
+            src_lang: Source language code
+            tgt_lang: Target language code
+            engine: Force specific engine ("nllb" or "apertus"), or None for auto
+            model_name: Specific NLLB model to use (if engine="nllb")
+            profile: NLLB decoding profile. Token streaming is greedy, so NLLB
+                     requests whose profile uses beam search (including the
+                     default 5 beams) are translated with translate() and
+                     yielded once complete, with "streamed": False
+
+        Yields:
+            dicts with the translation so far and "partial": True; the last
+            one is the complete result with metadata and "partial": False
+            (or a single dict with "error")
+        """
+        if not text.strip():
+            yield {"error": "Empty text provided"}
+            return
+
+        # Auto-select engine if not specified
+        routing = None
+        if engine is None:
+            engine, routing = self.router.route(text, src_lang, tgt_lang)
+            print(f"🤖 Auto-selected engine: {engine.upper()} ({routing['reason']})")
+
+        if engine == "nllb":
+            try:
+                num_beams = self._init_nllb().decoding_config(profile)[0]["num_beams"]
+            except Exception as e:
+                yield {"error": f"Translation failed: {str(e)}"}
+                return
+            if num_beams > 1:
+                # Keep the selected beam search rather than streaming greedy output
+                result = self.translate(text, src_lang, tgt_lang, engine="nllb", model_name=model_name,
+                                        profile=profile)
+                if "error" not in result:
+                    result.update(partial=False, streamed=False)
+                    if routing:
+                        result["routing"] = routing
+                yield result
+                return
+
+        if engine not in ("nllb", "apertus"):
+            yield {"error": f"Unknown engine: {engine}"}
+            return
+
+        start_time = time.time()
+        try:
+            # Load the model first, so the router only times translation
+            translator = self._load_engine(engine, model_name)
+        except Exception as e:
+            yield {"error": f"Translation failed: {str(e)}"}
+            return
+
+        # The engines check the translation memory, then fuzzy matches, per segment
+        stats = {}
+        if engine == "nllb":
+            stream = translator.translate_stream(text, src_lang, tgt_lang, model_name, profile=profile, stats=stats)
+            engine_name = "NLLB-200"
+        else:
+            stream = translator.translate_stream(text, src_lang, tgt_lang, stats=stats)
+            engine_name = "Apertus8B"
+
+        translation = ""
+        first_output = None
+        depth = self.router.start(engine)
+        engine_start = time.time()
+        ok = False
+        try:
+            for translation in stream:
+                if translation.startswith("❌"):
+                    yield {"error": translation}
+                    return
+                if first_output is None:
+                    first_output = time.time() - start_time
+                yield {"translation": translation, "engine": engine_name, "partial": True}
+            ok = True
+        except Exception as e:
+            yield {"error": f"Translation failed: {str(e)}"}
+            return
+        finally:
+            self.router.finish(engine, src_lang, tgt_lang, len(text), time.time() - engine_start,
+                               depth=depth, ok=ok, measured=ok and self._generated(stats))
+
+        result = {
+            "translation": translation,
+            "model": translator.current_model_name if engine == "nllb" else "Apertus-8B",
+            "engine": engine_name,
+            "partial": False,
+            "time_to_first_output": f"{first_output or 0.0:.2f}s",
+            "total_time": f"{time.time() - start_time:.2f}s"
+        }
+        if engine == "apertus":
+            result["device"] = translator.device
+        result.update(stats)
+        if routing:
+            result["routing"] = routing
+        yield result
+
+    def translate_batch(self, items, model_name=None, profile=None):
+        """
+        Translate many texts at once, mixing language pairs.
+
+        Items routed to NLLB are decoded together in shared batches (one row
+        per chunk, each with its own source/target tags); the remaining items
+        are translated one by one with their selected engine.
+
+        Args:
+            items: List of (text, src_lang, tgt_lang) tuples
+            model_name: Specific NLLB model to use
+            profile: NLLB decoding profile (e.g. "archival" for overnight batches)
 
+        Returns:
+            List of result dicts aligned with ``items``
+        """
+        results = [None] * len(items)
+        nllb_indices = []
+
+        for i, (text, src_lang, tgt_lang) in enumerate(items):
+            if not text.strip():
+                results[i] = {"error": "Empty text provided"}
+            elif self.auto_select_engine(src_lang, tgt_lang) == "nllb":
+                nllb_indices.append(i)
             else:
-                return {"error": f"Unknown engine: {engine}"}
+                results[i] = self.translate(text, src_lang, tgt_lang, engine="apertus")
 
+        if nllb_indices:
+            start_time = time.time()
+            stats = {}
+            try:
+                translator = self._init_nllb()
+                translations = translator.translate_batch(
+                    [items[i] for i in nllb_indices], model_name, stats=stats, profile=profile
+                )
+            except Exception as e:
+                translations = [f"❌ Translation failed: {str(e)}"] * len(nllb_indices)
             total_time = time.time() - start_time
-            result["total_time"] = f"{total_time:.2f}s"
 
-            return result
+            for i, translation in zip(nllb_indices, translations):
+                if translation.startswith("❌"):
+                    results[i] = {"error": translation}
+                else:
+                    results[i] = {
+                        "translation": translation,
+                        "model": translator.current_model_name,
+                        "engine": "NLLB-200",
+                        "batch_size": len(nllb_indices),
+                        "total_time": f"{total_time:.2f}s",
+                        **stats
+                    }
+
+        return results
+
+    def translate_many(self, text, src_lang, tgt_langs, model_name=None):
+        """
+        Translate one text into several target languages.
 
-        except Exception as e:
-            return {"error": f"Translation failed: {str(e)}"}
+        Targets routed to NLLB share a single encoder pass over the source;
+        several Apertus targets (e.g. Romansh variants) are generated together
+        in batches sharing their common prompt prefix.
+
+        Args:
+            text: Text to translate
+            src_lang: Source language code
+            tgt_langs: List of target language codes
+            model_name: Specific NLLB model to use
+
+        Returns:
+            dict mapping each target language to its result dict
+        """
+        if not text.strip():
+            return {tgt_lang: {"error": "Empty text provided"} for tgt_lang in tgt_langs}
+
+        results = {}
+        nllb_targets = []
+        apertus_targets = []
+        for tgt_lang in dict.fromkeys(tgt_langs):
+            if self.auto_select_engine(src_lang, tgt_lang) == "nllb":
+                nllb_targets.append(tgt_lang)
+            else:
+                apertus_targets.append(tgt_lang)
+
+        if len(apertus_targets) == 1:
+            results[apertus_targets[0]] = self.translate(text, src_lang, apertus_targets[0], engine="apertus")
+        elif apertus_targets:
+            try:
+                translator = self._init_apertus()
+                for tgt_lang, result in translator.translate_variants(text, src_lang, apertus_targets).items():
+                    results[tgt_lang] = {**result, "engine": "Apertus8B"} if "error" not in result else result
+            except Exception as e:
+                for tgt_lang in apertus_targets:
+                    results[tgt_lang] = {"error": f"Translation failed: {str(e)}"}
+
+        if nllb_targets:
+            start_time = time.time()
+            stats = {}
+            translator = None
+            try:
+                translator = self._init_nllb()
+                translations = translator.translate_many(text, src_lang, nllb_targets, model_name, stats=stats)
+            except Exception as e:
+                translations = {tgt_lang: f"❌ Translation failed: {str(e)}" for tgt_lang in nllb_targets}
+            total_time = time.time() - start_time
+
+            for tgt_lang, translation in translations.items():
+                if translation.startswith("❌"):
+                    results[tgt_lang] = {"error": translation}
+                else:
+                    results[tgt_lang] = {
+                        "translation": translation,
+                        "model": translator.current_model_name,
+                        "engine": "NLLB-200",
+                        "targets": len(nllb_targets),
+                        "total_time": f"{total_time:.2f}s",
+                        **stats
+                    }
+
+        return {tgt_lang: results[tgt_lang] for tgt_lang in dict.fromkeys(tgt_langs)}
 
     def list_languages(self):
         """List all supported languages."""
@@ -281,16 +606,58 @@ Examples:
     parser.add_argument("tgt_lang", nargs="?", help="Target language")
     parser.add_argument("text", nargs="?", help="Text to translate")
     parser.add_argument("--engine", choices=["nllb", "apertus"], help="Force specific engine")
-    parser.add_argument("--model", help="Specific NLLB model (if using NLLB)")
+    parser.add_argument("--model", help="Specific NLLB model (if using NLLB), e.g. nllb_200_3.3b_int8")
     parser.add_argument("--list-languages", action="store_true", help="List supported languages")
     parser.add_argument("--list-models", action="store_true", help="List available models")
     parser.add_argument("--benchmark", action="store_true", help="Compare NLLB vs Apertus")
     parser.add_argument("--clean", action="store_true", help="Output only translation")
+    parser.add_argument("--stream", action="store_true", help="Print the translation as it is generated")
+    parser.add_argument("--profile", choices=["interactive", "balanced", "archival"],
+                        help="NLLB decoding profile (default: 5-beam search)")
+    parser.add_argument("--latency-budget", type=float,
+                        help="Seconds per request; NLLB beam width is lowered to fit")
+    parser.add_argument("--batch-wait-ms", type=float, help="Micro-batch concurrent NLLB requests (ms window)")
+    parser.add_argument("--tm", default=os.environ.get("TRADUCTAL_TM_PATH"),
+                        help="Translation memory database (SQLite) for cached segments")
+    parser.add_argument("--fuzzy", type=float, help="Use translation-memory near matches above this similarity (0-1)")
+    parser.add_argument("--fuzzy-mode", choices=["return", "flag", "hint"], default="flag",
+                        help="What to do with a near match (default: flag)")
+    parser.add_argument("--backend", choices=["pytorch", "ctranslate2"],
+                        default=os.environ.get("TRADUCTAL_NLLB_BACKEND", "pytorch"),
+                        help="NLLB inference backend (ctranslate2 = int8 CPU inference)")
+    parser.add_argument("--precision", choices=["float32", "int8", "bf16"],
+                        default=os.environ.get("TRADUCTAL_NLLB_PRECISION", "float32"),
+                        help="NLLB weight precision (int8 = dynamic quantization)")
+    parser.add_argument("--apertus-backend", choices=["transformers", "llama.cpp"],
+                        default=os.environ.get("TRADUCTAL_APERTUS_BACKEND", "transformers"),
+                        help="Apertus inference backend (llama.cpp = quantized GGUF on CPU)")
+    parser.add_argument("--apertus-gguf", default=os.environ.get("APERTUS_GGUF_PATH"),
+                        help="GGUF file or directory for the llama.cpp backend")
+    parser.add_argument("--apertus-load-mode", choices=["float32", "bf16-mmap", "offload"],
+                        default=os.environ.get("TRADUCTAL_APERTUS_LOAD_MODE", "float32"),
+                        help="Apertus CPU weight loading (bf16-mmap = about half the memory, "
+                             "offload = layers beyond APERTUS_RAM_BUDGET_GB stay on disk)")
+    parser.add_argument("--apertus-max-batch", type=int,
+                        help="Continuous batching of concurrent Apertus requests (sequences per step)")
+    parser.add_argument("--routing-config", default=os.environ.get("TRADUCTAL_ROUTING_CONFIG"),
+                        help="JSON with per-pair quality floors for automatic engine selection")
 
     args = parser.parse_args()
 
     # Initialize unified translator
-    translator = UnifiedTranslator()
+    translator = UnifiedTranslator(
+        batch_wait_ms=args.batch_wait_ms,
+        tm_path=args.tm,
+        fuzzy_threshold=args.fuzzy,
+        fuzzy_mode=args.fuzzy_mode,
+        nllb_backend=args.backend,
+        nllb_precision=args.precision,
+        apertus_backend=args.apertus_backend,
+        apertus_gguf_path=args.apertus_gguf,
+        apertus_load_mode=args.apertus_load_mode,
+        apertus_max_batch=args.apertus_max_batch,
+        routing_config=args.routing_config
+    )
 
     # Handle list commands
     if args.list_languages:
@@ -309,13 +676,36 @@ Examples:
     if not all([args.src_lang, args.tgt_lang, args.text]):
         parser.error("src_lang, tgt_lang, and text are required for translation")
 
+    if args.stream:
+        # Print only the newly generated text at each step
+        shown = ""
+        result = {}
+        for result in translator.translate_stream(args.text, args.src_lang, args.tgt_lang,
+                                                  engine=args.engine, model_name=args.model,
+                                                  profile=args.profile):
+            if "error" in result:
+                print(f"\n❌ {result['error']}")
+                return
+            translation = result["translation"]
+            if translation.startswith(shown):
+                print(translation[len(shown):], end="", flush=True)
+            else:
+                print("\n" + translation, end="", flush=True)
+            shown = translation
+        print()
+        if not args.clean and result:
+            print(f"⏱️  First output: {result.get('time_to_first_output')}, total: {result.get('total_time')}")
+        return
+
     # Perform translation
     result = translator.translate(
         args.text,
         args.src_lang,
         args.tgt_lang,
         engine=args.engine,
-        model_name=args.model
+        model_name=args.model,
+        profile=args.profile,
+        latency_budget=args.latency_budget
     )
 
     # Display results
@@ -336,6 +726,23 @@ Examples:
             print(f"\n🤖 Engine: {result.get('engine', 'Unknown')}")
             print(f"📊 Model: {result.get('model', 'Unknown')}")
             print(f"⏱️  Time: {result.get('total_time', result.get('time', 'Unknown'))}")
+            if "decoding" in result:
+                decoding = result["decoding"]
+                adjusted = " (fitted to latency budget)" if decoding.get("budget_adjusted") else ""
+                print(f"🎛️  Decoding: {decoding['profile']}, {decoding['num_beams']} beams{adjusted}")
+            if "cache_hits" in result:
+                print(f"💾 Cache: {result['cache_hits']} hits, {result['cache_misses']} misses")
+            if result.get("model_calls_saved"):
+                print(f"♻️  Repeated segments: {result['model_calls_saved']} model calls saved")
+            for match in result.get("fuzzy_matches", []):
+                print(f"🔎 Fuzzy match ({match['score']:.0%}, {match['mode']}): {match['source']}")
+            if result.get("needs_review"):
+                print("⚠️  Contains fuzzy matches - please review")
+            if "routing" in result:
+                routing = result["routing"]
+                estimates = ", ".join(f"{engine} {c['expected_time']:.2f}s (q={c['quality']:.2f})"
+                                      for engine, c in routing["candidates"].items())
+                print(f"🧭 Routing: {routing['reason']}, floor {routing['quality_floor']:.2f} — {estimates}")
             print("=" * 60)
 
 
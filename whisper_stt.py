@@ -11,6 +11,8 @@ import warnings
 from pathlib import Path
 warnings.filterwarnings("ignore")
 
+import language_registry
+
 try:
     import torch
     from transformers import WhisperProcessor, WhisperForConditionalGeneration
@@ -36,25 +38,10 @@ class WhisperSTT:
     - One model for all languages
     """
 
-    # Language name to Whisper code mapping
-    LANGUAGE_CODES = {
-        # European languages
-        "English": "en",
-        "German": "de",
-        "French": "fr",
-        "Italian": "it",
-        "Spanish": "es",
-        "Portuguese": "pt",
-        "Russian": "ru",
-        # Asian languages
-        "Chinese": "zh",
-        "Japanese": "ja",
-        "Korean": "ko",
-        "Hindi": "hi",
-        "Arabic": "ar",
-        # Romansh (if needed)
-        "Romansh": "rm"
-    }
+    # Language name to Whisper code mapping (from the capability registry)
+    LANGUAGE_CODES = {name: language_registry.whisper_code(code)
+                      for code, name in language_registry.languages().items()
+                      if language_registry.whisper_code(code)}
 
     def __init__(self, model_size="base"):
         """